@@ -0,0 +1,9 @@
+"""Offline benchmark suite for The Winnower.
+
+The benchmarks never talk to a real LLM provider. A local HTTP stand-in
+(:mod:`benchmarks.mock_llm_server`) speaks enough of the OpenAI and Anthropic
+wire formats for the official SDKs, and :mod:`benchmarks.corpus` generates
+synthetic papers of varying sizes. Run the suite with::
+
+    python -m benchmarks.run --sizes small,medium --papers 10 --latency 0.5
+"""
@@ -0,0 +1,124 @@
+"""Synthetic paper corpora for benchmarking."""
+
+import random
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import pymupdf
+
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+    pymupdf = None
+
+
+# Approximate number of body paragraphs per paper for each size class.
+SIZES = {
+    "small": 12,  # a 4-page letter
+    "medium": 60,  # a typical journal article
+    "large": 400,  # a thesis chapter with appendices
+}
+
+_WORDS = (
+    "gradient posterior manifold kernel spectral operator lattice estimator "
+    "variance convergence entropy tensor halo redshift likelihood sampler "
+    "embedding regularization perturbation eigenvalue diffusion attention "
+    "boundary symmetry invariant stochastic Hamiltonian covariance residual"
+).split()
+
+_EQUATIONS = [
+    "L(theta) = sum_i log p(x_i | theta) - lambda ||theta||^2",
+    "m_t = beta m_{t-1} + (1 - beta) g_t",
+    "H = p^2 / 2m + V(q)",
+    "f'(R) R_{mu nu} - f(R) g_{mu nu} / 2 = 8 pi G T_{mu nu}",
+    "alpha_t = alpha_0 / (1 + gamma t)",
+]
+
+
+def generate_paper_text(
+    paragraphs: int, rng: Optional[random.Random] = None
+) -> str:
+    """Generate the markdown text of one synthetic paper."""
+    rng = rng or random.Random()
+    title = " ".join(rng.choice(_WORDS).title() for _ in range(6))
+    lines = [f"# {title}", "", "## Abstract", "", _paragraph(rng), ""]
+
+    sections = ["Introduction", "Methods", "Theory", "Results", "Discussion"]
+    per_section = max(1, paragraphs // len(sections))
+    for section in sections:
+        lines.extend([f"## {section}", ""])
+        for _ in range(per_section):
+            lines.extend([_paragraph(rng), ""])
+            if rng.random() < 0.3:
+                lines.extend([f"$$ {rng.choice(_EQUATIONS)} $$", ""])
+
+    lines.extend(["## References", ""])
+    for i in range(1, 21):
+        lines.append(f"[{i}] A. Author et al., Journal {i} (2024).")
+
+    return "\n".join(lines)
+
+
+def _paragraph(rng: random.Random) -> str:
+    sentences = []
+    for _ in range(rng.randint(4, 8)):
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 18))]
+        sentences.append(" ".join(words).capitalize() + ".")
+    return " ".join(sentences)
+
+
+def write_corpus(
+    directory: Path,
+    size: str = "medium",
+    count: int = 10,
+    fmt: str = "txt",
+    seed: int = 0,
+) -> List[Path]:
+    """Write ``count`` synthetic papers of ``size`` into ``directory``.
+
+    ``fmt`` is ``"txt"``, ``"md"`` or ``"pdf"``; PDFs require pymupdf (a
+    dependency of pymupdf4llm) and exercise the conversion stage.
+    """
+    if size not in SIZES:
+        raise ValueError(f"Unknown corpus size: {size}")
+    if fmt == "pdf" and not PYMUPDF_AVAILABLE:
+        raise ImportError("pymupdf is required to generate PDF corpora")
+
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(f"{seed}-{size}")
+    paths = []
+
+    for i in range(count):
+        text = generate_paper_text(SIZES[size], rng)
+        path = directory / f"{size}_{i:05d}.{fmt}"
+        if fmt == "pdf":
+            _write_pdf(text, path)
+        else:
+            path.write_text(text, encoding="utf-8")
+        paths.append(path)
+
+    return paths
+
+
+def _write_pdf(text: str, path: Path, lines_per_page: int = 50) -> None:
+    doc = pymupdf.open()
+    wrapped = []
+    for line in text.splitlines():
+        while len(line) > 90:
+            cut = line.rfind(" ", 0, 90)
+            cut = cut if cut > 0 else 90
+            wrapped.append(line[:cut])
+            line = line[cut:].lstrip()
+        wrapped.append(line)
+
+    for start in range(0, len(wrapped), lines_per_page):
+        page = doc.new_page()
+        page.insert_text(
+            (50, 60),
+            "\n".join(wrapped[start:start + lines_per_page]),
+            fontsize=9,
+        )
+
+    doc.save(str(path))
+    doc.close()
@@ -0,0 +1,263 @@
+"""Local OpenAI/Anthropic-compatible HTTP stand-in with injected latency."""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+DEFAULT_COMPLETION = """
+**Core Algorithms**: Iterative refinement with momentum-corrected updates
+**Mathematical Formulations**: m_t = beta m_{t-1} + (1 - beta) g_t
+**Technical Methods**: Polynomial learning rate decay
+**Critical Parameters**: beta = 0.9, gamma = 1e-3
+"""
+
+
+class MockLLMServer:
+    """Serve canned completions with configurable latency and failures.
+
+    ``latency`` and ``jitter`` are in seconds; each response sleeps for
+    ``latency + uniform(-jitter, jitter)`` (never negative). ``error_rate``
+    and ``rate_limit_rate`` are the probabilities of answering with HTTP 500
+    and HTTP 429 respectively.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.05,
+        completion: str = DEFAULT_COMPLETION,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.completion = completion
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def client_env(self) -> Dict[str, str]:
+        """Environment variables that point both SDKs at this server."""
+        return {
+            "OPENAI_BASE_URL": f"{self.url}/v1",
+            "ANTHROPIC_BASE_URL": self.url,
+            "OPENAI_API_KEY": "mock-openai-key",
+            "ANTHROPIC_API_KEY": "mock-anthropic-key",
+        }
+
+    def _draw(self) -> Dict:
+        """Decide the outcome and delay of one request."""
+        with self._lock:
+            self.stats["requests"] += 1
+            roll = self._random.random()
+            delay = self.latency + self._random.uniform(
+                -self.jitter, self.jitter
+            )
+            if roll < self.rate_limit_rate:
+                outcome = "rate_limited"
+            elif roll < self.rate_limit_rate + self.error_rate:
+                outcome = "errors"
+            else:
+                outcome = "ok"
+            self.stats[outcome] += 1
+        return {"outcome": outcome, "delay": max(0.0, delay)}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    body = {}
+
+                path = self.path.rstrip("/")
+                if path.endswith("/chat/completions"):
+                    kind = "openai"
+                elif path.endswith("/messages"):
+                    kind = "anthropic"
+                else:
+                    self._send(404, {"error": {"message": "not found"}})
+                    return
+
+                draw = server._draw()
+                time.sleep(draw["delay"])
+
+                if draw["outcome"] == "rate_limited":
+                    self._send(
+                        429,
+                        _error_body(kind, "rate_limit_error", "Slow down"),
+                        {
+                            "retry-after-ms": str(
+                                int(server.retry_after * 1000)
+                            ),
+                            "retry-after": str(server.retry_after),
+                        },
+                    )
+                elif draw["outcome"] == "errors":
+                    # Stop the SDKs from retrying injected 5xx answers on
+                    # their own schedule; 429s keep their normal retries.
+                    self._send(
+                        500,
+                        _error_body(kind, "api_error", "Injected error"),
+                        {"x-should-retry": "false"},
+                    )
+                elif kind == "openai":
+                    self._send(200, server._openai_response(body))
+                else:
+                    self._send(200, server._anthropic_response(body))
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def _openai_response(self, body: Dict) -> Dict:
+        prompt_tokens = _estimate_tokens(
+            "".join(str(m.get("content", "")) for m in body.get("messages", []))
+        )
+        completion_tokens = _estimate_tokens(self.completion)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock-model"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": self.completion,
+                    },
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _anthropic_response(self, body: Dict) -> Dict:
+        input_tokens = _estimate_tokens(
+            "".join(str(m.get("content", "")) for m in body.get("messages", []))
+        )
+        return {
+            "id": f"msg_{uuid.uuid4().hex}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "mock-model"),
+            "content": [{"type": "text", "text": self.completion}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": _estimate_tokens(self.completion),
+            },
+        }
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def _error_body(kind: str, error_type: str, message: str) -> Dict:
+    if kind == "anthropic":
+        return {
+            "type": "error",
+            "error": {"type": error_type, "message": message},
+        }
+    return {"error": {"type": error_type, "message": message}}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run a mock OpenAI/Anthropic server for benchmarking"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = MockLLMServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    print(f"Mock LLM server listening on {server.url}")
+    for key, value in server.client_env().items():
+        print(f"  export {key}={value}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Run offline throughput benchmarks against the mock LLM server.
+
+Each scenario (one corpus size) runs in a fresh interpreter so that peak RSS
+is attributable to that scenario alone.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from .corpus import SIZES, write_corpus
+from .mock_llm_server import MockLLMServer
+
+
+def run_scenario(scenario: Dict) -> Dict:
+    """Process one synthetic corpus and return its measurements."""
+    os.environ.update(scenario["env"])
+
+    from winnower.config import DEFAULT_CONFIG
+    from winnower.core import WinnowerProcessor
+    from winnower.tracing import peak_rss_mb, percentile
+
+    workdir = Path(scenario["workdir"])
+    write_corpus(
+        workdir / "corpus",
+        size=scenario["size"],
+        count=scenario["papers"],
+        fmt=scenario["format"],
+        seed=scenario["seed"],
+    )
+
+    config = DEFAULT_CONFIG.copy()
+    config.update(scenario.get("config", {}))
+    processor = WinnowerProcessor(config, scenario["provider"])
+
+    output_dir = workdir / "output"
+    devnull = open(os.devnull, "w")
+    stdout, sys.stdout = sys.stdout, devnull
+    try:
+        processor.process(str(workdir / "corpus"), output_dir)
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+    report = json.loads((output_dir / "run_report.json").read_text())
+    latencies = [paper["duration_s"] for paper in report["papers"]]
+    elapsed = report["wall_s"]
+
+    summaries = list((output_dir / "summaries").glob("*.md"))
+    failed = sum(
+        1
+        for path in summaries
+        if "Error extracting technical content" in path.read_text()
+    )
+
+    return {
+        "size": scenario["size"],
+        "papers": len(latencies),
+        "failed": failed,
+        "elapsed_s": elapsed,
+        "papers_per_minute": 60 * len(latencies) / elapsed if elapsed else 0,
+        "latency_p50_s": statistics.median(latencies) if latencies else 0.0,
+        "latency_p95_s": percentile(latencies, 95),
+        "stages": report["stages"],
+        "usage": report["usage"]["total"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def print_report(results: List[Dict], server_stats: Dict) -> None:
+    header = (
+        f"{'size':<8}{'papers':>7}{'failed':>7}{'papers/min':>12}"
+        f"{'p50 s':>9}{'p95 s':>9}{'peak MB':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['size']:<8}{result['papers']:>7}{result['failed']:>7}"
+            f"{result['papers_per_minute']:>12.1f}"
+            f"{result['latency_p50_s']:>9.3f}{result['latency_p95_s']:>9.3f}"
+            f"{result['peak_rss_mb']:>9.1f}"
+        )
+
+    print("\nCPU time per stage (s):")
+    for result in results:
+        stages = ", ".join(
+            f"{name}={values['cpu_s']:.3f}"
+            for name, values in result["stages"].items()
+            if name != "paper"
+        )
+        print(f"  {result['size']:<8}{stages}")
+
+    print(
+        f"\nMock server: {server_stats['requests']} requests, "
+        f"{server_stats['rate_limited']} rate limited, "
+        f"{server_stats['errors']} errors"
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Offline throughput benchmarks for The Winnower",
+    )
+    parser.add_argument(
+        "--sizes",
+        default="small,medium,large",
+        help=f"Comma-separated corpus sizes ({', '.join(SIZES)})",
+    )
+    parser.add_argument("--papers", type=int, default=10)
+    parser.add_argument(
+        "--format", choices=["txt", "md", "pdf"], default="txt"
+    )
+    parser.add_argument(
+        "--provider", choices=["openai", "anthropic"], default="openai"
+    )
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--cassette-dir",
+        type=Path,
+        help="Record to or replay from per-scenario cassettes in this dir",
+    )
+    parser.add_argument(
+        "--cassette-mode", choices=["record", "replay"], default="replay"
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        help="Replay speed relative to recorded latency (0 = instant)",
+    )
+    parser.add_argument("--json", type=Path, help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    for size in sizes:
+        if size not in SIZES:
+            parser.error(f"unknown size: {size}")
+
+    server = MockLLMServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with server, tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            scenario = {
+                "size": size,
+                "papers": args.papers,
+                "format": args.format,
+                "provider": args.provider,
+                "seed": args.seed,
+                "env": server.client_env(),
+                "workdir": str(Path(tmp) / size),
+            }
+            if args.cassette_dir:
+                cassette = args.cassette_dir / (
+                    f"{size}-{args.format}-{args.papers}-{args.seed}"
+                    f"-{args.provider}.jsonl.gz"
+                )
+                scenario["config"] = {
+                    "cassette_path": str(cassette),
+                    "cassette_mode": args.cassette_mode,
+                    "replay_speed": args.replay_speed,
+                }
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                results.append(pool.submit(run_scenario, scenario).result())
+
+    print_report(results, server.stats)
+
+    if args.json:
+        args.json.write_text(
+            json.dumps(
+                {"results": results, "server": server.stats}, indent=2
+            )
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Tests for main-content extraction from HTML pages."""
+
+from unittest.mock import patch
+
+import pytest
+
+from winnower.articles import LXML_AVAILABLE, extract_article
+from winnower.parsers import PaperParser
+
+pytestmark = pytest.mark.skipif(not LXML_AVAILABLE, reason="needs lxml")
+
+BODY = "The estimator is unbiased and its variance shrinks with n. " * 5
+
+PUBLISHER_PAGE = f"""<html><head>
+<title>Journal | Fast Sampling</title>
+<meta name="citation_title" content="Fast Sampling">
+<meta name="citation_author" content="Ada Lovelace">
+<meta name="citation_author" content="Alan Turing">
+<script>var tracking = true;</script>
+</head><body>
+<header><nav><a href="/">Home</a><a href="/j">Journals</a></nav></header>
+<aside>Related articles</aside>
+<article class="teaser"><p>Read next: another paper.</p></article>
+<div class="c-article-body">
+  <section><h2>Methods</h2>
+  <p>We minimize
+     the loss <math alttext="L(\\theta)" display="inline"><mi>L</mi></math>.</p>
+  <p>{BODY}</p>
+  <script type="math/tex; mode=display">E = mc^2</script>
+  <ol class="c-article-references"><li>A cited paper</li></ol>
+  </section>
+</div>
+<footer>Copyright 2025 Publisher</footer>
+</body></html>"""
+
+ARXIV_PAGE = f"""<html><head><title>[2501.00089] Fast Sampling</title></head>
+<body><nav class="ltx_page_navbar">Contents</nav>
+<div class="ltx_page_main"><div class="ltx_page_content">
+<article class="ltx_document">
+  <h1 class="ltx_title ltx_title_document">Fast Sampling</h1>
+  <div class="ltx_authors">
+    <span class="ltx_creator"><span class="ltx_personname">Ada Lovelace<br>
+      University of London</span></span>
+  </div>
+  <div class="ltx_abstract"><h6>Abstract</h6>
+    <p>We sample fast.</p></div>
+  <section class="ltx_section"><h2>1 Method</h2><p>{BODY}</p></section>
+  <section class="ltx_bibliography"><h2>References</h2>
+    <ul><li>Someone. A paper. 2020.</li></ul></section>
+</article></div>
+<footer class="ltx_page_footer">Generated by LaTeXML</footer>
+</div></body></html>"""
+
+
+class TestExtractArticle:
+
+    def test_publisher_page(self):
+        """Test only the article body and its metadata are kept."""
+        article = extract_article(PUBLISHER_PAGE.encode())
+
+        assert article["title"] == "Fast Sampling"
+        assert article["authors"] == ["Ada Lovelace", "Alan Turing"]
+        content = article["content"]
+        assert content.startswith("Methods\n\nWe minimize the loss $L(")
+        assert "$$E = mc^2$$" in content
+        for furniture in [
+            "Home",
+            "Related",
+            "Read next",
+            "tracking",
+            "Copyright",
+            "A cited paper",
+        ]:
+            assert furniture not in content
+
+    def test_arxiv_html(self):
+        """Test LaTeXML pages from arxiv.org/html are recognized."""
+        article = extract_article(ARXIV_PAGE)
+
+        assert article["title"] == "Fast Sampling"
+        assert article["authors"] == ["Ada Lovelace"]
+        assert article["abstract"] == "We sample fast."
+        assert "1 Method" in article["content"]
+        assert "University of London" not in article["content"]
+        assert "References" not in article["content"]
+        assert "LaTeXML" not in article["content"]
+
+    def test_text_after_comments_is_kept(self):
+        """Test comments and processing instructions drop only themselves."""
+        article = extract_article(
+            "<html><body><p>Keep a<!-- note -->KEPT and "
+            "b<?render now?>ALSO.</p></body></html>"
+        )
+
+        assert article["content"] == "Keep aKEPT and bALSO."
+
+    def test_page_without_article_uses_body(self):
+        """Test pages without a recognizable article keep their body."""
+        article = extract_article(
+            "<html><head><title> Notes </title></head><body>"
+            "<nav>Menu</nav><p>Short note.</p></body></html>"
+        )
+
+        assert article["title"] == "Notes"
+        assert article["content"] == "Short note."
+
+
+class TestParseHtml:
+
+    def _parse(self, config):
+        parser = PaperParser(config=config)
+        with patch.object(
+            parser,
+            "_fetch_url",
+            return_value={
+                "content_type": "text/html",
+                "content": PUBLISHER_PAGE.encode(),
+            },
+        ):
+            return parser.parse("https://example.com/paper")
+
+    def test_url_uses_article_extraction(self):
+        """Test web sources send only the article to the model."""
+        paper = self._parse({})
+        whole = self._parse({"html_main_content": False})
+
+        assert paper["source"] == paper["url"] == "https://example.com/paper"
+        assert paper["authors"] == ["Ada Lovelace", "Alan Turing"]
+        assert "Journals" not in paper["content"]
+        assert "Journals" in whole["content"]
+        assert len(paper["content"]) < len(whole["content"])
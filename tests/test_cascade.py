@@ -0,0 +1,124 @@
+"""Tests for the cheap-first model cascade."""
+
+from unittest.mock import Mock, patch
+
+from winnower.extractors import TechnicalExtractor
+from winnower.quality import check_summary
+
+
+PAPER = {
+    "title": "Test Paper",
+    "authors": [],
+    "source": "test.txt",
+    "url": "",
+    "abstract": "",
+    "content": "Some technical content.",
+}
+
+GOOD_SUMMARY = (
+    "The method minimizes a contrastive loss $L = -\\log p(x)$ with a "
+    "two-stage optimization algorithm. " * 6
+)
+
+
+def response(text, finish_reason="stop"):
+    mock = Mock()
+    mock.choices = [Mock()]
+    mock.choices[0].message.content = text
+    mock.choices[0].finish_reason = finish_reason
+    mock.usage.prompt_tokens = 100
+    mock.usage.completion_tokens = 50
+    mock.usage.prompt_tokens_details.cached_tokens = 0
+    return mock
+
+
+class TestQualityChecks:
+
+    def test_good_summary_passes(self):
+        """Test a technical summary of about the right length passes."""
+        assert check_summary(GOOD_SUMMARY, summary_length=100) == []
+
+    def test_failures(self):
+        """Test each check catches what it is meant to."""
+        assert "too_short" in check_summary("The method works.", 100)
+        assert "too_long" in check_summary(GOOD_SUMMARY * 10, 20)
+        assert "refusal" in check_summary(
+            "I'm sorry, I cannot summarize this paper. " + GOOD_SUMMARY, 100
+        )
+        assert "truncated" in check_summary(GOOD_SUMMARY, 100, "length")
+        assert "truncated" in check_summary(GOOD_SUMMARY + " $$ x =", 100)
+        assert "not_technical" in check_summary("The paper is good. " * 15, 50)
+
+
+class TestCascade:
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_cheap_tier_serves_good_summary(self, mock_openai):
+        """Test a passing cheap summary is used without escalating."""
+        client = Mock()
+        client.chat.completions.create.return_value = response(GOOD_SUMMARY)
+        mock_openai.return_value = client
+
+        config = {"cascade_model": "gpt-4.1-nano", "summary_length": 100}
+        extractor = TechnicalExtractor("openai", config)
+        result = extractor.extract(PAPER)
+
+        assert result["tier"] == "cheap"
+        assert result["usage"]["model"] == "gpt-4.1-nano"
+        assert client.chat.completions.create.call_count == 1
+        assert extractor.cascade_stats()["tiers"] == {"cheap": 1, "full": 0}
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_escalates_on_failed_checks(self, mock_openai):
+        """Test a truncated cheap summary is redone on the main model."""
+
+        def create(**request):
+            if request["model"] == "gpt-4.1-nano":
+                return response(GOOD_SUMMARY, finish_reason="length")
+            return response(GOOD_SUMMARY)
+
+        client = Mock()
+        client.chat.completions.create.side_effect = create
+        mock_openai.return_value = client
+
+        config = {
+            "cascade_model": "gpt-4.1-nano",
+            "openai_model": "gpt-4.1",
+            "summary_length": 100,
+        }
+        extractor = TechnicalExtractor("openai", config)
+        result = extractor.extract(PAPER)
+
+        assert result["tier"] == "full"
+        assert result["usage"]["model"] == "gpt-4.1"
+        assert result["cascade"]["failed_checks"] == ["truncated"]
+        assert result["cascade"]["usage"]["model"] == "gpt-4.1-nano"
+        stats = extractor.cascade_stats()
+        assert stats["tiers"] == {"cheap": 0, "full": 1}
+        assert stats["failed_checks"] == {"truncated": 1}
+
+    @patch("winnower.extractors.anthropic.Anthropic")
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_cheap_error_escalates(
+        self, mock_openai, mock_anthropic, mock_openai_response
+    ):
+        """Test an erroring cheap provider falls back to the main model."""
+        openai_client = Mock()
+        openai_client.chat.completions.create.return_value = (
+            mock_openai_response
+        )
+        mock_openai.return_value = openai_client
+        anthropic_client = Mock()
+        anthropic_client.messages.create.side_effect = RuntimeError("down")
+        mock_anthropic.return_value = anthropic_client
+
+        config = {
+            "cascade_provider": "anthropic",
+            "cascade_model": "claude-3-5-haiku",
+        }
+        result = TechnicalExtractor("openai", config).extract(PAPER)
+
+        assert result["tier"] == "full"
+        assert result["error"] is None
+        assert result["cascade"]["failed_checks"] == ["error"]
+        assert result["cascade"]["usage"] is None
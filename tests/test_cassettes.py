@@ -0,0 +1,106 @@
+"""Tests for record/replay cassettes."""
+
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from winnower.cassettes import Cassette, CassetteMissError
+from winnower.config import DEFAULT_CONFIG
+from winnower.extractors import TechnicalExtractor
+from winnower.parsers import PaperParser
+
+
+class TestCassette:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "run.cassette"
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_record_then_replay(self):
+        """Test recorded responses, including bytes, are replayed."""
+        recorder = Cassette(self.path, mode="record")
+        response = {"content_type": "application/pdf", "content": b"%PDF-1"}
+        assert recorder.play("url", {"url": "x"}, lambda: response) == response
+        recorder.save()
+
+        player = Cassette(self.path, mode="replay")
+        fetch = Mock()
+        assert player.play("url", {"url": "x"}, fetch) == response
+        fetch.assert_not_called()
+        assert player.hits == 1
+
+    def test_replay_miss(self):
+        """Test unrecorded requests raise in replay mode."""
+        Cassette(self.path, mode="record").save()
+        player = Cassette(self.path, mode="replay")
+
+        with pytest.raises(CassetteMissError):
+            player.play("llm", {"prompt": "unseen"}, Mock())
+        assert player.misses == 1
+
+    def test_replay_requires_existing_file(self):
+        """Test replaying a missing cassette fails early."""
+        with pytest.raises(FileNotFoundError):
+            Cassette(self.path, mode="replay")
+
+    def test_key_ignores_dict_order(self):
+        """Test request hashing is stable across key order."""
+        assert Cassette.key("llm", {"a": 1, "b": 2}) == Cassette.key(
+            "llm", {"b": 2, "a": 1}
+        )
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_extractor_replays_llm_calls(self, mock_openai, mock_openai_response):
+        """Test extractor output is served from the cassette on replay."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+        paper = {
+            "title": "Paper",
+            "authors": [],
+            "abstract": "",
+            "content": "Some content",
+            "source": "paper.txt",
+            "url": "",
+        }
+
+        recorder = Cassette(self.path, mode="record")
+        extractor = TechnicalExtractor("openai", DEFAULT_CONFIG, cassette=recorder)
+        recorded = extractor.extract(paper)
+        recorder.save()
+
+        mock_client.chat.completions.create.reset_mock()
+        player = Cassette(self.path, mode="replay")
+        extractor = TechnicalExtractor("openai", DEFAULT_CONFIG, cassette=player)
+        replayed = extractor.extract(paper)
+
+        mock_client.chat.completions.create.assert_not_called()
+        assert replayed["technical_content"] == recorded["technical_content"]
+
+    def test_parser_replays_url_fetch(self):
+        """Test URL fetches are served from the cassette on replay."""
+        html = b"<html><title>Cached</title><body>Body text</body></html>"
+        recorder = Cassette(self.path, mode="record")
+        parser = PaperParser(cassette=recorder)
+        with patch.object(
+            parser,
+            "_fetch_url",
+            return_value={"content_type": "text/html", "content": html},
+        ):
+            parser.parse("https://example.com/paper")
+        recorder.save()
+
+        parser = PaperParser(cassette=Cassette(self.path, mode="replay"))
+        with patch("winnower.parsers.requests.get") as mock_get:
+            result = parser.parse("https://example.com/paper")
+
+        mock_get.assert_not_called()
+        assert result["title"] == "Cached"
+        assert "Body text" in result["content"]
@@ -0,0 +1,178 @@
+"""Tests for duplicate detection."""
+
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.dedup import (
+    LATEST,
+    Deduplicator,
+    _file_hash,
+    file_hash,
+    parse_arxiv_id,
+)
+
+
+class TestDeduplicator:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, content):
+        path = self.temp_dir / name
+        path.write_text(content)
+        return str(path)
+
+    def test_parse_arxiv_id(self):
+        """Test arXiv IDs are recognized in IDs, URLs and file names."""
+        assert parse_arxiv_id("2501.00089") == ("2501.00089", LATEST)
+        assert parse_arxiv_id("2501.00089v3") == ("2501.00089", 3.0)
+        assert parse_arxiv_id("https://arxiv.org/abs/2501.00089v2") == (
+            "2501.00089",
+            2.0,
+        )
+        local = self._write("2501.00089.pdf", "x")
+        assert parse_arxiv_id(local) == ("2501.00089", 0.0)
+        assert parse_arxiv_id("https://example.com/2501.00089") is None
+        assert parse_arxiv_id(self._write("notes.txt", "x")) is None
+
+    def test_identical_content(self):
+        """Test byte-identical files collapse to the first one."""
+        a = self._write("a.txt", "same text")
+        b = self._write("renamed download.txt", "same text")
+        c = self._write("c.txt", "different!")
+
+        result = Deduplicator().deduplicate([a, b, c])
+
+        assert result.unique == [a, c]
+        assert result.duplicates == {
+            a: [{"source": b, "reason": "identical content"}]
+        }
+
+    def test_arxiv_versions_collapse_to_latest(self):
+        """Test arXiv versions keep only the latest one."""
+        v1 = self._write("2501.00089.pdf", "version one")
+        v2 = self._write("2501.00089v2.pdf", "version two")
+        other = self._write("2501.00090v1.pdf", "other paper")
+
+        dedup = Deduplicator()
+        result = dedup.deduplicate([v1, v2, other])
+
+        assert result.unique == [v2, other]
+        assert result.duplicates[v2][0]["source"] == v1
+        assert dedup.hits == 1 and dedup.misses == 2
+
+    def test_chained_duplicates_point_to_kept_paper(self):
+        """Test a copy of an old version points at the latest version."""
+        v1 = self._write("2501.00089v1.pdf", "version one")
+        copy = self._write("copy.pdf", "version one")
+        v2 = self._write("2501.00089v2.pdf", "version two")
+
+        result = Deduplicator().deduplicate([v1, copy, v2])
+
+        assert result.unique == [v2]
+        assert {d["source"] for d in result.duplicates[v2]} == {v1, copy}
+
+    def test_latest_version_wins_in_any_walk_order(self):
+        """Test a copy of the latest version never lets an older one win."""
+        v1 = self._write("2501.00089v1.pdf", "version one")
+        v2 = self._write("2501.00089v2.pdf", "version two")
+        final = self._write("final.pdf", "version two")
+
+        for walk in ([final, v1, v2], [v1, v2, final], [v2, final, v1]):
+            result = Deduplicator().deduplicate(walk)
+
+            assert len(result.unique) == 1
+            assert Path(result.unique[0]).read_text() == "version two"
+            older = result.duplicates[result.unique[0]]
+            assert {
+                "source": v1,
+                "reason": "older version of arXiv:2501.00089",
+            } in older
+
+    def test_stream_yields_during_the_walk(self):
+        """Test unique papers come out before the walk has finished."""
+        a = self._write("a.txt", "same text")
+        v1 = self._write("2501.00089.pdf", "version one")
+        b = self._write("b.txt", "same text")
+        v2 = self._write("2501.00089v2.pdf", "version two")
+        c = self._write("c.txt", "different!")
+        walked = []
+
+        def walk():
+            for source in (a, v1, b, v2, c):
+                walked.append(source)
+                yield source
+
+        duplicates = {}
+        stream = Deduplicator().stream(walk(), duplicates)
+
+        assert next(stream) == a and walked == [a]
+        # arXiv papers follow the walk, in case a later version turns up
+        assert list(stream) == [c, v2]
+        assert duplicates == {
+            a: [{"source": b, "reason": "identical content"}],
+            v2: [
+                {"source": v1, "reason": "older version of arXiv:2501.00089"}
+            ],
+        }
+
+    def test_file_hash_follows_file_versions(self):
+        """Test a file is hashed again only once it has changed."""
+        path = Path(self._write("a.txt", "first"))
+        first = file_hash(path)
+        with patch("builtins.open", side_effect=AssertionError):
+            assert file_hash(path) == first
+
+        path.write_text("other")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert file_hash(path) != first
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_each_file_is_hashed_once(self, mock_openai, mock_openai_response):
+        """Test dedup, coalescing and the object store share digests."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        papers = self.temp_dir / "papers"
+        papers.mkdir()
+        (papers / "a.txt").write_text("first text")
+        (papers / "b.txt").write_text("other text")
+
+        config = dict(DEFAULT_CONFIG, object_store=True)
+        _file_hash.cache_clear()
+        WinnowerProcessor(config, "openai").process(
+            str(papers), self.temp_dir / "out"
+        )
+
+        assert _file_hash.cache_info().misses == 2
+        assert _file_hash.cache_info().hits >= 4
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_processor_skips_duplicates(self, mock_openai, mock_openai_response):
+        """Test duplicates are sent to the LLM once and recorded."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        papers = self.temp_dir / "papers"
+        papers.mkdir()
+        (papers / "a.txt").write_text("same text")
+        (papers / "b.txt").write_text("same text")
+
+        processor = WinnowerProcessor(DEFAULT_CONFIG.copy(), "openai")
+        processor.process(str(papers), self.temp_dir / "out")
+
+        assert mock_client.chat.completions.create.call_count == 1
+        assert (self.temp_dir / "out" / "duplicates.json").exists()
+        assert processor.metrics.papers.value(status="skipped") == 1
@@ -0,0 +1,291 @@
+"""Tests for multi-worker distribution through a lease-file queue."""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.distributed import (
+    DistributedWorker,
+    LeaseQueue,
+    publish,
+    worker_config,
+)
+
+
+def _response():
+    response = Mock()
+    response.choices = [Mock()]
+    response.choices[0].message.content = "**Methods**: a test method."
+    response.usage.prompt_tokens = 100
+    response.usage.completion_tokens = 20
+    response.usage.prompt_tokens_details.cached_tokens = 0
+    return response
+
+
+def _run_worker(queue_root, output_dir, name):
+    with patch("winnower.extractors.openai.OpenAI") as mock_openai:
+        client = Mock()
+        client.chat.completions.create.return_value = _response()
+        mock_openai.return_value = client
+        config = worker_config(DEFAULT_CONFIG.copy())
+        processor = WinnowerProcessor(config, "openai")
+        DistributedWorker(
+            processor,
+            LeaseQueue(queue_root),
+            output_dir,
+            worker_id=name,
+            poll_interval_s=0.05,
+        ).run()
+        processor.close()
+
+
+class TestLeaseQueue:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.queue = LeaseQueue(self.temp_dir / "queue", lease_s=30)
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _expire(self, lease):
+        path = self.queue.leases_dir / f"{lease.key}.json"
+        data = json.loads(path.read_text())
+        data["expires_at"] = time.time() - 1
+        path.write_text(json.dumps(data))
+
+    def test_leases_are_exclusive(self):
+        """Test a paper is queued once and leased to one worker at a time."""
+        assert self.queue.enqueue("2501.00089")
+        assert not self.queue.enqueue("2501.00089")
+
+        lease = self.queue.acquire("a")
+        assert lease.source == "2501.00089"
+        assert self.queue.acquire("b") is None
+        assert self.queue.renew(lease)
+        assert self.queue.status()["leased"] == 1
+
+    def test_acquire_lists_tasks_once(self):
+        """Test the task directory is listed again only when run through."""
+        for i in range(5):
+            self.queue.enqueue(f"2501.0008{i}")
+
+        with patch.object(
+            Path, "glob", autospec=True, side_effect=Path.glob
+        ) as glob:
+            leases = [self.queue.acquire("a") for _ in range(5)]
+            assert glob.call_count == 1
+            assert self.queue.acquire("a") is None
+            assert glob.call_count == 2
+
+        assert len({lease.key for lease in leases}) == 5
+
+    def test_workers_do_not_share_a_store(self):
+        """Test workers store papers only in a database of their own."""
+        config = dict(DEFAULT_CONFIG, store=True)
+        assert not worker_config(config)["store"]
+        local = dict(config, store_path="/var/tmp/winnower.db")
+        assert worker_config(local)["store"]
+
+    def test_expired_lease_is_taken_over(self):
+        """Test a crashed worker's paper goes to another worker."""
+        self.queue.enqueue("2501.00089")
+        stale = self.queue.acquire("a")
+        self._expire(stale)
+
+        lease = self.queue.acquire("b")
+        assert lease is not None and lease.worker == "b"
+        assert not self.queue.renew(stale)
+
+    def test_commit_happens_once(self):
+        """Test only the first of two workers on a paper publishes."""
+        self.queue.enqueue("2501.00089")
+        output_dir = self.temp_dir / "out"
+        first = self.queue.acquire("a")
+        self._expire(first)
+        second = self.queue.acquire("b")
+
+        for lease in (first, second):
+            staging = self.queue.staging_for(lease)
+            (staging / "summaries").mkdir(parents=True)
+            (staging / "summaries" / "x_summary.md").write_text(lease.worker)
+
+        assert self.queue.commit(second, output_dir, {})
+        assert not self.queue.commit(first, output_dir, {})
+        summary = output_dir / "summaries" / "x_summary.md"
+        assert summary.read_text() == "b"
+        assert not self.queue.staging_for(first).exists()
+        assert self.queue.status()["remaining"] == 0
+        assert self.queue.acquire("c") is None
+
+    def test_recover_interrupted_commit(self):
+        """Test a commit cut short by a crash is finished later."""
+        self.queue.enqueue("paper.pdf")
+        lease = self.queue.acquire("a")
+        staging = self.queue.staging_for(lease)
+        (staging / "summaries").mkdir(parents=True)
+        (staging / "summaries" / "p_summary.md").write_text("summary")
+        marker = self.queue.done_dir / f"{lease.key}.json"
+        marker.write_text(
+            json.dumps(
+                {
+                    "status": "committing",
+                    "started_at": time.time() - 60,
+                    "staging": str(staging),
+                    "output_dir": str(self.temp_dir / "out"),
+                }
+            )
+        )
+
+        assert self.queue.recover() == 1
+        assert (self.temp_dir / "out" / "summaries" / "p_summary.md").exists()
+        assert json.loads(marker.read_text())["status"] == "committed"
+
+    def test_publish_again_appends_records_once(self):
+        """Test rerunning an interrupted publish does not duplicate lines."""
+        staging = self.temp_dir / "staging"
+        staging.mkdir()
+        output_dir = self.temp_dir / "out"
+        output_dir.mkdir()
+        (output_dir / "papers.jsonl").write_text('{"source": "old"}\n')
+        record = '{"source": "new"}\n'
+        (staging / "papers.jsonl").write_text(record)
+
+        # A crash after the append, before staging was cleaned up
+        with patch.object(Path, "unlink", side_effect=OSError("crash")):
+            with pytest.raises(OSError):
+                publish(staging, output_dir)
+        assert (staging / "papers.jsonl").exists()
+        # The crashed worker's append lock goes stale
+        lock = output_dir / ".papers.jsonl.lock"
+        assert lock.exists()
+        os.utime(lock, (0, 0))
+        publish(staging, output_dir)
+
+        lines = (output_dir / "papers.jsonl").read_text().splitlines()
+        assert lines == ['{"source": "old"}', '{"source": "new"}']
+        assert not list(staging.iterdir())
+        assert not lock.exists()
+
+    def test_publish_waits_for_append_lock(self):
+        """Test a worker appends only once another has released the lock."""
+        staging = self.temp_dir / "staging"
+        staging.mkdir()
+        output_dir = self.temp_dir / "out"
+        output_dir.mkdir()
+        (staging / "papers.jsonl").write_text('{"source": "new"}\n')
+        lock = output_dir / ".papers.jsonl.lock"
+        lock.touch()
+
+        thread = threading.Thread(target=publish, args=(staging, output_dir))
+        thread.start()
+        time.sleep(0.3)
+        assert not (output_dir / "papers.jsonl").exists()
+        lock.unlink()
+        thread.join(5)
+
+        assert not thread.is_alive()
+        assert (output_dir / "papers.jsonl").read_text() == (
+            '{"source": "new"}\n'
+        )
+
+    def test_failed_paper_is_retried_then_given_up(self):
+        """Test failures are requeued until max_attempts, never published."""
+        queue = LeaseQueue(self.temp_dir / "queue", max_attempts=2)
+        queue.enqueue("2501.00089")
+
+        first = queue.acquire("a")
+        assert queue.fail(first, {})
+        assert queue.status()["remaining"] == 1
+        second = queue.acquire("b")
+        assert second is not None
+        assert not queue.fail(second, {})
+
+        marker = json.loads(
+            (queue.done_dir / f"{second.key}.json").read_text()
+        )
+        assert (marker["status"], marker["attempts"]) == ("failed", 2)
+        assert queue.acquire("c") is None
+        assert queue.status()["remaining"] == 0
+
+
+class TestDistributedWorkers:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_worker_processes_share_queue(self):
+        """Test several worker processes summarize every paper once."""
+        papers_dir = self.temp_dir / "papers"
+        papers_dir.mkdir()
+        queue_root = self.temp_dir / "queue"
+        output_dir = self.temp_dir / "out"
+        queue = LeaseQueue(queue_root)
+        for i in range(6):
+            paper = papers_dir / f"paper{i}.txt"
+            paper.write_text(f"Paper Number {i}\n\nContent of paper {i}.")
+            queue.enqueue(str(paper))
+
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(
+                target=_run_worker,
+                args=(queue_root, output_dir, f"worker-{i}"),
+            )
+            for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            assert worker.exitcode == 0
+
+        assert queue.status() == {
+            "tasks": 6,
+            "done": 6,
+            "leased": 0,
+            "remaining": 0,
+        }
+        summaries = sorted((output_dir / "summaries").iterdir())
+        assert len(summaries) == 6
+        markers = [
+            json.loads(path.read_text())
+            for path in queue.done_dir.glob("*.json")
+        ]
+        assert all(marker["status"] == "committed" for marker in markers)
+        assert not list(queue.staging_dir.iterdir())
+
+    def test_worker_does_not_commit_failed_papers(self):
+        """Test a paper that failed every attempt is never published."""
+        queue = LeaseQueue(self.temp_dir / "queue", max_attempts=2)
+        queue.enqueue(str(self.temp_dir / "missing.txt"))
+        output_dir = self.temp_dir / "out"
+        config = worker_config(DEFAULT_CONFIG.copy())
+        processor = WinnowerProcessor(config, "openai")
+        worker = DistributedWorker(
+            processor, queue, output_dir, poll_interval_s=0.05
+        )
+
+        worker.run()
+        processor.close()
+
+        assert (worker.committed, worker.failed) == (0, 2)
+        markers = list(queue.done_dir.glob("*.json"))
+        assert json.loads(markers[0].read_text())["status"] == "failed"
+        assert not (output_dir / "summaries").exists()
@@ -0,0 +1,152 @@
+"""Tests for reading arXiv papers from their LaTeX source."""
+
+import gzip
+import io
+import tarfile
+from unittest.mock import Mock, patch
+
+from winnower.latex import extract_latex
+from winnower.parsers import PaperParser
+
+MAIN = r"""\documentclass{article}
+\usepackage{amsmath}
+\title{Fast
+  Sampling\thanks{Funded.}}
+% \input{unused}
+\begin{document}
+\maketitle
+\begin{abstract}
+We sample fast.
+\end{abstract}
+\input{sections/method}
+\include{results}
+\bibliographystyle{plain}
+\bibliography{refs}
+\end{document}
+"""
+
+METHOD = r"""\section{Method}\label{sec:method}
+We minimize 50\% of the loss % only half
+\begin{equation}
+  L(\theta) = \sum_i \ell(x_i; \theta)
+\end{equation}
+\begin{figure}[t]
+  \includegraphics[width=\linewidth]{plot.pdf}
+  \caption{A plot.}
+\end{figure}
+"""
+
+RESULTS = r"""\section{Results}
+It works.
+\begin{thebibliography}{1}
+\bibitem{a} Someone. A paper.
+\end{thebibliography}
+"""
+
+
+def _tarball(files):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, text in files.items():
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+ARCHIVE = _tarball(
+    {
+        "main.tex": MAIN,
+        "sections/method.tex": METHOD,
+        "results.tex": RESULTS,
+        "style.sty": r"\documentclass{x}\begin{document}",
+    }
+)
+
+
+class TestExtractLatex:
+
+    def test_resolves_inputs_and_strips_noise(self):
+        """Test the main file is expanded and reduced to the paper text."""
+        paper = extract_latex(ARCHIVE)
+
+        assert paper["title"] == r"Fast Sampling\thanks{Funded.}"
+        assert paper["abstract"] == "We sample fast."
+        content = paper["content"]
+        assert content.startswith(r"\section{Method}")
+        assert r"L(\theta) = \sum_i \ell(x_i; \theta)" in content
+        assert r"50\% of the loss" in content
+        assert content.endswith(r"\section{Results}" + "\nIt works.")
+        for noise in [
+            "only half",
+            "unused",
+            "sec:method",
+            "plot.pdf",
+            "A plot",
+            "Someone",
+            "refs",
+            "maketitle",
+            "We sample fast",
+        ]:
+            assert noise not in content
+
+    def test_single_file_and_pdf_only_submissions(self):
+        """Test gzipped .tex is read and PDF-only e-prints are declined."""
+        single = gzip.compress(
+            b"\\documentclass{article}\\begin{document}"
+            b"Hello $x^2$.\\end{document}"
+        )
+
+        assert extract_latex(single)["content"] == "Hello $x^2$."
+        assert extract_latex(b"%PDF-1.5 binary") is None
+        assert extract_latex(_tarball({"figure.tex": METHOD})) is None
+
+
+class TestParseArxivSource:
+
+    def setup_method(self):
+        self.parser = PaperParser(config={"arxiv_source": True})
+
+    def _parse(self, source):
+        result = Mock(
+            title="Fast Sampling",
+            authors=["Ada Lovelace"],
+            summary="We sample fast.",
+            entry_id="http://arxiv.org/abs/2501.00089v1",
+        )
+        response = Mock(status_code=200, content=source)
+        with patch("winnower.parsers.arxiv.Search") as search, patch(
+            "winnower.parsers.requests.get", return_value=response
+        ) as get, patch.object(
+            self.parser, "_extract_pdf_text", return_value="PDF text"
+        ) as pdf, patch.object(
+            self.parser, "_fetch_arxiv", return_value={
+                "title": "Fast Sampling",
+                "authors": ["Ada Lovelace"],
+                "abstract": "We sample fast.",
+                "url": "http://arxiv.org/abs/2501.00089v1",
+                "pdf": b"%PDF",
+            }
+        ):
+            search.return_value.results.side_effect = lambda: iter([result])
+            paper = self.parser.parse("2501.00089")
+        return paper, get, pdf
+
+    def test_source_replaces_pdf_conversion(self):
+        """Test papers with source never have their PDF converted."""
+        paper, get, pdf = self._parse(ARCHIVE)
+
+        assert get.call_args[0][0] == "https://arxiv.org/e-print/2501.00089"
+        pdf.assert_not_called()
+        assert paper["title"] == "Fast Sampling"
+        assert paper["authors"] == ["Ada Lovelace"]
+        assert paper["source"] == "arXiv:2501.00089"
+        assert r"\begin{equation}" in paper["content"]
+
+    def test_falls_back_to_pdf(self):
+        """Test PDF-only submissions are converted as before."""
+        paper, _, pdf = self._parse(b"%PDF-1.5")
+
+        pdf.assert_called_once()
+        assert paper["content"] == "PDF text"
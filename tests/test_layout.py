@@ -0,0 +1,82 @@
+"""Tests for the sharded output layout."""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.layout import ShardedLayout, paper_id, slugify
+
+
+class TestShardedLayout:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_slugify(self):
+        """Test titles become short ASCII slugs."""
+        assert slugify("Attention Is All You Need!") == "attention-is-all-you-need"
+        assert slugify("Über α") == "ber"
+        assert slugify("???") == "untitled"
+        assert len(slugify("word " * 50)) <= 60
+
+    def test_paper_id(self):
+        """Test arXiv papers use their ID and others a content hash."""
+        assert paper_id("2501.00089v2", {}) == "arxiv-2501.00089"
+        assert (
+            paper_id("paper.pdf", {"url": "https://arxiv.org/abs/2501.00089"})
+            == "arxiv-2501.00089"
+        )
+        a = paper_id("a.pdf", {"content": "text one"})
+        assert a.startswith("sha-")
+        assert a == paper_id("b.pdf", {"content": "text one"})
+        assert a != paper_id("a.pdf", {"content": "text two"})
+
+    def test_similar_titles_do_not_collide(self):
+        """Test papers sharing a long title prefix get distinct paths."""
+        layout = ShardedLayout(self.temp_dir)
+        title = "A Very Long Title That Goes On And On Beyond Fifty Characters"
+        first = layout.paths("a.pdf", {"title": title + " I", "content": "a"})
+        second = layout.paths("b.pdf", {"title": title + " II", "content": "b"})
+
+        assert first["summary"] != second["summary"]
+        assert first["summary"].parent.parent == self.temp_dir / "summaries"
+        assert len(first["summary"].parent.name) == 2
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_processor_writes_sharded_outputs(
+        self, mock_openai, mock_openai_response
+    ):
+        """Test a sharded run writes every paper and indexes it."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        papers = self.temp_dir / "papers"
+        (papers / "one").mkdir(parents=True)
+        (papers / "two").mkdir()
+        # Same file name, so flat output would overwrite one with the other
+        (papers / "one" / "paper.txt").write_text("first paper")
+        (papers / "two" / "paper.txt").write_text("second paper")
+
+        config = DEFAULT_CONFIG.copy()
+        config["output_layout"] = "sharded"
+        output_dir = self.temp_dir / "out"
+        WinnowerProcessor(config, "openai").process(
+            str(papers), output_dir, recursive=True
+        )
+
+        lines = (output_dir / "index.jsonl").read_text().splitlines()
+        entries = [json.loads(line) for line in lines]
+        assert len({e["id"] for e in entries}) == 2
+        for entry in entries:
+            for kind in ["original", "extracted", "summary"]:
+                assert (output_dir / entry[kind]).is_file()
+        assert len(list((output_dir / "summaries").rglob("*.md"))) == 2
@@ -0,0 +1,217 @@
+"""Tests for several summary lengths from one model call."""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from winnower.cli import main
+from winnower.core import WinnowerProcessor
+from winnower.config import DEFAULT_CONFIG
+from winnower.extractors import TechnicalExtractor, split_summaries
+
+PAPER = {
+    "title": "Test Paper",
+    "authors": [],
+    "source": "test.txt",
+    "url": "",
+    "abstract": "",
+    "content": "Some technical content.",
+}
+
+GOOD_SUMMARY = (
+    "The method minimizes a contrastive loss $L = -\\log p(x)$ with a "
+    "two-stage optimization algorithm. " * 6
+)
+
+SUMMARIES = {
+    "100": GOOD_SUMMARY,
+    "500": GOOD_SUMMARY * 5,
+}
+
+
+def response(text):
+    mock = Mock()
+    mock.choices = [Mock()]
+    mock.choices[0].message.content = text
+    mock.choices[0].finish_reason = "stop"
+    mock.usage.prompt_tokens = 100
+    mock.usage.completion_tokens = 50
+    mock.usage.prompt_tokens_details.cached_tokens = 0
+    return mock
+
+
+class TestSplitSummaries:
+
+    def test_reply_with_every_length(self):
+        """Test a fenced JSON reply is split by length."""
+        reply = "```json\n" + json.dumps(SUMMARIES) + "\n```"
+
+        summaries = split_summaries(reply, [100, 500])
+
+        assert summaries == {
+            100: GOOD_SUMMARY.strip(),
+            500: (GOOD_SUMMARY * 5).strip(),
+        }
+
+    def test_unescaped_latex(self):
+        """Test LaTeX the model did not escape is kept as written."""
+        reply = (
+            "Here are the summaries.\n```json\n"
+            r'{"100": "We minimize $\frac{1}{2}\|x\|^2 + \alpha\theta$'
+            r' over \beta.", "500": "Escaped $\\rho$ stays.\nNext line."}'
+            "\n```\nLet me know if {this} helps."
+        )
+
+        summaries = split_summaries(reply, [100, 500])
+
+        assert summaries == {
+            100: r"We minimize $\frac{1}{2}\|x\|^2 + \alpha\theta$"
+            r" over \beta.",
+            500: r"Escaped $\rho$ stays." + "\nNext line.",
+        }
+        unfenced = r'{"100": "A $\sum_i \tau_i$ bound."}'
+        assert split_summaries(unfenced, [100]) == {
+            100: r"A $\sum_i \tau_i$ bound."
+        }
+
+    def test_unescaped_latex_starting_with_n(self):
+        """Test \\nu and \\nabla are LaTeX, not a newline and text."""
+        reply = (
+            r'{"100": "Viscosity $\nu$ and $\nabla f \neq 0$.",'
+            r' "500": "Escaped $\\nu$ stays.\nNext line.\nnot LaTeX."}'
+        )
+
+        assert split_summaries(reply, [100, 500]) == {
+            100: r"Viscosity $\nu$ and $\nabla f \neq 0$.",
+            500: r"Escaped $\nu$ stays." + "\nNext line.\nnot LaTeX.",
+        }
+
+    def test_incomplete_replies(self):
+        """Test replies missing a length or not JSON are rejected."""
+        assert split_summaries(json.dumps(SUMMARIES), [100, 200]) is None
+        assert split_summaries("Just a summary.", [100]) is None
+        assert split_summaries('{"100": ""}', [100]) is None
+
+
+class TestSummaryLengths:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_one_request_for_all_lengths(self, mock_openai):
+        """Test the paper is sent once and every length comes back."""
+        client = Mock()
+        client.chat.completions.create.return_value = response(
+            json.dumps(SUMMARIES)
+        )
+        mock_openai.return_value = client
+
+        config = {"summary_lengths": [500, 100], "summary_length": 200}
+        result = TechnicalExtractor("openai", config).extract(PAPER)
+
+        assert client.chat.completions.create.call_count == 1
+        request = client.chat.completions.create.call_args.kwargs
+        assert request["response_format"] == {"type": "json_object"}
+        prompt = request["messages"][1]["content"]
+        assert "approximately 100 and 500 words" in prompt
+        assert '{"100": "...", "500": "..."}' in prompt
+        assert set(result["summaries"]) == {100, 500}
+        # Without 200 among the lengths, the longest is the main summary
+        assert result["technical_content"] == result["summaries"][500]
+        assert result["error"] is None
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_malformed_reply_fails(self, mock_openai):
+        """Test a reply that cannot be split is reported as an error."""
+        client = Mock()
+        client.chat.completions.create.return_value = response(GOOD_SUMMARY)
+        mock_openai.return_value = client
+
+        config = {"summary_lengths": [100, 500]}
+        result = TechnicalExtractor("openai", config).extract(PAPER)
+
+        assert result["summaries"] is None
+        assert "every requested length" in result["error"]
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_cascade_checks_each_length(self, mock_openai):
+        """Test the cheap tier is judged on every summary it returned."""
+        short = dict(SUMMARIES, **{"500": GOOD_SUMMARY})
+
+        def create(**request):
+            if request["model"] == "gpt-4.1-nano":
+                return response(json.dumps(short))
+            return response(json.dumps(SUMMARIES))
+
+        client = Mock()
+        client.chat.completions.create.side_effect = create
+        mock_openai.return_value = client
+
+        config = {
+            "summary_lengths": [100, 500],
+            "cascade_model": "gpt-4.1-nano",
+        }
+        extractor = TechnicalExtractor("openai", config)
+        result = extractor.extract(PAPER)
+
+        assert result["tier"] == "full"
+        assert result["cascade"]["failed_checks"] == ["too_short"]
+        assert result["summaries"][500] == (GOOD_SUMMARY * 5).strip()
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_writes_a_file_per_length(self, mock_openai):
+        """Test ``--lengths`` writes one summary file for each length."""
+        client = Mock()
+        client.chat.completions.create.return_value = response(
+            json.dumps(dict(SUMMARIES, **{"200": GOOD_SUMMARY * 2}))
+        )
+        mock_openai.return_value = client
+        paper = self.temp_dir / "paper.txt"
+        paper.write_text("Some technical content.")
+        output_dir = self.temp_dir / "out"
+
+        result = main(
+            [str(paper), "-o", str(output_dir), "--lengths", "100,200,500"]
+        )
+
+        assert result == 0
+        assert client.chat.completions.create.call_count == 1
+        files = sorted(p.name for p in output_dir.glob("summaries/*.md"))
+        assert files == [
+            "paper_summary_100w.md",
+            "paper_summary_200w.md",
+            "paper_summary_500w.md",
+        ]
+        summaries_dir = output_dir / "summaries"
+        text = (summaries_dir / "paper_summary_100w.md").read_text()
+        assert GOOD_SUMMARY.strip() in text
+        assert "{" not in text
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_dataset_records_every_length(self, mock_openai):
+        """Test JSONL records carry every summary, keyed by length."""
+        client = Mock()
+        client.chat.completions.create.return_value = response(
+            json.dumps(SUMMARIES)
+        )
+        mock_openai.return_value = client
+        paper = self.temp_dir / "paper.txt"
+        paper.write_text("Some technical content.")
+
+        config = dict(
+            DEFAULT_CONFIG, summary_lengths=[100, 500], output_format="jsonl"
+        )
+        processor = WinnowerProcessor(config, "openai")
+        processor.process(str(paper), self.temp_dir / "out")
+
+        line = (self.temp_dir / "out" / "papers.jsonl").read_text()
+        record = json.loads(line)
+        assert set(record["summaries"]) == {"100", "500"}
+        assert record["summary"] == record["summaries"]["500"]
@@ -0,0 +1,113 @@
+"""Tests for Prometheus metrics export."""
+
+import tempfile
+import urllib.request
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.metrics import (
+    MetricsRegistry,
+    MetricsServer,
+    TextfileExporter,
+    WinnowerMetrics,
+)
+from winnower.tracing import Span
+
+
+class TestMetrics:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_render_text_format(self):
+        """Test counters, gauges and histograms render as Prometheus text."""
+        registry = MetricsRegistry()
+        counter = registry.counter("c_total", "A counter.")
+        counter.inc(status="ok")
+        counter.inc(2, status="ok")
+        gauge = registry.gauge("g", "A gauge.")
+        gauge.set(5)
+        histogram = registry.histogram("h_seconds", "A histogram.", buckets=(1, 2))
+        histogram.observe(1.5)
+
+        text = registry.render()
+        assert "# TYPE c_total counter" in text
+        assert 'c_total{status="ok"} 3' in text
+        assert "g 5" in text
+        assert 'h_seconds_bucket{le="1"} 0' in text
+        assert 'h_seconds_bucket{le="2"} 1' in text
+        assert 'h_seconds_bucket{le="+Inf"} 1' in text
+        assert "h_seconds_count 1" in text
+
+    def test_gauge_track(self):
+        """Test track() counts in-flight work."""
+        gauge = MetricsRegistry().gauge("in_flight", "In flight.")
+        with gauge.track():
+            assert gauge.value() == 1
+        assert gauge.value() == 0
+
+    def test_observe_span(self):
+        """Test tracer spans feed stage latency and paper outcomes."""
+        metrics = WinnowerMetrics()
+        metrics.observe_span(Span("extract"))
+        failed = Span("paper")
+        failed.status = "failed"
+        metrics.observe_span(failed)
+        metrics.observe_span(Span("paper"))
+
+        assert metrics.papers.value(status="processed") == 1
+        assert metrics.papers.value(status="failed") == 1
+        assert 'stage="extract"' in metrics.registry.render()
+
+    def test_cache_ratio_export(self):
+        """Test watched caches export hit and miss counts."""
+        metrics = WinnowerMetrics()
+        metrics.watch_cache("cassette", Mock(hits=3, misses=1))
+
+        text = metrics.registry.render()
+        assert 'winnower_cache_requests_total{cache="cassette",result="hit"} 3' in text
+
+    def test_textfile_and_http_exporters(self):
+        """Test both exporters publish the registry."""
+        registry = MetricsRegistry()
+        registry.counter("x_total", "X.").inc()
+
+        path = self.temp_dir / "winnower.prom"
+        TextfileExporter(registry, path).write()
+        assert "x_total 1" in path.read_text()
+
+        server = MetricsServer(registry).start()
+        try:
+            url = f"http://127.0.0.1:{server.port}/metrics"
+            body = urllib.request.urlopen(url).read().decode()
+        finally:
+            server.stop()
+        assert "x_total 1" in body
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_processor_updates_metrics(self, mock_openai, mock_openai_response):
+        """Test a run updates paper counters and writes the textfile."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        paper = self.temp_dir / "paper.txt"
+        paper.write_text("Some technical content")
+        textfile = self.temp_dir / "metrics" / "winnower.prom"
+
+        config = DEFAULT_CONFIG.copy()
+        config["metrics_textfile"] = str(textfile)
+        processor = WinnowerProcessor(config, "openai")
+        processor.process(str(paper), self.temp_dir / "out")
+        processor.close()
+
+        assert processor.metrics.papers.value(status="processed") == 1
+        assert processor.metrics.llm_in_flight.value() == 0
+        assert 'winnower_papers_total{status="processed"} 1' in textfile.read_text()
@@ -0,0 +1,114 @@
+"""Tests for near-duplicate detection."""
+
+import random
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.neardup import MinHasher, NearDuplicateIndex, shingle_hashes
+
+
+def _paper(seed, words=600):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(2000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+class TestNearDuplicateIndex:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_signature_is_deterministic(self):
+        """Test signatures depend only on the text and seed."""
+        hashes = shingle_hashes(_paper(1))
+        assert MinHasher(seed=3).signature(hashes) == MinHasher(
+            seed=3
+        ).signature(hashes)
+        assert len(MinHasher(num_perm=64).signature(hashes)) == 64
+
+    def test_similar_text_matches(self):
+        """Test a lightly edited copy is found and an unrelated paper is not."""
+        index = NearDuplicateIndex(threshold=0.8)
+        original = _paper(1)
+        index.add("original", index.signature(original), {"title": "A"})
+
+        edited = original.replace("term1 ", "term1999 ", 1) + " camera ready"
+        match = index.best_match(index.signature(edited))
+        assert match is not None
+        assert match[0] == "original" and match[1] >= 0.8
+        assert match[2] == {"title": "A"}
+
+        assert index.best_match(index.signature(_paper(2))) is None
+        assert index.hits == 1 and index.misses == 1
+
+    def test_save_and_load(self):
+        """Test the index round-trips through its JSONL file."""
+        index = NearDuplicateIndex()
+        signature = index.signature(_paper(1))
+        index.add("a", signature, {"summary": "a_summary.md"})
+        path = self.temp_dir / "near_duplicates.jsonl"
+        index.save(path)
+
+        loaded = NearDuplicateIndex()
+        loaded.load(path)
+        assert len(loaded) == 1
+        assert loaded.best_match(signature)[0] == "a"
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_forks_share_index(self, mock_openai):
+        """Test service workers use one index and load its file once."""
+        config = DEFAULT_CONFIG.copy()
+        config["near_duplicates"] = "skip"
+        processor = WinnowerProcessor(config, "openai")
+        fork = processor.fork()
+        assert fork.near_duplicates is processor.near_duplicates
+
+        index = processor.near_duplicates
+        index.add("a", index.signature(_paper(1)))
+        path = self.temp_dir / "near_duplicates.jsonl"
+        index.save(path)
+        index.add("b", index.signature(_paper(2)))
+        with patch("builtins.open", side_effect=AssertionError):
+            fork._load_near_duplicates(path)
+        assert len(index) == 2
+
+    def test_from_config(self):
+        """Test detection is off unless configured."""
+        assert NearDuplicateIndex.from_config(DEFAULT_CONFIG) is None
+        index = NearDuplicateIndex.from_config(
+            {"near_duplicates": "skip", "near_duplicate_threshold": 0.7}
+        )
+        assert index.threshold == 0.7
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_processor_reuses_summary(self, mock_openai, mock_openai_response):
+        """Test a near-duplicate gets the earlier summary without an LLM call."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        papers = self.temp_dir / "papers"
+        papers.mkdir()
+        text = _paper(1, words=2000)
+        (papers / "a_preprint.txt").write_text(text)
+        (papers / "b_final.txt").write_text(text + " camera ready version")
+
+        config = DEFAULT_CONFIG.copy()
+        config["near_duplicates"] = "reuse"
+        output_dir = self.temp_dir / "out"
+        processor = WinnowerProcessor(config, "openai")
+        processor.process(str(papers), output_dir)
+
+        assert mock_client.chat.completions.create.call_count == 1
+        reused = output_dir / "summaries" / "b_final_summary.md"
+        assert "Near-duplicate of" in reused.read_text()
+        assert processor.metrics.papers.value(status="skipped") == 1
+        assert (output_dir / "near_duplicates.jsonl").exists()
@@ -0,0 +1,104 @@
+"""Tests for the content-addressed object store."""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.objects import (
+    ZSTANDARD_AVAILABLE,
+    ObjectStore,
+    link_or_copy,
+    read_text,
+)
+
+
+class TestObjectStore:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.objects = ObjectStore(self.temp_dir / "objects")
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_put_file_is_content_addressed(self):
+        """Test identical files share one object that is linked, not copied."""
+        a = self.temp_dir / "a.pdf"
+        b = self.temp_dir / "b.PDF"
+        a.write_bytes(b"%PDF same bytes")
+        b.write_bytes(b"%PDF same bytes")
+
+        first = self.objects.put_file(a)
+        second = self.objects.put_file(b)
+
+        assert first == second
+        assert first.suffix == ".pdf"
+        assert first.parent.name == first.name[:2]
+        assert first.read_bytes() == b"%PDF same bytes"
+        assert self.objects.misses == 1 and self.objects.hits == 1
+
+    def test_link_or_copy_prefers_links(self):
+        """Test originals are reflinked or hard-linked on one filesystem."""
+        src = self.temp_dir / "src.pdf"
+        src.write_bytes(b"data")
+        method = link_or_copy(src, self.temp_dir / "dst.pdf")
+        assert method in ("reflink", "hardlink")
+        assert (self.temp_dir / "dst.pdf").read_bytes() == b"data"
+
+    def test_text_is_compressed(self):
+        """Test extracted text is stored compressed and reads back."""
+        text = "A long extracted paper. " * 1000
+        path = self.objects.put_text(text)
+
+        assert path.name.endswith(".md.gz")
+        assert path.stat().st_size < len(text) / 10
+        assert read_text(path) == text
+        assert self.objects.put_text(text) == path
+
+    @pytest.mark.skipif(not ZSTANDARD_AVAILABLE, reason="zstandard missing")
+    def test_zstd_text(self):
+        """Test zstd-compressed text reads back."""
+        objects = ObjectStore(self.temp_dir / "zst", compression="zstd")
+        path = objects.put_text("zstd text")
+        assert path.name.endswith(".md.zst")
+        assert read_text(path) == "zstd text"
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_processor_uses_object_store(
+        self, mock_openai, mock_openai_response
+    ):
+        """Test runs reference originals by hash instead of copying them."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        papers = self.temp_dir / "papers"
+        papers.mkdir()
+        (papers / "a.txt").write_text("first paper text")
+
+        config = DEFAULT_CONFIG.copy()
+        config["object_store"] = True
+        output_dir = self.temp_dir / "out"
+        processor = WinnowerProcessor(config, "openai")
+        processor.process(str(papers), output_dir)
+        processor.process(str(papers), output_dir)
+
+        assert not (output_dir / "papers").exists()
+        assert not (output_dir / "extracted").exists()
+        assert len(list((output_dir / "summaries").iterdir())) == 1
+
+        manifest = (output_dir / "objects" / "manifest.jsonl").read_text()
+        entry = json.loads(manifest.splitlines()[-1])
+        assert entry["source"] == str(papers / "a.txt")
+        assert read_text(output_dir / entry["extracted"]) == "first paper text"
+        assert (output_dir / entry["original"]).read_text() == (
+            "first paper text"
+        )
+        assert processor.objects.hits == 2
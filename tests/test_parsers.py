@@ -4,6 +4,11 @@ import pytest
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+from winnower.extractors import (
+    CHARS_PER_TOKEN,
+    TRUNCATION_MARKER,
+    TechnicalExtractor,
+)
 from winnower.parsers import PaperParser
 
 
@@ -41,9 +46,44 @@ class TestPaperParser:
         assert result["authors"] == []
         assert result["abstract"] == ""
 
+    def test_long_pdf_is_streamed_up_to_budget(self, tmp_path):
+        """Test long PDFs stop converting once the budget is filled."""
+        pymupdf = pytest.importorskip("pymupdf")
+        pdf_path = tmp_path / "long.pdf"
+        doc = pymupdf.open()
+        for number in range(30):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Page {number} of the method.")
+            page.insert_text((72, 96), "Second line.")
+        doc.save(str(pdf_path))
+        doc.close()
+
+        config = {
+            "pdf_to_markdown": False,
+            "stream_pdf_pages": 10,
+            "max_content_tokens": 100,
+        }
+        with patch.object(
+            pymupdf.Page,
+            "get_text",
+            autospec=True,
+            side_effect=pymupdf.Page.get_text,
+        ) as get_text:
+            paper = PaperParser(config=config).parse(str(pdf_path))
+
+        content = paper["content"]
+        assert get_text.call_count < 15
+        assert "Page 0 of the method.\nSecond line." in content
+        assert "Page 29" not in content
+        assert content.endswith(TRUNCATION_MARKER)
+        budget = 100 * CHARS_PER_TOKEN
+        assert len(content) < 2 * budget
+        prepared = TechnicalExtractor(config=config, connect=False)
+        assert prepared.prepare_content(content).endswith(TRUNCATION_MARKER)
+
     def test_find_papers_in_directory(self):
         """Test finding papers in directory."""
-        papers = self.parser.find_papers_in_directory(self.fixtures_dir)
+        papers = list(self.parser.find_papers_in_directory(self.fixtures_dir))
         assert len(papers) >= 2  # Should find our test fixtures
 
         # Check that it finds the specific files we created
@@ -51,6 +91,77 @@ class TestPaperParser:
         assert "sample_ml_paper.txt" in filenames
         assert "sample_physics_paper.txt" in filenames
 
+    def test_find_papers_survives_symlink_cycles(self, tmp_path):
+        """Test symlinked directories are walked once, cycles and all."""
+        (tmp_path / "drafts").mkdir()
+        (tmp_path / "drafts" / "a.pdf").write_text("x")
+        (tmp_path / "drafts" / "loop").symlink_to(tmp_path)
+        (tmp_path / "shared").symlink_to(tmp_path / "drafts")
+
+        found = self.parser.find_papers_in_directory(tmp_path, recursive=True)
+
+        assert [p.name for p in found] == ["a.pdf"]
+
+    def test_find_papers_walks_once_with_filters(self, tmp_path):
+        """Test the directory walk honors depth, globs and skipped dirs."""
+        files = [
+            "a.pdf",
+            "b.TXT",
+            "notes.csv",
+            "drafts/c.md",
+            "drafts/old/d.pdf",
+            ".git/e.txt",
+            "winnower_output/summaries/f.md",
+            "vendor/g.pdf",
+        ]
+        for name in files:
+            path = tmp_path / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x")
+
+        def names(**kwargs):
+            found = self.parser.find_papers_in_directory(tmp_path, **kwargs)
+            return [p.relative_to(tmp_path).as_posix() for p in found]
+
+        assert names() == ["a.pdf", "b.TXT"]
+        assert names(recursive=True) == [
+            "a.pdf",
+            "b.TXT",
+            "drafts/c.md",
+            "drafts/old/d.pdf",
+            "vendor/g.pdf",
+        ]
+        assert names(recursive=True, max_depth=1) == [
+            "a.pdf",
+            "b.TXT",
+            "drafts/c.md",
+            "vendor/g.pdf",
+        ]
+        assert names(recursive=True, exclude=["vendor", "*.TXT"]) == [
+            "a.pdf",
+            "drafts/c.md",
+            "drafts/old/d.pdf",
+        ]
+        assert names(recursive=True, include=["drafts/*"]) == [
+            "drafts/c.md",
+            "drafts/old/d.pdf",
+        ]
+        assert names(recursive=True, skip=[tmp_path / "drafts"]) == [
+            "a.pdf",
+            "b.TXT",
+            "vendor/g.pdf",
+        ]
+
+        # A single changed file is judged the same way as the walk
+        for kwargs in [{}, {"recursive": True}]:
+            kwargs["skip"] = [tmp_path / "drafts" / "old"]
+            accepted = [
+                name
+                for name in files
+                if self.parser.accepts(tmp_path / name, tmp_path, **kwargs)
+            ]
+            assert accepted == names(**kwargs)
+
     def test_extract_arxiv_id_from_url(self):
         """Test extracting arXiv ID from URLs."""
         assert (
@@ -0,0 +1,156 @@
+"""Tests for the dry-run capacity planner."""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from winnower.cli import main
+from winnower.config import DEFAULT_CONFIG
+from winnower.extractors import TechnicalExtractor
+from winnower.planner import CapacityPlanner, request_tokens
+from winnower.routing import Route
+
+
+class TestCapacityPlanner:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.papers_dir = self.temp_dir / "papers"
+        self.papers_dir.mkdir()
+        self.output_dir = self.temp_dir / "out"
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _paper(self, name, words):
+        path = self.papers_dir / name
+        path.write_text(f"{path.stem}\n\n" + "method " * words)
+        return path
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_counts_the_requests_a_run_would_send(self, mock_openai):
+        """Test tokens come from the extractor's own prompts, offline."""
+        small = self._paper("small.txt", 500)
+        self._paper("large.txt", 30000)
+        (self.papers_dir / "copy.txt").write_bytes(small.read_bytes())
+
+        config = DEFAULT_CONFIG.copy()
+        plan = CapacityPlanner(config).plan(self.papers_dir, self.output_dir)
+
+        mock_openai.assert_not_called()
+        assert plan["papers"] == 3
+        assert plan["duplicates"] == 1
+        assert plan["planned"] == 2
+        assert plan["truncated"] == 1
+
+        extractor = TechnicalExtractor(config=config, connect=False)
+        route = Route("openai", config["openai_model"])
+        expected = 0
+        for name in ("large.txt", "copy.txt"):
+            path = self.papers_dir / name
+            content = extractor.prepare_content(path.read_text())
+            prompt = extractor.build_prompt(path.stem, content)
+            expected += request_tokens(extractor.build_request(route, prompt))
+        assert plan["tokens"]["input"] == expected
+        assert plan["cost_usd"]["estimate"] > 0
+        saved = json.loads((self.output_dir / "plan.json").read_text())
+        assert saved["tokens"] == plan["tokens"]
+
+    def test_reuses_parsed_papers(self):
+        """Test planning again only parses papers it has not seen."""
+        self._paper("a.txt", 100)
+        planner = CapacityPlanner(DEFAULT_CONFIG.copy())
+        first = planner.plan(self.papers_dir, self.output_dir)
+        self._paper("b.txt", 100)
+        second = planner.plan(self.papers_dir, self.output_dir)
+
+        assert first["text_cache"] == {"hits": 0, "misses": 1}
+        assert second["text_cache"] == {"hits": 1, "misses": 1}
+
+        # Another model's requests are counted by reading papers again
+        config = dict(DEFAULT_CONFIG, cascade_model="gpt-4.1-nano")
+        third = CapacityPlanner(config).plan(self.papers_dir, self.output_dir)
+        assert third["text_cache"] == {"hits": 0, "misses": 2}
+        assert [r["tier"] for r in third["routes"]] == ["full", "cheap"]
+        assert third["cost_usd"]["low"] < third["cost_usd"]["estimate"]
+        assert third["cost_usd"]["estimate"] < third["cost_usd"]["high"]
+
+    def test_rate_limits_bound_wall_time(self):
+        """Test wall time is limited by the slowest of its bounds."""
+        for i in range(4):
+            self._paper(f"p{i}.txt", 100 * (i + 1))
+        config = dict(DEFAULT_CONFIG, workers=4, rate_limit_rpm=2)
+        plan = CapacityPlanner(config).plan(self.papers_dir, self.output_dir)
+
+        wall = plan["wall_time_s"]
+        assert wall["bound_by"] == "rpm"
+        assert wall["estimate"] == 120.0
+        assert wall["bounds"]["latency"] < wall["estimate"]
+
+    def test_quotas_leave_papers_over(self):
+        """Test papers beyond every route's quota are reported."""
+        for i in range(5):
+            self._paper(f"p{i}.txt", 100 + i)
+        config = dict(
+            DEFAULT_CONFIG,
+            routes=[
+                {"provider": "openai", "model": "gpt-4.1-mini", "quota": 2},
+                {
+                    "provider": "anthropic",
+                    "model": "claude-3-5-haiku",
+                    "quota": 1,
+                },
+            ],
+        )
+        plan = CapacityPlanner(config).plan(self.papers_dir, self.output_dir)
+
+        assert plan["requests"] == 3
+        assert plan["over_quota"] == 2
+
+    def test_plans_every_active_profile(self):
+        """Test each profile's requests are sized with its own settings."""
+        paper = self._paper("a.txt", 300)
+        config = dict(
+            DEFAULT_CONFIG,
+            profiles={
+                "brief": {"summary_length": 50, "openai_model": "gpt-4.1"},
+                "detailed": {
+                    "summary_length": 500,
+                    "extraction_prompt": "Explain {title}:\n{content}",
+                },
+                "unused": {"summary_length": 100},
+            },
+            active_profiles=["brief", "detailed"],
+        )
+        plan = CapacityPlanner(config).plan(str(paper), self.output_dir)
+
+        assert plan["profiles"] == ["brief", "detailed"]
+        assert [r["route"] for r in plan["routes"]] == [
+            "brief/openai:gpt-4.1",
+            f"detailed/openai:{config['openai_model']}",
+        ]
+        assert plan["requests"] == 2
+
+        single = CapacityPlanner(DEFAULT_CONFIG.copy()).plan(
+            str(paper), self.temp_dir / "single"
+        )
+        brief, detailed = plan["routes"]
+        assert brief["output_tokens"] < detailed["output_tokens"]
+        assert detailed["input_tokens"] < single["tokens"]["input"]
+        assert plan["tokens"]["input"] == round(
+            brief["input_tokens"] + detailed["input_tokens"]
+        )
+
+    def test_plan_command(self, capsys):
+        """Test ``winnower plan`` prints and saves the plan."""
+        paper = self._paper("a.txt", 100)
+        result = main(
+            ["plan", str(paper), "-o", str(self.output_dir), "--tpm", "1000"]
+        )
+
+        assert result == 0
+        assert "bound by tpm" in capsys.readouterr().out
+        assert (self.output_dir / "plan.json").exists()
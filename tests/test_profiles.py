@@ -0,0 +1,171 @@
+"""Tests for multi-profile runs."""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from winnower.cli import main
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.profiles import load_profiles
+
+
+def response(text):
+    mock = Mock()
+    mock.choices = [Mock()]
+    mock.choices[0].message.content = text
+    mock.choices[0].finish_reason = "stop"
+    mock.usage.prompt_tokens = 100
+    mock.usage.completion_tokens = 50
+    mock.usage.prompt_tokens_details.cached_tokens = 0
+    return mock
+
+
+def create(**request):
+    """Answer with the prompt's first line, telling profiles apart."""
+    prompt = request["messages"][1]["content"]
+    return response(f"Summary for {prompt.splitlines()[0]}")
+
+
+class TestLoadProfiles:
+
+    def test_profiles_override_the_run_config(self):
+        """Test each profile applies its settings over the run's."""
+        config = dict(
+            DEFAULT_CONFIG,
+            prompt_file="base.txt",
+            profiles={
+                "physics": {"prompt_file": "physics.txt"},
+                "ml": {
+                    "provider": "anthropic",
+                    "extraction_prompt": "ML: {title} {content} {length}",
+                    "summary_length": 300,
+                },
+            },
+        )
+
+        physics, ml = load_profiles(config, "openai")
+
+        assert (physics.name, physics.provider) == ("physics", "openai")
+        assert physics.config["prompt_file"] == "physics.txt"
+        assert ml.provider == "anthropic"
+        assert ml.config["summary_length"] == 300
+        assert ml.config["prompt_file"] is None
+        active = load_profiles(dict(config, active_profiles=["ml"]))
+        assert [profile.name for profile in active] == ["ml"]
+        assert load_profiles(DEFAULT_CONFIG) == []
+
+    def test_invalid_profiles(self):
+        """Test unknown names, settings and providers are rejected."""
+        config = {"profiles": {"ml": {}}}
+        with pytest.raises(ValueError, match="Unknown profile"):
+            load_profiles(dict(config, active_profiles=["physics"]))
+        with pytest.raises(ValueError, match="cannot set max_content_tokens"):
+            load_profiles({"profiles": {"ml": {"max_content_tokens": 10}}})
+        with pytest.raises(ValueError, match="unsupported provider"):
+            load_profiles({"profiles": {"ml": {"provider": "other"}}})
+        with pytest.raises(ValueError, match="Invalid profile name"):
+            load_profiles({"profiles": {"../ml": {}}})
+
+
+class TestMultiProfileRun:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.output_dir = self.temp_dir / "out"
+        self.paper = self.temp_dir / "paper.txt"
+        self.paper.write_text("We propose a sampler.")
+        for name in ("physics", "ml"):
+            (self.temp_dir / f"{name}.txt").write_text(
+                name.upper() + " {title}\n{content}\n{length}"
+            )
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _config(self, **overrides):
+        profiles = {
+            name: {"prompt_file": str(self.temp_dir / f"{name}.txt")}
+            for name in ("physics", "ml")
+        }
+        profiles["ml"]["openai_model"] = "gpt-4.1-nano"
+        return dict(DEFAULT_CONFIG, profiles=profiles, **overrides)
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_one_parse_and_a_summary_per_profile(self, mock_openai):
+        """Test each paper is parsed once and summarized per profile."""
+        client = Mock()
+        client.chat.completions.create.side_effect = create
+        mock_openai.return_value = client
+
+        processor = WinnowerProcessor(self._config(), "openai")
+        with patch.object(
+            processor.parser, "parse", wraps=processor.parser.parse
+        ) as parse:
+            processor.process(str(self.paper), self.output_dir)
+
+        parse.assert_called_once()
+        models = sorted(
+            call.kwargs["model"]
+            for call in client.chat.completions.create.call_args_list
+        )
+        assert models == ["gpt-4.1-mini-2025-04-14", "gpt-4.1-nano"]
+        for name in ("physics", "ml"):
+            summary = (
+                self.output_dir / "summaries" / name / "paper_summary.md"
+            ).read_text()
+            assert f"Summary for {name.upper()} paper" in summary
+        assert not list((self.output_dir / "summaries").glob("*.md"))
+
+        report = json.loads((self.output_dir / "run_report.json").read_text())
+        assert set(report["profiles"]) == {"physics", "ml"}
+        paper = report["papers"][0]
+        assert set(paper["profiles"]) == {"physics", "ml"}
+        # Spans opened in the profiles' threads still count for the paper
+        assert "extract" in paper["stages"]
+        assert report["usage"]["total"]["requests"] == 2
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_records_per_profile(self, mock_openai):
+        """Test dataset output holds one record per paper and profile."""
+        client = Mock()
+        client.chat.completions.create.side_effect = create
+        mock_openai.return_value = client
+
+        config = self._config(output_format="jsonl")
+        WinnowerProcessor(config, "openai").process(
+            str(self.paper), self.output_dir
+        )
+
+        lines = (self.output_dir / "papers.jsonl").read_text().splitlines()
+        records = {r["profile"]: r for r in map(json.loads, lines)}
+        assert set(records) == {"physics", "ml"}
+        assert records["ml"]["summary"] == "Summary for ML paper"
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_profiles_option(self, mock_openai):
+        """Test ``--profiles`` defines profiles from prompt files."""
+        client = Mock()
+        client.chat.completions.create.side_effect = create
+        mock_openai.return_value = client
+
+        physics = self.temp_dir / "physics.txt"
+        result = main(
+            [
+                str(self.paper),
+                "-o",
+                str(self.output_dir),
+                "--profiles",
+                f"physics={physics}",
+            ]
+        )
+
+        assert result == 0
+        assert client.chat.completions.create.call_count == 1
+        summaries = list((self.output_dir / "summaries").rglob("*.md"))
+        assert [p.parent.name for p in summaries] == ["physics"]
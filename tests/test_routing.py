@@ -0,0 +1,173 @@
+"""Tests for multi-provider routing."""
+
+import threading
+import time
+from collections import Counter
+from unittest.mock import Mock, patch
+
+import pytest
+
+from winnower.extractors import TechnicalExtractor
+from winnower.routing import Route, Router, parse_route
+from winnower.usage import UsageTracker
+
+
+PAPER = {
+    "title": "Test Paper",
+    "authors": [],
+    "source": "test.txt",
+    "url": "",
+    "abstract": "",
+    "content": "Some technical content.",
+}
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class TestRouter:
+
+    def test_weights_split_traffic(self):
+        """Test routes come first in proportion to their weight."""
+        router = Router(
+            [Route("openai", "a", weight=3), Route("openai", "b", weight=1)],
+            seed=0,
+        )
+        firsts = Counter(router.order()[0].model for _ in range(4000))
+        assert 0.7 < firsts["a"] / 4000 < 0.8
+
+    def test_quota_exhaustion(self):
+        """Test routes out of quota are no longer offered."""
+        limited = Route("openai", "a", quota=2)
+        router = Router([limited, Route("anthropic", "b")])
+        router.record_start(limited)
+        router.record_start(limited)
+        assert [r.model for r in router.order()] == ["b"]
+        router.reset()
+        assert len(router.order()) == 2
+
+    def test_overlapping_runs_keep_quota(self):
+        """Test a run starting mid-run does not restore spent quota."""
+        limited = Route("openai", "a", quota=1)
+        router = Router([limited, Route("anthropic", "b")])
+        router.start_run()
+        router.record_start(limited)
+        router.start_run()
+        assert [r.model for r in router.order()] == ["b"]
+        router.finish_run()
+        router.finish_run()
+        router.start_run()
+        assert len(router.order()) == 2
+
+    def test_failures_cool_down_route(self):
+        """Test a throttled route drops behind healthy ones."""
+        flaky = Route("openai", "a", weight=100)
+        router = Router([flaky, Route("anthropic", "b", weight=1)])
+        router.record_failure(flaky, RateLimitError("slow down"))
+        assert [r.model for r in router.order()] == ["b", "a"]
+        assert flaky.throttled == 1
+        router.record_success(flaky, 0.1)
+        assert flaky.cooldown_until == 0.0
+
+    def test_parse_route(self):
+        """Test command-line route specs."""
+        assert parse_route("anthropic:claude-3-5-haiku:2:100") == {
+            "provider": "anthropic",
+            "model": "claude-3-5-haiku",
+            "weight": 2.0,
+            "quota": 100,
+        }
+        assert parse_route("openai:ft:gpt-4o-mini:org::x")["model"] == (
+            "ft:gpt-4o-mini:org::x"
+        )
+        with pytest.raises(ValueError):
+            parse_route("openai")
+
+
+class TestRoutedExtractor:
+
+    @patch("winnower.extractors.anthropic.Anthropic")
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_failover(
+        self, mock_openai, mock_anthropic, mock_anthropic_response
+    ):
+        """Test a failing provider falls over to the next route."""
+        openai_client = Mock()
+        openai_client.chat.completions.create.side_effect = RateLimitError(
+            "rate limited"
+        )
+        mock_openai.return_value = openai_client
+        anthropic_client = Mock()
+        anthropic_client.messages.create.return_value = mock_anthropic_response
+        mock_anthropic.return_value = anthropic_client
+
+        config = {
+            "routes": [
+                {"provider": "openai", "model": "gpt-4o-mini", "weight": 100},
+                {"provider": "anthropic", "model": "claude-3-5-haiku"},
+            ]
+        }
+        extractor = TechnicalExtractor("openai", config)
+        result = extractor.extract(PAPER)
+
+        assert result["error"] is None
+        assert result["usage"]["provider"] == "anthropic"
+        stats = extractor.router.stats()["routes"]
+        assert stats[0]["throttled"] == 1 and stats[1]["requests"] == 1
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_all_routes_failing(self, mock_openai):
+        """Test the error lists every route tried."""
+        client = Mock()
+        client.chat.completions.create.side_effect = RuntimeError("down")
+        mock_openai.return_value = client
+
+        config = {
+            "routes": [
+                {"provider": "openai", "model": "a"},
+                {"provider": "openai", "model": "b"},
+            ]
+        }
+        result = TechnicalExtractor("openai", config).extract(PAPER)
+        assert "openai:a: down" in result["error"]
+        assert "openai:b: down" in result["error"]
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_hedged_request_wins(self, mock_openai, mock_openai_response):
+        """Test a slow call is hedged and the faster duplicate is used."""
+        release = threading.Event()
+
+        def create(**request):
+            if request["model"] == "slow":
+                release.wait(5)
+            return mock_openai_response
+
+        client = Mock()
+        client.chat.completions.create.side_effect = create
+        mock_openai.return_value = client
+
+        config = {
+            "routes": [
+                {"provider": "openai", "model": "slow", "weight": 1e6},
+                {"provider": "openai", "model": "fast", "weight": 1e-6},
+            ],
+            "hedge": True,
+            "hedge_after_s": 0.05,
+        }
+        usage = UsageTracker()
+        extractor = TechnicalExtractor("openai", config, usage=usage)
+        start = time.perf_counter()
+        result = extractor.extract(PAPER)
+        release.set()
+
+        assert time.perf_counter() - start < 2
+        assert result["usage"]["model"] == "fast"
+        assert result["usage"]["hedged"] is True
+        assert extractor.router.stats()["hedge_wins"] == 1
+
+        # The losing request is billed once it finishes
+        extractor.finish_hedges()
+        assert [r["model"] for r in usage.records] == ["slow"]
+        assert "hedged" not in usage.records[0]
+        assert extractor._hedge_pool is None
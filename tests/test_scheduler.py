@@ -0,0 +1,78 @@
+"""Tests for paper scheduling."""
+
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import (
+    REMOTE_PAPER_PAGES,
+    TOKENS_PER_PAGE,
+    WinnowerProcessor,
+    estimate_paper,
+    schedule_papers,
+)
+
+
+class TestScheduler:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, size):
+        path = self.temp_dir / name
+        path.write_text("x" * size)
+        return str(path)
+
+    def test_estimate_paper(self):
+        """Test estimates for text files and remote sources."""
+        estimate = estimate_paper(self._write("a.txt", 4000))
+        assert estimate == {"bytes": 4000, "pages": None, "tokens": 1000}
+
+        remote = estimate_paper("2501.00089")
+        assert remote["bytes"] is None
+        assert remote["tokens"] == REMOTE_PAPER_PAGES * TOKENS_PER_PAGE
+
+    def test_policies(self):
+        """Test each policy orders by estimated tokens, keeping ties stable."""
+        big = self._write("big.txt", 80000)
+        small = self._write("small.txt", 400)
+        tie = self._write("tie.txt", 400)
+        papers = [big, small, tie]
+
+        assert schedule_papers(papers, "fifo") == papers
+        assert schedule_papers(papers, "shortest-first") == [small, tie, big]
+        assert schedule_papers(papers, "largest-first") == [big, small, tie]
+        with pytest.raises(ValueError):
+            schedule_papers(papers, "random")
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_concurrent_shortest_first(self, mock_openai, mock_openai_response):
+        """Test a scheduled concurrent run processes every paper."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        papers = self.temp_dir / "papers"
+        papers.mkdir()
+        for i, size in enumerate([9000, 100, 3000, 500]):
+            (papers / f"paper{i}.txt").write_text(f"paper {i} " * size)
+
+        config = DEFAULT_CONFIG.copy()
+        config.update({"schedule": "shortest-first", "workers": 3})
+        processor = WinnowerProcessor(config, "openai")
+        processor.process(str(papers), self.temp_dir / "out")
+
+        assert mock_client.chat.completions.create.call_count == 4
+        assert len(list((self.temp_dir / "out" / "summaries").iterdir())) == 4
+        assert processor.metrics.papers.value(status="processed") == 4
+        assert processor.metrics.queue_depth.value() == 0
+        report = processor.tracer.report()
+        assert all("estimate" in paper for paper in report["papers"])
@@ -0,0 +1,157 @@
+"""Tests for the local HTTP service."""
+
+import json
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.service import JobQueue, WinnowerService
+
+
+class TestJobQueue:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_claims_oldest_first_and_persists(self):
+        """Test jobs are claimed in order and survive a restart."""
+        queue = JobQueue(self.temp_dir / "jobs.db")
+        first = queue.submit("a.pdf")
+        queue.submit("b.pdf")
+
+        assert queue.claim()["id"] == first["id"]
+        queue.close()
+
+        queue = JobQueue(self.temp_dir / "jobs.db")
+        assert queue.counts()["running"] == 1
+        assert queue.requeue_running() == 1
+        assert queue.claim()["input"] == "a.pdf"
+        assert queue.claim()["input"] == "b.pdf"
+        assert queue.claim() is None
+
+        queue.finish(first["id"], "done", [{"title": "A", "summary": "s.md"}])
+        job = queue.get(first["id"])
+        assert job["status"] == "done"
+        assert job["title"] == "A" and job["summary_path"] == "s.md"
+        queue.close()
+
+
+class TestWinnowerService:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _request(self, service, path, data=None, headers=None):
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{service.port}{path}",
+            data=data,
+            headers=headers or {},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def _wait(self, service, job_id):
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            _, body = self._request(service, f"/jobs/{job_id}")
+            job = json.loads(body)
+            if job["status"] in ("done", "failed"):
+                return job
+            time.sleep(0.05)
+        raise AssertionError(f"job {job_id} did not finish")
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_submit_poll_and_fetch(self, mock_openai, mock_openai_response):
+        """Test jobs by path and by upload run on warm shared workers."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        paper = self.temp_dir / "paper.txt"
+        paper.write_text("A Paper\n\nSome technical content.")
+
+        service = WinnowerService(
+            DEFAULT_CONFIG.copy(),
+            self.temp_dir / "out",
+            workers=2,
+            port=0,
+            poll_interval_s=0.05,
+        ).start()
+        try:
+            status, body = self._request(
+                service,
+                "/jobs",
+                json.dumps({"input": str(paper)}).encode(),
+                {"Content-Type": "application/json"},
+            )
+            assert status == 202
+            by_path = json.loads(body)
+
+            status, body = self._request(
+                service,
+                "/jobs?filename=upload.txt",
+                b"Uploaded Paper\n\nMore content.",
+                {"Content-Type": "text/plain"},
+            )
+            assert status == 202
+            by_upload = json.loads(body)
+
+            for job in (by_path, by_upload):
+                finished = self._wait(service, job["id"])
+                assert finished["status"] == "done"
+                status, summary = self._request(
+                    service, f"/jobs/{job['id']}/summary"
+                )
+                assert status == 200
+                assert b"## Technical Summary" in summary
+
+            _, body = self._request(service, "/health")
+            assert json.loads(body)["jobs"]["done"] == 2
+            assert self._request(service, "/jobs/nope")[0] == 404
+            status, _ = self._request(
+                service, "/jobs?filename=evil.exe", b"x", {}
+            )
+            assert status == 400
+        finally:
+            service.stop()
+
+        # One client shared by both workers
+        assert mock_openai.call_count == 1
+        first, second = service.processors
+        assert first.extractor.clients is second.extractor.clients
+        assert first.metrics is second.metrics
+
+    def test_rejects_bad_json(self):
+        """Test JSON bodies that are not an object get a 400."""
+        service = WinnowerService(
+            DEFAULT_CONFIG.copy(), self.temp_dir / "out", workers=1, port=0
+        ).start()
+        try:
+            for body in (b"[1, 2]", b'"paper.pdf"', b"null", b"{not json"):
+                status, reply = self._request(
+                    service,
+                    "/jobs",
+                    body,
+                    {"Content-Type": "application/json"},
+                )
+                assert status == 400
+                assert "error" in json.loads(reply)
+        finally:
+            service.stop()
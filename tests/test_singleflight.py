@@ -0,0 +1,135 @@
+"""Tests for request coalescing."""
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.singleflight import SingleFlight, source_key
+
+
+class TestSingleFlight:
+
+    def _run_concurrently(self, flights, func, count=5):
+        results = []
+        errors = []
+
+        def call():
+            try:
+                results.append(flights.do("key", func))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.01)
+        return threads, results, errors
+
+    def test_concurrent_calls_share_one_computation(self):
+        """Test callers arriving mid-flight receive the leader's result."""
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"answer": 42}
+
+        threads, results, _ = self._run_concurrently(flights, compute)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert [shared for _, shared in results].count(False) == 1
+        assert all(result == {"answer": 42} for result, _ in results)
+        assert (flights.hits, flights.misses) == (4, 1)
+
+        # Finished calls are not cached
+        assert flights.do("key", lambda: "again") == ("again", False)
+
+    def test_errors_reach_every_caller(self):
+        """Test a failing computation fails all callers waiting on it."""
+        flights = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise RuntimeError("download failed")
+
+        threads, _, errors = self._run_concurrently(flights, fail, count=3)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+        assert all(str(e) == "download failed" for e in errors)
+
+    def test_source_key(self, temp_dir):
+        """Test keys follow paper identity rather than spelling."""
+        a = temp_dir / "a.pdf"
+        b = temp_dir / "b.pdf"
+        a.write_bytes(b"%PDF same bytes")
+        b.write_bytes(b"%PDF same bytes")
+
+        assert source_key(str(a)) == source_key(str(b))
+        assert source_key("2501.00089") == source_key(
+            "https://arxiv.org/abs/2501.00089"
+        )
+        assert source_key("2501.00089v1") != source_key("2501.00089v2")
+
+
+class TestCoalescedProcessing:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @pytest.mark.parametrize("coalesce", [True, False])
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_identical_papers_share_llm_call(
+        self, mock_openai, coalesce, mock_openai_response
+    ):
+        """Test concurrent copies of a paper make one LLM request."""
+
+        def create(**request):
+            time.sleep(0.3)
+            return mock_openai_response
+
+        mock_client = Mock()
+        mock_client.chat.completions.create.side_effect = create
+        mock_openai.return_value = mock_client
+
+        papers = self.temp_dir / "papers"
+        papers.mkdir()
+        for copy in ["a", "b"]:
+            (papers / copy).mkdir()
+            (papers / copy / "paper.txt").write_text("Identical content.")
+
+        config = DEFAULT_CONFIG.copy()
+        config.update(
+            {"workers": 2, "deduplicate": False, "coalesce": coalesce}
+        )
+        processor = WinnowerProcessor(config, "openai")
+        processor.process(str(papers), self.temp_dir / "out", recursive=True)
+
+        report = processor.tracer.report()
+        assert all(paper["status"] == "ok" for paper in report["papers"])
+        if coalesce:
+            assert mock_client.chat.completions.create.call_count == 1
+            stages = [p.get("coalesced", []) for p in report["papers"]]
+            assert sum("extract" in s for s in stages) == 1
+            assert processor.usage.summary()["total"]["requests"] == 1
+        else:
+            assert mock_client.chat.completions.create.call_count == 2
@@ -0,0 +1,176 @@
+"""Tests for consolidated dataset output."""
+
+import json
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.sinks import (
+    PYARROW_AVAILABLE,
+    JSONLSink,
+    ParquetSink,
+    build_record,
+    open_sink,
+)
+
+
+class TestSinks:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _record(self, i):
+        paper = {"source": f"p{i}.txt", "title": f"Paper {i}", "content": "x"}
+        return build_record(paper, {"technical_content": "summary"})
+
+    def test_jsonl_batches_writes(self):
+        """Test records are buffered until a batch fills or the sink closes."""
+        sink = JSONLSink(self.temp_dir / "papers.jsonl", batch_size=3)
+        for i in range(4):
+            sink.write(self._record(i))
+        assert sink.written == 3
+        sink.close()
+
+        lines = (self.temp_dir / "papers.jsonl").read_text().splitlines()
+        assert [json.loads(line)["title"] for line in lines] == [
+            f"Paper {i}" for i in range(4)
+        ]
+
+    def test_jsonl_concurrent_writers(self):
+        """Test concurrent writers produce only whole records."""
+        sink = JSONLSink(self.temp_dir / "papers.jsonl", batch_size=7)
+
+        def write(start):
+            for i in range(start, start + 50):
+                sink.write(self._record(i))
+
+        threads = [
+            threading.Thread(target=write, args=(n * 50,)) for n in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sink.close()
+
+        lines = (self.temp_dir / "papers.jsonl").read_text().splitlines()
+        assert sorted(json.loads(line)["source"] for line in lines) == sorted(
+            f"p{i}.txt" for i in range(200)
+        )
+
+    def test_jsonl_sinks_sharing_a_file(self):
+        """Test separate sinks on one file never interleave large batches."""
+        path = self.temp_dir / "papers.jsonl"
+        extracted = "x" * 200_000
+
+        def write(start):
+            sink = JSONLSink(path, batch_size=5)
+            for i in range(start, start + 20):
+                paper = {"source": f"p{i}.txt", "content": extracted}
+                sink.write(build_record(paper, {}))
+            sink.close()
+
+        threads = [
+            threading.Thread(target=write, args=(n * 20,)) for n in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert sorted(r["source"] for r in records) == sorted(
+            f"p{i}.txt" for i in range(80)
+        )
+        assert all(r["extracted"] == extracted for r in records)
+
+    def test_open_sink(self):
+        """Test the sink follows output_format."""
+        assert open_sink(DEFAULT_CONFIG, self.temp_dir) is None
+        sink = open_sink({"output_format": "jsonl"}, self.temp_dir)
+        assert sink.path == self.temp_dir / "papers.jsonl"
+        with pytest.raises(ValueError):
+            open_sink({"output_format": "csv"}, self.temp_dir)
+
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+    def test_parquet_roundtrip(self):
+        """Test Parquet output stores one row per record."""
+        import pyarrow.parquet
+
+        sink = ParquetSink(self.temp_dir / "papers.parquet", batch_size=2)
+        for i in range(3):
+            sink.write(self._record(i))
+        sink.close()
+
+        table = pyarrow.parquet.read_table(self.temp_dir / "papers.parquet")
+        assert table.num_rows == 3
+        assert table.column("title").to_pylist()[2] == "Paper 2"
+
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+    def test_parquet_parts_are_unique(self):
+        """Test runs started in the same second write separate parts."""
+        config = {"output_format": "parquet"}
+        first = open_sink(config, self.temp_dir)
+        second = open_sink(config, self.temp_dir)
+        assert first.path != second.path
+        assert first.path.name.startswith("papers-")
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_kept_sink_spans_runs(self, mock_openai, mock_openai_response):
+        """Test a kept sink stays open across runs until close."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+        (self.temp_dir / "a.txt").write_text("first paper")
+        (self.temp_dir / "b.txt").write_text("second paper")
+
+        config = dict(DEFAULT_CONFIG, output_format="jsonl")
+        processor = WinnowerProcessor(config, "openai")
+        processor.keep_sink = True
+        output_dir = self.temp_dir / "out"
+        processor.process(str(self.temp_dir / "a.txt"), output_dir)
+        sink = processor.sink
+        processor.process(str(self.temp_dir / "b.txt"), output_dir)
+
+        assert processor.sink is sink
+        # Each run's records are flushed as it ends
+        assert sink.written == 2
+        processor.close()
+        assert processor.sink is None
+        lines = (output_dir / "papers.jsonl").read_text().splitlines()
+        assert [json.loads(line)["title"] for line in lines] == ["a", "b"]
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_processor_writes_dataset(self, mock_openai, mock_openai_response):
+        """Test a JSONL run writes records instead of per-paper files."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        papers = self.temp_dir / "papers"
+        papers.mkdir()
+        (papers / "a.txt").write_text("first paper")
+        (papers / "b.txt").write_text("second paper")
+
+        config = DEFAULT_CONFIG.copy()
+        config["output_format"] = "jsonl"
+        output_dir = self.temp_dir / "out"
+        WinnowerProcessor(config, "openai").process(str(papers), output_dir)
+
+        assert not (output_dir / "summaries").exists()
+        lines = (output_dir / "papers.jsonl").read_text().splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [r["title"] for r in records] == ["a", "b"]
+        assert records[0]["extracted"] == "first paper"
+        assert records[0]["summary"]
+        assert "extract" in records[0]["timings"]
@@ -129,5 +129,5 @@ def test_parser_creation_smoke():
 
     # Test directory finding
     fixtures_dir = Path(__file__).parent / "fixtures"
-    papers = parser.find_papers_in_directory(fixtures_dir)
+    papers = list(parser.find_papers_in_directory(fixtures_dir))
     assert len(papers) >= 0  # Should not crash
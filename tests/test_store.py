@@ -0,0 +1,117 @@
+"""Tests for the SQLite corpus store."""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from winnower.cli import main
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.store import CorpusStore
+
+
+def _paper(source, title, content, summary):
+    return (
+        {"source": source, "title": title, "content": content},
+        {"technical_content": summary},
+    )
+
+
+class TestCorpusStore:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.store = CorpusStore(self.temp_dir / "winnower.db")
+
+    def teardown_method(self):
+        import shutil
+
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_search_ranks_title_hits_first(self):
+        """Test hits are ranked and report their source."""
+        self.store.add_paper(
+            *_paper("a.pdf", "Notes", "We use a diffusion model.", "Other.")
+        )
+        self.store.add_paper(
+            *_paper("b.pdf", "Diffusion Samplers", "Samplers.", "Diffusion.")
+        )
+        self.store.add_paper(*_paper("c.pdf", "Unrelated", "Graphs.", "Nope."))
+
+        results = self.store.search("diffusion")
+        assert [r["source"] for r in results] == ["b.pdf", "a.pdf"]
+        assert "[" in results[0]["snippet"]
+        assert self.store.search("diffusion", limit=1)[0]["source"] == "b.pdf"
+
+    def test_reprocessing_replaces_paper(self):
+        """Test adding a source again replaces its text."""
+        first = self.store.add_paper(*_paper("a.pdf", "A", "old words", ""))
+        second = self.store.add_paper(*_paper("a.pdf", "A", "new words", ""))
+
+        assert first == second
+        assert len(self.store) == 1
+        assert self.store.search("old") == []
+        assert len(self.store.search("new")) == 1
+
+    def test_aliases_find_arxiv_papers(self):
+        """Test arXiv IDs and URLs match the paper stored as arXiv:<id>."""
+        self.store.add_paper(*_paper("arXiv:2501.00089", "A", "text", ""))
+        self.store.add_aliases(
+            "https://arxiv.org/abs/2501.00089",
+            [{"source": "2501.00089v1", "reason": "older version"}],
+        )
+
+        sources = self.store._conn.execute(
+            "SELECT source, reason FROM sources ORDER BY source"
+        ).fetchall()
+        assert [tuple(row) for row in sources] == [
+            ("arXiv:2501.00089", None),
+            ("arXiv:2501.00089v1", "older version"),
+        ]
+
+    def test_unparseable_query_falls_back_to_terms(self):
+        """Test queries with FTS5 syntax errors still search their words."""
+        self.store.add_paper(*_paper("a.pdf", "A", "flow-matching loss", ""))
+        assert len(self.store.search("flow-matching (")) == 1
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_processor_writes_store(self, mock_openai, mock_openai_response):
+        """Test a run with the store enabled is searchable from the CLI."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        papers = self.temp_dir / "papers"
+        papers.mkdir()
+        (papers / "a.txt").write_text("A kernel density estimator.")
+        (papers / "copy.txt").write_text("A kernel density estimator.")
+
+        config = DEFAULT_CONFIG.copy()
+        config["store"] = True
+        output_dir = self.temp_dir / "out"
+        processor = WinnowerProcessor(config, "openai")
+        processor.process(str(papers), output_dir)
+        processor.close()
+
+        store = CorpusStore(output_dir / "winnower.db")
+        try:
+            results = store.search("kernel density")
+            assert [r["source"] for r in results] == [str(papers / "a.txt")]
+            assert Path(results[0]["summary_path"]).is_file()
+            sources = store._conn.execute(
+                "SELECT source, reason FROM sources ORDER BY source"
+            ).fetchall()
+            assert [tuple(row) for row in sources] == [
+                (str(papers / "a.txt"), None),
+                (str(papers / "copy.txt"), "identical content"),
+            ]
+            run = store._conn.execute("SELECT * FROM runs").fetchone()
+            assert run["finished_at"]
+            assert json.loads(run["usage"])["total"]["requests"] == 1
+        finally:
+            store.close()
+
+        assert main(["search", "kernel", "-o", str(output_dir)]) == 0
+        assert main(["search", "kernel", "-o", str(papers)]) == 1
@@ -0,0 +1,100 @@
+"""Tests for pipeline timing instrumentation."""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.tracing import Tracer, load_hook, percentile
+
+
+def collect_span(span):
+    """Module-level hook used by test_load_hook."""
+
+
+class TestTracer:
+
+    def test_spans_are_attributed_to_papers(self):
+        """Test spans opened inside paper() belong to that paper."""
+        tracer = Tracer()
+        with tracer.paper("a.pdf"):
+            with tracer.span("convert"):
+                pass
+            with tracer.span("write"):
+                pass
+            with tracer.span("write"):
+                pass
+        with tracer.span("convert"):
+            pass
+
+        report = tracer.report()
+        (paper,) = report["papers"]
+        assert paper["source"] == "a.pdf"
+        assert paper["status"] == "ok"
+        assert set(paper["stages"]) == {"convert", "write"}
+        assert report["stages"]["convert"]["count"] == 2
+        assert report["stages"]["write"]["count"] == 2
+        assert paper["peak_rss_mb"] > 0
+        assert paper["peak_rss_growth_mb"] >= 0
+
+    def test_span_records_errors_and_calls_hooks(self):
+        """Test failing spans are marked and forwarded to hooks."""
+        hook = Mock()
+        tracer = Tracer(hooks=[hook])
+
+        with pytest.raises(ValueError):
+            with tracer.span("extract"):
+                raise ValueError("boom")
+
+        (span,) = tracer.spans
+        assert span.status == "error"
+        assert span.error == "boom"
+        hook.assert_called_once_with(span)
+
+    def test_load_hook(self):
+        """Test hooks can be named by import path."""
+        assert load_hook("tests.test_tracing:collect_span") is collect_span
+        with pytest.raises(ValueError):
+            load_hook("tests.test_tracing")
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        assert percentile([], 95) == 0.0
+        assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+        assert percentile(list(range(101)), 95) == 95
+
+
+class TestRunReport:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_process_writes_run_report(self, mock_openai, mock_openai_response):
+        """Test process() writes per-paper and per-stage timings."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        paper = self.temp_dir / "paper.txt"
+        paper.write_text("Some technical content")
+
+        processor = WinnowerProcessor(DEFAULT_CONFIG.copy(), "openai")
+        processor.process(str(paper), self.temp_dir / "out")
+
+        report = json.loads((self.temp_dir / "out" / "run_report.json").read_text())
+        (entry,) = report["papers"]
+        assert entry["status"] == "ok"
+        assert entry["title"] == "paper"
+        for stage in ["convert", "preprocess", "extract", "format", "write"]:
+            assert stage in entry["stages"]
+            assert stage in report["stages"]
@@ -0,0 +1,158 @@
+"""Tests for token usage and cost accounting."""
+
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.extractors import TechnicalExtractor
+from winnower.formatters import MarkdownFormatter
+from winnower.usage import (
+    UsageTracker,
+    anthropic_usage,
+    estimate_cost,
+    lookup_pricing,
+    openai_usage,
+)
+
+
+class TestPricing:
+
+    def test_lookup_uses_longest_prefix(self):
+        """Test dated snapshots resolve to their model family."""
+        assert lookup_pricing("gpt-4.1-mini-2025-04-14") == lookup_pricing(
+            "gpt-4.1-mini"
+        )
+        assert lookup_pricing("gpt-4.1-2025-04-14") == lookup_pricing("gpt-4.1")
+        assert lookup_pricing("unknown-model") is None
+
+    def test_overrides(self):
+        """Test config pricing overrides the built-in table."""
+        assert lookup_pricing("local-llm", {"local-llm": [1, 0, 2]}) == (1, 0, 2)
+
+    def test_estimate_cost(self):
+        """Test cached input tokens are billed at the cached rate."""
+        usage = {"input_tokens": 1000, "cached_tokens": 400, "output_tokens": 100}
+        cost = estimate_cost("m", usage, {"m": [1.0, 0.5, 4.0]})
+        assert cost == pytest.approx((600 * 1.0 + 400 * 0.5 + 100 * 4.0) / 1e6)
+        assert estimate_cost("unknown-model", usage) is None
+
+
+class TestUsageNormalization:
+
+    def test_openai_usage(self):
+        """Test OpenAI usage blocks are normalized."""
+        response = SimpleNamespace(
+            usage=SimpleNamespace(
+                prompt_tokens=120,
+                completion_tokens=30,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=100),
+            )
+        )
+        assert openai_usage(response) == {
+            "input_tokens": 120,
+            "output_tokens": 30,
+            "cached_tokens": 100,
+        }
+
+    def test_anthropic_usage_folds_cache_tokens(self):
+        """Test Anthropic cache reads count towards input tokens."""
+        response = SimpleNamespace(
+            usage=SimpleNamespace(
+                input_tokens=20,
+                output_tokens=5,
+                cache_read_input_tokens=100,
+                cache_creation_input_tokens=0,
+            )
+        )
+        assert anthropic_usage(response) == {
+            "input_tokens": 120,
+            "output_tokens": 5,
+            "cached_tokens": 100,
+        }
+
+    def test_missing_usage(self):
+        """Test responses without usage normalize to zeros."""
+        assert openai_usage(Mock())["input_tokens"] == 0
+
+
+class TestUsageTracker:
+
+    def test_summary(self):
+        """Test per-model and overall aggregation."""
+        tracker = UsageTracker()
+        for paper in ["a", "b"]:
+            tracker.record(
+                paper,
+                {
+                    "provider": "openai",
+                    "model": "m",
+                    "input_tokens": 100,
+                    "output_tokens": 50,
+                    "cached_tokens": 0,
+                    "latency_s": 1.0,
+                    "cost_usd": 0.01,
+                },
+            )
+        tracker.record("c", None)
+
+        summary = tracker.summary()
+        model = summary["models"]["openai:m"]
+        assert model["requests"] == 2
+        assert model["output_tokens_per_s"] == 50
+        total = summary["total"]
+        assert total["papers"] == 2
+        assert total["cost_usd"] == pytest.approx(0.02)
+        assert total["cost_per_paper_usd"] == pytest.approx(0.01)
+
+
+class TestExtractorUsage:
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_extract_reports_usage(self, mock_openai, mock_openai_response):
+        """Test extract() returns usage with model, latency and cost."""
+        mock_openai_response.usage = SimpleNamespace(
+            prompt_tokens=1000, completion_tokens=200, prompt_tokens_details=None
+        )
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        extractor = TechnicalExtractor("openai", DEFAULT_CONFIG)
+        result = extractor.extract(
+            {
+                "title": "Paper",
+                "authors": [],
+                "abstract": "",
+                "content": "Content",
+                "source": "paper.txt",
+                "url": "",
+            }
+        )
+
+        usage = result["usage"]
+        assert usage["input_tokens"] == 1000
+        assert usage["output_tokens"] == 200
+        assert usage["model"] == DEFAULT_CONFIG["openai_model"]
+        assert usage["cost_usd"] > 0
+
+    def test_front_matter(self):
+        """Test summaries optionally carry usage front matter."""
+        data = {
+            "title": 'A "quoted" title',
+            "authors": [],
+            "source": "paper.txt",
+            "url": "",
+            "abstract": "",
+            "technical_content": "Content",
+            "usage": {"model": "m", "input_tokens": 10, "cost_usd": None},
+        }
+
+        output = MarkdownFormatter(front_matter=True).format(data)
+        assert output.startswith('---\ntitle: "A \\"quoted\\" title"\n')
+        assert "model: \"m\"" in output
+        assert "input_tokens: 10" in output
+        assert "cost_usd" not in output
+
+        assert not MarkdownFormatter().format(data).startswith("---")
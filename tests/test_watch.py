@@ -0,0 +1,185 @@
+"""Tests for watch mode."""
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from winnower.config import DEFAULT_CONFIG
+from winnower.core import WinnowerProcessor
+from winnower.watch import DirectoryWatcher
+
+
+class TestDirectoryWatcher:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.inbox = self.temp_dir / "inbox"
+        self.inbox.mkdir()
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _watcher(self, **kwargs):
+        return DirectoryWatcher(
+            self.inbox,
+            lambda: sorted(self.inbox.glob("*.txt")),
+            notifications=False,
+            **kwargs,
+        )
+
+    def test_debounces_growing_files(self):
+        """Test a file is ready only after it stops changing."""
+        watcher = self._watcher(debounce_s=2.0)
+        paper = self.inbox / "a.txt"
+        paper.write_text("partial")
+
+        assert watcher.poll(now=0.0) == []
+        paper.write_text("partial, now complete")
+        os.utime(paper, ns=(1, 1))
+        assert watcher.poll(now=1.5) == []
+        assert watcher.poll(now=3.0) == []
+        assert watcher.poll(now=3.6) == [paper]
+        assert watcher.poll(now=10.0) == []
+
+    def test_modified_files_and_state(self):
+        """Test modified files are reported again and state persists."""
+        state_file = self.temp_dir / "state.json"
+        watcher = self._watcher(debounce_s=0, state_file=state_file)
+        paper = self.inbox / "a.txt"
+        paper.write_text("version 1")
+
+        watcher.poll()
+        assert watcher.poll() == [paper]
+        watcher.commit([paper])
+
+        restarted = self._watcher(debounce_s=0, state_file=state_file)
+        restarted.poll()
+        assert restarted.poll() == []
+
+        paper.write_text("version 2, longer")
+        restarted.poll()
+        assert restarted.poll() == [paper]
+
+    def test_failed_papers_are_retried(self):
+        """Test only processed papers are saved and failed ones come back."""
+        state_file = self.temp_dir / "state.json"
+        watcher = self._watcher(
+            debounce_s=0, retry_s=30, state_file=state_file
+        )
+        good = self.inbox / "a.txt"
+        bad = self.inbox / "b.txt"
+        good.write_text("fine")
+        bad.write_text("broken")
+
+        watcher.poll(now=0.0)
+        assert watcher.poll(now=0.0) == [good, bad]
+        # In flight: not reported twice, and not yet remembered
+        assert watcher.poll(now=1.0) == []
+        assert not state_file.exists()
+
+        watcher.commit([good])
+        watcher.fail([bad], now=1.0)
+        assert watcher.poll(now=20.0) == []
+        watcher.poll(now=31.0)
+        assert watcher.poll(now=31.0) == [bad]
+
+        restarted = self._watcher(debounce_s=0, state_file=state_file)
+        restarted.poll()
+        assert restarted.poll() == [bad]
+
+    def test_notifications_check_only_notified_paths(self):
+        """Test a notification looks at the changed file, not the tree."""
+        find_papers = Mock(side_effect=lambda: sorted(self.inbox.glob("*")))
+        watcher = DirectoryWatcher(
+            self.inbox,
+            find_papers,
+            debounce_s=0,
+            poll_interval_s=60,
+            notifications=False,
+            accepts=lambda path: path.suffix == ".txt",
+        )
+        assert watcher.poll(now=0.0) == []
+        assert find_papers.call_count == 1
+
+        paper = self.inbox / "a.txt"
+        paper.write_text("new paper")
+        (self.inbox / "notes.log").write_text("not a paper")
+        watcher.notify([str(paper), str(self.inbox / "notes.log")])
+        assert watcher.poll(now=1.0) == []
+        assert watcher.poll(now=2.0) == [paper]
+        assert find_papers.call_count == 1
+
+        # A directory event, or the poll interval, rescans everything
+        watcher.notify(None)
+        watcher.poll(now=3.0)
+        assert find_papers.call_count == 2
+        watcher.poll(now=70.0)
+        assert find_papers.call_count == 3
+
+    def test_ignores_empty_files(self):
+        """Test files still being created (zero bytes) are not reported."""
+        watcher = self._watcher(debounce_s=0)
+        (self.inbox / "empty.txt").touch()
+        watcher.poll()
+        assert watcher.poll() == []
+
+
+class TestWatchProcessing:
+
+    def setup_method(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch("winnower.extractors.openai.OpenAI")
+    def test_processes_arriving_papers(self, mock_openai, mock_openai_response):
+        """Test papers dropped into the inbox are processed while watching."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_openai_response
+        mock_openai.return_value = mock_client
+
+        inbox = self.temp_dir / "inbox"
+        inbox.mkdir()
+        (inbox / "first.txt").write_text("First Paper\n\nSome content.")
+        output_dir = self.temp_dir / "out"
+
+        config = DEFAULT_CONFIG.copy()
+        config.update(
+            {
+                "watch_debounce_s": 0.05,
+                "watch_poll_interval_s": 0.05,
+                "watch_notifications": False,
+            }
+        )
+        processor = WinnowerProcessor(config, "openai")
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=processor.watch, args=(inbox, output_dir), kwargs={"stop": stop}
+        )
+        thread.start()
+        try:
+            summaries = output_dir / "summaries"
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline and not summaries.is_dir():
+                time.sleep(0.05)
+            (inbox / "second.txt").write_text("Second Paper\n\nMore content.")
+            while (
+                time.monotonic() < deadline
+                and mock_client.chat.completions.create.call_count < 2
+            ):
+                time.sleep(0.05)
+        finally:
+            stop.set()
+            thread.join(5)
+
+        assert not thread.is_alive()
+        assert mock_client.chat.completions.create.call_count == 2
+        assert (output_dir / "watch_state.json").is_file()
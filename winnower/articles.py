@@ -0,0 +1,266 @@
+"""Main-content extraction from HTML article pages."""
+
+import re
+from typing import Dict, List, Optional, Union
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+    etree = None
+    lxml_html = None
+
+
+# Page furniture that is never part of the article.
+REMOVE_TAGS = [
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "nav",
+    "aside",
+    "footer",
+    "header",
+    "form",
+    "button",
+    "iframe",
+    "svg",
+    "canvas",
+]
+
+# Elements holding the article body in arXiv HTML (LaTeXML) and common
+# publisher layouts, tried in order before falling back to <article>,
+# <main> and <body>.
+BODY_SELECTORS = [
+    '//article[@class and contains(@class, "ltx_document")]',
+    '//div[contains(@class, "c-article-body")]',  # Springer Nature
+    '//div[@id="body" or contains(@class, "Body")][.//p]',  # ScienceDirect
+    '//section[contains(@class, "article-section__content")]/..',  # Wiley
+    '//div[contains(@class, "article__body")]',  # ACM, Taylor & Francis
+    '//div[contains(@class, "hlFld-Fulltext")]',  # Atypon journals
+    '//div[contains(@class, "fulltext-view")]',  # bioRxiv, medRxiv
+    '//div[contains(@class, "html-body")]',  # MDPI
+    '//div[@id="artText" or contains(@class, "article-text")]',  # PLOS
+    '//section[contains(@class, "main-article-body")]',  # PubMed Central
+    '//*[@itemprop="articleBody"]',
+    '//article',
+    '//main',
+    '//*[@role="main"]',
+    '//div[@id="content" or @id="main-content"]',
+]
+
+# Shorter matches are taken for teasers or cards, not the article.
+MIN_BODY_CHARS = 200
+
+# Parts of an article body that cost tokens but are not its content.
+REMOVE_SELECTORS = [
+    '//*[@role="navigation" or @role="banner" or @role="contentinfo"]',
+    '//*[@aria-hidden="true"]',
+    '//*[contains(@class, "ltx_bibliography")]',  # arXiv references
+    '//*[contains(@class, "ltx_page_footer")]',
+    '//*[contains(@class, "ltx_authors")]',
+    '//*[contains(@class, "c-article-references")]',
+    '//section[@id="references" or @id="bibliography"]',
+    '//div[contains(@class, "ref-list")]',
+]
+
+ABSTRACT_SELECTORS = [
+    '//*[contains(@class, "ltx_abstract")]',
+    '//section[contains(@class, "abstract")]',
+    '//div[contains(@class, "abstract")]',
+    '//*[@id="abstract" or @id="Abs1"]',
+]
+
+AUTHOR_SELECTOR = '//*[contains(@class, "ltx_personname")]'
+
+TITLE_SELECTORS = [
+    '//*[contains(@class, "ltx_title_document")]',
+    "//h1",
+]
+
+BLOCK_TAGS = {
+    "p",
+    "div",
+    "section",
+    "article",
+    "li",
+    "tr",
+    "table",
+    "figure",
+    "figcaption",
+    "blockquote",
+    "pre",
+    "br",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+}
+
+
+def extract_article(content: Union[bytes, str]) -> Dict:
+    """Extract the title, authors, abstract and body text of a page.
+
+    Scripts, navigation, headers, footers and sidebars are dropped and
+    the body is taken from the first element matching
+    ``BODY_SELECTORS``, so only the article reaches the model. MathML
+    formulas are replaced by their LaTeX source where the page provides
+    it, as arXiv HTML does. Citation meta tags (``citation_title``,
+    ``citation_author``, ``citation_abstract``), which most publishers
+    emit, are preferred for metadata.
+    """
+    if not LXML_AVAILABLE:
+        raise ImportError("lxml not installed. Run: pip install lxml")
+
+    root = lxml_html.document_fromstring(content)
+    meta = _meta_tags(root)
+    title = (
+        _first(meta.get("citation_title"))
+        or _first(meta.get("og:title"))
+        or _select_text(root, TITLE_SELECTORS)
+        or _text(root.find(".//title"))
+        or "Unknown Title"
+    )
+    authors = meta.get("citation_author") or meta.get("dc.creator") or [
+        _text(element).split("\n")[0]
+        for element in root.xpath(AUTHOR_SELECTOR)
+    ]
+
+    _replace_math(root)
+    for element in root.xpath("|".join(f"//{tag}" for tag in REMOVE_TAGS)):
+        _drop(element)
+
+    abstract = _first(meta.get("citation_abstract")) or _first(
+        meta.get("dc.description")
+    )
+    if not abstract:
+        abstract = _select_text(root, ABSTRACT_SELECTORS)
+        abstract = re.sub(r"^abstract\b[\s:.]*", "", abstract, flags=re.I)
+
+    body = _select_body(root)
+    for element in body.xpath("|".join(f".{s}" for s in REMOVE_SELECTORS)):
+        _drop(element)
+
+    return {
+        "title": _clean(title),
+        "authors": [_clean(author) for author in authors],
+        "abstract": _clean(abstract),
+        "content": _text(body),
+    }
+
+
+def _select_body(root):
+    """The element holding the article, falling back to ``<body>``.
+
+    Selectors are tried in order, taking the longest match of the first
+    one that finds ``MIN_BODY_CHARS`` of text.
+    """
+    for selector in BODY_SELECTORS:
+        candidates = [
+            (len(element.text_content()), element)
+            for element in root.xpath(selector)
+        ]
+        if candidates:
+            size, element = max(candidates, key=lambda c: c[0])
+            if size >= MIN_BODY_CHARS:
+                return element
+    body = root.find("body")
+    return body if body is not None else root
+
+
+def _meta_tags(root) -> Dict[str, List[str]]:
+    tags: Dict[str, List[str]] = {}
+    for element in root.iter("meta"):
+        name = element.get("name") or element.get("property")
+        value = element.get("content")
+        if name and value:
+            tags.setdefault(name.lower(), []).append(value)
+    return tags
+
+
+def _first(values: Optional[List[str]]) -> str:
+    return values[0].strip() if values else ""
+
+
+def _select(root, selectors: List[str]):
+    """The first element matching the first selector that matches."""
+    for selector in selectors:
+        matches = root.xpath(selector)
+        if matches:
+            return matches[0]
+    return None
+
+
+def _select_text(root, selectors: List[str]) -> str:
+    element = _select(root, selectors)
+    return _text(element) if element is not None else ""
+
+
+def _drop(element) -> None:
+    """Remove ``element`` and its children, keeping the text after it."""
+    if element.getparent() is not None:
+        element.drop_tree()
+
+
+def _replace_math(root) -> None:
+    """Replace formulas with their LaTeX source, as ``$...$``.
+
+    Covers MathML with ``alttext`` (arXiv HTML) and MathJax 2's
+    ``<script type="math/tex">``; other formulas keep their text.
+    """
+    for node in list(root.iter("math", "script")):
+        if node.tag == "math":
+            latex = node.get("alttext")
+            display = node.get("display") == "block"
+        elif (node.get("type") or "").startswith("math/tex"):
+            latex = node.text
+            display = "mode=display" in node.get("type")
+        else:
+            continue
+        if not latex or node.getparent() is None:
+            continue
+        replacement = lxml_html.Element("div" if display else "span")
+        replacement.text = f"$${latex}$$" if display else f"${latex}$"
+        replacement.tail = node.tail
+        node.getparent().replace(node, replacement)
+
+
+def _text(element) -> str:
+    """Text of ``element`` with block elements on their own lines."""
+    if element is None:
+        return ""
+    lines = []
+    parts: List[str] = []
+    events = ("start", "end", "comment", "pi")
+    for event, node in etree.iterwalk(element, events=events):
+        if event in ("comment", "pi"):
+            # Their text is dropped, but text after them is the element's
+            if node.tail and node is not element:
+                parts.append(node.tail)
+            continue
+        block = node.tag in BLOCK_TAGS
+        if event == "start":
+            if block:
+                lines.append("".join(parts))
+                parts = []
+            if node.text:
+                parts.append(node.text)
+        else:
+            if block:
+                lines.append("".join(parts))
+                parts = []
+            if node.tail and node is not element:
+                parts.append(node.tail)
+    lines.append("".join(parts))
+
+    text = "\n".join(_clean(line) for line in lines)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _clean(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
@@ -0,0 +1,150 @@
+"""Record/replay cassettes for deterministic, offline runs."""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+class CassetteMissError(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class Cassette:
+    """Capture LLM calls and remote fetches, or serve them back locally.
+
+    Entries are keyed by a SHA-256 hash of the request and stored as
+    gzip-compressed JSON lines. In ``"record"`` mode each call goes to the
+    network and its response is kept; in ``"replay"`` mode responses are
+    served from disk. ``speed`` scales replay delays: ``0`` replays
+    instantly, ``1.0`` reproduces the recorded latencies, ``2.0`` runs twice
+    as fast.
+    """
+
+    MODES = ("record", "replay")
+
+    def __init__(self, path: Path, mode: str = "replay", speed: float = 0.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.speed = speed
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            self._load()
+        elif mode == "replay":
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["Cassette"]:
+        """Build a cassette from config, or return None if not configured."""
+        path = config.get("cassette_path")
+        if not path:
+            return None
+        return cls(
+            Path(path),
+            mode=config.get("cassette_mode", "replay"),
+            speed=float(config.get("replay_speed", 0.0)),
+        )
+
+    @staticmethod
+    def key(kind: str, request: Dict) -> str:
+        """Stable hash identifying a request."""
+        payload = json.dumps(
+            {"kind": kind, "request": request}, sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def has(self, kind: str, request: Dict) -> bool:
+        """Whether ``request`` was recorded, without counting a hit."""
+        with self._lock:
+            return self.key(kind, request) in self._entries
+
+    def play(self, kind: str, request: Dict, func: Callable[[], Dict]) -> Dict:
+        """Return the response for ``request``, recording or replaying it.
+
+        ``func`` performs the real call and must return a JSON-serializable
+        dict; ``bytes`` values are stored base64-encoded.
+        """
+        key = self.key(kind, request)
+
+        if self.mode == "replay":
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            if entry is None:
+                raise CassetteMissError(
+                    f"No recorded {kind} response for this request "
+                    f"in {self.path}"
+                )
+            if self.speed > 0:
+                time.sleep(entry["elapsed"] / self.speed)
+            return _decode(entry["response"])
+
+        start = time.perf_counter()
+        response = func()
+        with self._lock:
+            self._entries[key] = {
+                "key": key,
+                "kind": kind,
+                "elapsed": time.perf_counter() - start,
+                "response": _encode(response),
+            }
+        return response
+
+    def save(self) -> None:
+        """Write recorded entries to disk atomically."""
+        if self.mode != "record":
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with self._lock:
+            entries = list(self._entries.values())
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]] = entry
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return {"__b64__": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if set(value) == {"__b64__"}:
+            return base64.b64decode(value["__b64__"])
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
@@ -3,11 +3,13 @@
 
 import argparse
 import sys
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
 from .core import WinnowerProcessor
 from .config import load_config, setup_user_env, check_api_keys
+from .routing import PROVIDERS, parse_route
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -18,6 +20,12 @@ def create_parser() -> argparse.ArgumentParser:
         epilog="""
 Examples:
   winnower setup                              # Set up configuration
+  winnower search "diffusion sampler"         # Search the corpus store
+  winnower watch ~/inbox                      # Process papers as they arrive
+  winnower serve --port 8765 --workers 4      # Local HTTP API
+  winnower enqueue papers/ --queue /shared/q  # Queue papers for workers
+  winnower worker --queue /shared/q -o out/   # Process queued papers
+  winnower plan papers/ --workers 8           # Estimate tokens, cost, time
   winnower paper.pdf
   winnower https://arxiv.org/abs/2501.00089
   winnower 2501.00089
@@ -40,6 +48,12 @@ def _add_main_arguments(parser: argparse.ArgumentParser) -> None:
         help="Paper input: file path, directory, URL, or arXiv ID",
     )
 
+    parser.add_argument(
+        "command_args",
+        nargs="*",
+        help=argparse.SUPPRESS,
+    )
+
     parser.add_argument(
         "-o",
         "--output",
@@ -48,6 +62,42 @@ def _add_main_arguments(parser: argparse.ArgumentParser) -> None:
         default=Path.cwd() / "winnower_output",
     )
 
+    parser.add_argument(
+        "--output-format",
+        choices=["markdown", "jsonl", "parquet"],
+        help=(
+            "Write markdown files per paper, or one record per paper to a "
+            "single JSONL/Parquet dataset (default: markdown)"
+        ),
+    )
+
+    parser.add_argument(
+        "--layout",
+        choices=["flat", "sharded"],
+        help=(
+            "Name outputs by title in flat folders, or by stable ID in "
+            "hash-prefix subfolders with an index.jsonl (default: flat)"
+        ),
+    )
+
+    parser.add_argument(
+        "--object-store",
+        action="store_true",
+        help=(
+            "Keep originals and extracted text in a deduplicated, "
+            "compressed objects/ store instead of papers/ and extracted/"
+        ),
+    )
+
+    parser.add_argument(
+        "--compression",
+        choices=["gzip", "zstd", "none"],
+        help=(
+            "Compression for extracted text in the object store "
+            "(default: gzip)"
+        ),
+    )
+
     parser.add_argument(
         "-r",
         "--recursive",
@@ -55,6 +105,27 @@ def _add_main_arguments(parser: argparse.ArgumentParser) -> None:
         help="Process directory recursively",
     )
 
+    parser.add_argument(
+        "--include",
+        action="append",
+        help="Only process files matching this glob (repeatable)",
+        metavar="GLOB",
+    )
+
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        help="Skip files and directories matching this glob (repeatable)",
+        metavar="GLOB",
+    )
+
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        help="Maximum directory depth with --recursive (default: unlimited)",
+        metavar="N",
+    )
+
     parser.add_argument(
         "--config",
         type=Path,
@@ -68,6 +139,38 @@ def _add_main_arguments(parser: argparse.ArgumentParser) -> None:
         help="AI model provider (default: openai)",
     )
 
+    parser.add_argument(
+        "--route",
+        action="append",
+        help=(
+            "Spread requests over provider:model[:weight[:quota]] routes "
+            "with failover (repeatable; overrides --model)"
+        ),
+        metavar="ROUTE",
+    )
+
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Send a duplicate request when a call exceeds its p95 latency",
+    )
+
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        help="Hedge delay to use until enough latencies are known",
+        metavar="SECONDS",
+    )
+
+    parser.add_argument(
+        "--cascade",
+        help=(
+            "Try a cheap [provider:]model first and escalate to the main "
+            "model only when its summary fails quality checks"
+        ),
+        metavar="MODEL",
+    )
+
     parser.add_argument(
         "--prompt-file",
         type=Path,
@@ -87,6 +190,15 @@ def _add_main_arguments(parser: argparse.ArgumentParser) -> None:
         help="Disable PDF to markdown conversion (use legacy text extraction)",
     )
 
+    parser.add_argument(
+        "--arxiv-source",
+        action="store_true",
+        help=(
+            "Read arXiv papers from their LaTeX source instead of the PDF, "
+            "when they have one"
+        ),
+    )
+
     parser.add_argument(
         "--length",
         type=int,
@@ -94,6 +206,203 @@ def _add_main_arguments(parser: argparse.ArgumentParser) -> None:
         metavar="WORDS",
     )
 
+    parser.add_argument(
+        "--lengths",
+        help=(
+            "Comma-separated summary lengths in words, e.g. 100,200,500, "
+            "all written from one model call per paper"
+        ),
+        metavar="WORDS,...",
+    )
+
+    parser.add_argument(
+        "--profiles",
+        help=(
+            "Comma-separated profiles to summarize each paper with, in one "
+            "run: names from the config's profiles, or NAME=PROMPT_FILE"
+        ),
+        metavar="NAME[=PROMPT_FILE],...",
+    )
+
+    parser.add_argument(
+        "--record",
+        type=Path,
+        help="Record LLM responses and remote fetches to a cassette file",
+        metavar="CASSETTE",
+    )
+
+    parser.add_argument(
+        "--replay",
+        type=Path,
+        help="Serve LLM responses and remote fetches from a cassette file",
+        metavar="CASSETTE",
+    )
+
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        help=(
+            "Replay speed relative to recorded latency "
+            "(default: 0, i.e. instant)"
+        ),
+        metavar="FACTOR",
+    )
+
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Process duplicate files and arXiv versions separately",
+    )
+
+    parser.add_argument(
+        "--schedule",
+        choices=["fifo", "shortest-first", "largest-first"],
+        help=(
+            "Order in which papers are processed, by estimated size "
+            "(default: fifo)"
+        ),
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of papers to process concurrently (default: 1)",
+        metavar="N",
+    )
+
+    parser.add_argument(
+        "--near-duplicates",
+        choices=["off", "report", "reuse", "skip"],
+        help=(
+            "How to treat papers whose text nearly matches one already "
+            "summarized (default: off)"
+        ),
+    )
+
+    parser.add_argument(
+        "--near-duplicate-threshold",
+        type=float,
+        help="Estimated Jaccard similarity for near-duplicates (default: 0.9)",
+        metavar="SIMILARITY",
+    )
+
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help=(
+            "Also write papers to a searchable SQLite store "
+            "(OUTPUT/winnower.db)"
+        ),
+    )
+
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Maximum number of search results (default: 10)",
+        metavar="N",
+    )
+
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        help=(
+            "watch: seconds a file must stay unchanged before it is "
+            "processed (default: 2)"
+        ),
+        metavar="SECONDS",
+    )
+
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        help="watch: seconds between directory rescans (default: 5)",
+        metavar="SECONDS",
+    )
+
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="watch: rescan instead of using filesystem notifications",
+    )
+
+    parser.add_argument(
+        "--host",
+        help="serve: address to listen on (default: 127.0.0.1)",
+    )
+
+    parser.add_argument(
+        "--port",
+        type=int,
+        help="serve: port to listen on (default: 8765)",
+    )
+
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        help=(
+            "enqueue/worker: shared queue directory "
+            "(default: OUTPUT/queue)"
+        ),
+        metavar="DIR",
+    )
+
+    parser.add_argument(
+        "--lease",
+        type=float,
+        help=(
+            "worker: seconds a paper stays leased without a heartbeat "
+            "(default: 60)"
+        ),
+        metavar="SECONDS",
+    )
+
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="worker: wait for new papers instead of exiting when done",
+    )
+
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        help="plan: requests per minute the API allows",
+        metavar="N",
+    )
+
+    parser.add_argument(
+        "--tpm",
+        type=int,
+        help="plan: tokens per minute the API allows",
+        metavar="N",
+    )
+
+    parser.add_argument(
+        "--front-matter",
+        action="store_true",
+        help="Add YAML front matter with token usage and cost to summaries",
+    )
+
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics",
+        metavar="PORT",
+    )
+
+    parser.add_argument(
+        "--metrics-textfile",
+        type=Path,
+        help="Periodically write Prometheus metrics to a textfile",
+        metavar="PATH",
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a cProfile dump (profile.pstats) to the output directory",
+    )
+
     parser.add_argument(
         "--version",
         action="version",
@@ -135,6 +444,372 @@ def setup_command(args) -> int:
     return 0
 
 
+def search_command(args) -> int:
+    """Handle search command."""
+    import time
+
+    from .store import CorpusStore, default_store_path
+
+    query = " ".join(args.command_args)
+    if not query:
+        print('Usage: winnower search "query" [-o OUTPUT] [--limit N]')
+        return 1
+
+    config = load_config(getattr(args, "config", None))
+    store_path = default_store_path(config, args.output)
+    if not store_path.exists():
+        print(f"No corpus store at {store_path}; process papers with --store")
+        return 1
+
+    store = CorpusStore(store_path)
+    try:
+        start = time.perf_counter()
+        results = store.search(query, limit=args.limit)
+        elapsed = time.perf_counter() - start
+    finally:
+        store.close()
+
+    for rank, hit in enumerate(results, 1):
+        print(f"{rank}. {hit['title']}  (score {-hit['score']:.2f})")
+        print(f"   {hit['summary_path'] or hit['source']}")
+        print(f"   {' '.join(hit['snippet'].split())}")
+    print(f"\n{len(results)} result(s) in {elapsed * 1000:.1f} ms")
+    return 0
+
+
+def watch_command(args) -> int:
+    """Handle watch command."""
+    if len(args.command_args) != 1:
+        print("Usage: winnower watch DIRECTORY [-o OUTPUT] [options]")
+        return 1
+
+    config = _build_config(args)
+    processor = WinnowerProcessor(
+        config,
+        getattr(args, "model", "openai"),
+        getattr(args, "verbose", False),
+    )
+    try:
+        processor.watch(
+            Path(args.command_args[0]),
+            getattr(args, "output", Path.cwd()),
+            recursive=getattr(args, "recursive", False),
+        )
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        processor.close()
+    return 0
+
+
+def serve_command(args) -> int:
+    """Handle serve command."""
+    import time
+
+    from .service import WinnowerService
+
+    if args.command_args:
+        print("Usage: winnower serve [-o OUTPUT] [--host HOST] [--port PORT]")
+        return 1
+
+    config = _build_config(args)
+    host = args.host or config.get("serve_host", "127.0.0.1")
+    port = args.port if args.port is not None else config.get("serve_port")
+    try:
+        service = WinnowerService(
+            config,
+            getattr(args, "output", Path.cwd()),
+            model_provider=getattr(args, "model", "openai"),
+            verbose=getattr(args, "verbose", False),
+            workers=int(config.get("workers", 1)),
+            host=host,
+            port=int(port),
+        ).start()
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(
+        f"Serving on http://{host}:{service.port} with "
+        f"{len(service.processors)} worker(s); Ctrl-C to stop"
+    )
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\nStopping; waiting for running jobs...")
+    finally:
+        service.stop()
+    return 0
+
+
+def _queue(args, config: dict):
+    from .distributed import LeaseQueue
+
+    root = args.queue or config.get("queue_dir") or args.output / "queue"
+    return LeaseQueue(
+        Path(root),
+        float(config.get("lease_s", 60.0)),
+        int(config.get("queue_max_attempts", 3)),
+    )
+
+
+def enqueue_command(args) -> int:
+    """Handle enqueue command."""
+    from .parsers import PaperParser
+
+    if not args.command_args:
+        print("Usage: winnower enqueue INPUT... --queue DIR [-r]")
+        return 1
+
+    config = _build_config(args)
+    queue = _queue(args, config)
+    paper_parser = PaperParser(config=config)
+    added = 0
+    for source in args.command_args:
+        if Path(source).is_dir():
+            papers = paper_parser.find_papers_in_directory(
+                Path(source),
+                getattr(args, "recursive", False),
+                skip=[args.output],
+            )
+        else:
+            papers = [source]
+        added += sum(queue.enqueue(str(paper)) for paper in papers)
+
+    status = queue.status()
+    print(
+        f"Queued {added} new paper(s) in {queue.root} "
+        f"({status['remaining']} remaining of {status['tasks']})"
+    )
+    return 0
+
+
+def worker_command(args) -> int:
+    """Handle worker command."""
+    from .distributed import DistributedWorker, worker_config
+
+    if args.command_args:
+        print("Usage: winnower worker --queue DIR [-o OUTPUT] [--follow]")
+        return 1
+
+    config = _build_config(args)
+    queue = _queue(args, config)
+    output_dir = getattr(args, "output", Path.cwd())
+    processor = WinnowerProcessor(
+        worker_config(config),
+        getattr(args, "model", "openai"),
+        getattr(args, "verbose", False),
+    )
+    worker = DistributedWorker(
+        processor, queue, output_dir, follow=getattr(args, "follow", False)
+    )
+    print(f"Worker {worker.worker_id} taking papers from {queue.root}")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        print("\nStopped; unfinished papers return to the queue")
+    finally:
+        processor.close()
+
+    print(
+        f"Committed {worker.committed} paper(s); discarded "
+        f"{worker.discarded} already committed elsewhere; "
+        f"{worker.failed} failed attempt(s)"
+    )
+    return 0
+
+
+def plan_command(args) -> int:
+    """Handle plan command."""
+    from .planner import CapacityPlanner, format_plan
+
+    if not args.command_args:
+        print("Usage: winnower plan INPUT... [-o OUTPUT] [--workers N]")
+        return 1
+
+    config = _build_config(args)
+    output_dir = getattr(args, "output", Path.cwd())
+    sources = args.command_args
+    try:
+        planner = CapacityPlanner(
+            config,
+            getattr(args, "model", "openai"),
+            getattr(args, "verbose", False),
+        )
+        plan = planner.plan(
+            sources[0] if len(sources) == 1 else sources,
+            output_dir,
+            recursive=getattr(args, "recursive", False),
+        )
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(format_plan(plan))
+    print(f"\nPlan written to {output_dir / 'plan.json'}")
+    return 0
+
+
+def _build_config(args) -> dict:
+    """Load the configuration and apply command-line overrides."""
+    config = load_config(getattr(args, "config", None))
+
+    # Override config with CLI arguments
+    if hasattr(args, "prompt_file") and args.prompt_file:
+        config["prompt_file"] = str(args.prompt_file)
+
+    if hasattr(args, "no_markdown") and args.no_markdown:
+        config["pdf_to_markdown"] = False
+
+    if getattr(args, "arxiv_source", False):
+        config["arxiv_source"] = True
+
+    if hasattr(args, "length") and args.length:
+        config["summary_length"] = args.length
+
+    if getattr(args, "lengths", None):
+        try:
+            config["summary_lengths"] = [
+                int(length) for length in args.lengths.split(",") if length
+            ]
+        except ValueError:
+            raise ValueError(
+                f"--lengths expects comma-separated word counts, "
+                f"got {args.lengths!r}"
+            ) from None
+
+    if getattr(args, "profiles", None):
+        profiles = dict(config.get("profiles") or {})
+        active = []
+        for spec in args.profiles.split(","):
+            name, _, prompt_file = spec.strip().partition("=")
+            if prompt_file:
+                profiles[name] = dict(
+                    profiles.get(name) or {}, prompt_file=prompt_file
+                )
+            if name:
+                active.append(name)
+        config["profiles"] = profiles
+        config["active_profiles"] = active
+
+    if getattr(args, "layout", None):
+        config["output_layout"] = args.layout
+
+    if getattr(args, "object_store", False):
+        config["object_store"] = True
+
+    if getattr(args, "compression", None):
+        config["compression"] = args.compression
+
+    if getattr(args, "store", False):
+        config["store"] = True
+
+    if getattr(args, "output_format", None):
+        config["output_format"] = args.output_format
+
+    if getattr(args, "include", None):
+        config["include_patterns"] = args.include
+
+    if getattr(args, "exclude", None):
+        config["exclude_patterns"] = args.exclude
+
+    if getattr(args, "max_depth", None) is not None:
+        config["max_depth"] = args.max_depth
+
+    if getattr(args, "no_dedup", False):
+        config["deduplicate"] = False
+
+    if getattr(args, "debounce", None) is not None:
+        config["watch_debounce_s"] = args.debounce
+
+    if getattr(args, "poll_interval", None) is not None:
+        config["watch_poll_interval_s"] = args.poll_interval
+
+    if getattr(args, "poll", False):
+        config["watch_notifications"] = False
+
+    if getattr(args, "lease", None) is not None:
+        config["lease_s"] = args.lease
+
+    if getattr(args, "route", None):
+        config["routes"] = [parse_route(spec) for spec in args.route]
+
+    if getattr(args, "hedge", False):
+        config["hedge"] = True
+
+    if getattr(args, "hedge_after", None) is not None:
+        config["hedge_after_s"] = args.hedge_after
+
+    if getattr(args, "cascade", None):
+        provider, _, model = args.cascade.partition(":")
+        if model and provider in PROVIDERS:
+            config["cascade_provider"] = provider
+            config["cascade_model"] = model
+        else:
+            config["cascade_model"] = args.cascade
+
+    if getattr(args, "schedule", None):
+        config["schedule"] = args.schedule
+
+    if getattr(args, "workers", None) is not None:
+        config["workers"] = args.workers
+
+    if getattr(args, "rpm", None) is not None:
+        config["rate_limit_rpm"] = args.rpm
+
+    if getattr(args, "tpm", None) is not None:
+        config["rate_limit_tpm"] = args.tpm
+
+    if getattr(args, "near_duplicates", None):
+        config["near_duplicates"] = args.near_duplicates
+
+    if getattr(args, "near_duplicate_threshold", None) is not None:
+        config["near_duplicate_threshold"] = args.near_duplicate_threshold
+
+    if getattr(args, "front_matter", False):
+        config["summary_front_matter"] = True
+
+    if getattr(args, "metrics_port", None) is not None:
+        config["metrics_port"] = args.metrics_port
+
+    if getattr(args, "metrics_textfile", None):
+        config["metrics_textfile"] = str(args.metrics_textfile)
+
+    if getattr(args, "record", None):
+        config["cassette_path"] = str(args.record)
+        config["cassette_mode"] = "record"
+    elif getattr(args, "replay", None):
+        config["cassette_path"] = str(args.replay)
+        config["cassette_mode"] = "replay"
+
+    if getattr(args, "replay_speed", None) is not None:
+        config["replay_speed"] = args.replay_speed
+
+    return config
+
+
+def _run_profiled(run, output_dir: Path) -> None:
+    """Run ``run`` under cProfile and dump stats into ``output_dir``."""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        run()
+    finally:
+        profiler.disable()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        profile_file = output_dir / "profile.pstats"
+        profiler.dump_stats(str(profile_file))
+        print(f"\nProfile written to {profile_file}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+
 def main(argv: Optional[list] = None) -> int:
     parser = create_parser()
     args = parser.parse_args(argv)
@@ -143,23 +818,36 @@ def main(argv: Optional[list] = None) -> int:
     if args.input == "setup":
         return setup_command(args)
 
+    if args.input == "search":
+        return search_command(args)
+
+    if args.input == "watch":
+        return watch_command(args)
+
+    if args.input == "serve":
+        return serve_command(args)
+
+    if args.input == "enqueue":
+        return enqueue_command(args)
+
+    if args.input == "worker":
+        return worker_command(args)
+
+    if args.input == "plan":
+        return plan_command(args)
+
     # Handle main processing (default behavior)
     if not args.input:
         parser.print_help()
         return 1
 
-    try:
-        config = load_config(getattr(args, "config", None))
-
-        # Override config with CLI arguments
-        if hasattr(args, "prompt_file") and args.prompt_file:
-            config["prompt_file"] = str(args.prompt_file)
-
-        if hasattr(args, "no_markdown") and args.no_markdown:
-            config["pdf_to_markdown"] = False
+    if args.command_args:
+        parser.error(
+            f"unrecognized arguments: {' '.join(args.command_args)}"
+        )
 
-        if hasattr(args, "length") and args.length:
-            config["summary_length"] = args.length
+    try:
+        config = _build_config(args)
 
         processor = WinnowerProcessor(
             config,
@@ -167,12 +855,22 @@ def main(argv: Optional[list] = None) -> int:
             getattr(args, "verbose", False),
         )
 
-        processor.process(
+        output_dir = getattr(args, "output", Path.cwd())
+        run = partial(
+            processor.process,
             input_source=args.input,
-            output_dir=getattr(args, "output", Path.cwd()),
+            output_dir=output_dir,
             recursive=getattr(args, "recursive", False),
         )
 
+        try:
+            if getattr(args, "profile", False):
+                _run_profiled(run, output_dir)
+            else:
+                run()
+        finally:
+            processor.close()
+
         return 0
 
     except KeyboardInterrupt:
@@ -17,7 +17,58 @@ DEFAULT_CONFIG = {
     "extraction_prompt": None,
     "prompt_file": None,
     "pdf_to_markdown": True,
+    "stream_pdf_pages": 50,
+    "html_main_content": True,
+    "arxiv_source": False,
+    "max_content_tokens": 25000,
     "summary_length": 200,
+    "summary_lengths": [],
+    "profiles": {},
+    "active_profiles": [],
+    "cassette_path": None,
+    "cassette_mode": "replay",
+    "replay_speed": 0.0,
+    "run_report": True,
+    "trace_hooks": [],
+    "model_pricing": {},
+    "routes": [],
+    "hedge": False,
+    "hedge_after_s": None,
+    "hedge_min_samples": 20,
+    "cascade_model": None,
+    "cascade_provider": None,
+    "summary_front_matter": False,
+    "metrics_port": None,
+    "metrics_host": "127.0.0.1",
+    "metrics_textfile": None,
+    "metrics_interval": 15,
+    "include_patterns": [],
+    "exclude_patterns": [],
+    "max_depth": None,
+    "watch_debounce_s": 2.0,
+    "watch_poll_interval_s": 5.0,
+    "watch_notifications": True,
+    "watch_retry_s": 60.0,
+    "serve_host": "127.0.0.1",
+    "serve_port": 8765,
+    "queue_dir": None,
+    "lease_s": 60.0,
+    "queue_max_attempts": 3,
+    "output_layout": "flat",
+    "object_store": False,
+    "compression": "gzip",
+    "store": False,
+    "store_path": None,
+    "output_format": "markdown",
+    "output_batch_size": 100,
+    "schedule": "fifo",
+    "workers": 1,
+    "rate_limit_rpm": None,
+    "rate_limit_tpm": None,
+    "coalesce": True,
+    "deduplicate": True,
+    "near_duplicates": "off",
+    "near_duplicate_threshold": 0.9,
 }
 
 
@@ -1,11 +1,94 @@
 """Core processing logic for The Winnower."""
 
+import itertools
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
-from .parsers import PaperParser
-from .extractors import TechnicalExtractor
+from PyPDF2 import PdfReader
+
+from .cassettes import Cassette
+from .dedup import Deduplicator
+from .parsers import PAPER_EXTENSIONS, PaperParser
+from .extractors import CHARS_PER_TOKEN, TechnicalExtractor
 from .formatters import MarkdownFormatter
+from .metrics import MetricsServer, TextfileExporter, WinnowerMetrics
+from .neardup import NearDuplicateIndex
+from .layout import ShardedLayout
+from .objects import ObjectStore
+from .profiles import load_profiles
+from .singleflight import SingleFlight, content_key, source_key
+from .sinks import RecordSink, build_record, open_sink
+from .store import CorpusStore, default_store_path
+from .tracing import STAGES, Tracer
+from .usage import UsageTracker
+from .watch import DirectoryWatcher
+
+
+SCHEDULING_POLICIES = ["fifo", "shortest-first", "largest-first"]
+
+# Rough conversion factors for estimating prompt size before parsing.
+TOKENS_PER_PAGE = 600
+PDF_BYTES_PER_TOKEN = 50
+# Remote papers (URLs, arXiv IDs) are assumed to be a typical paper.
+REMOTE_PAPER_PAGES = 12
+
+
+def estimate_paper(source: str) -> Dict:
+    """Estimate the work for one paper from its size and page count.
+
+    Returns ``bytes`` and ``pages`` (None when unknown) and ``tokens``,
+    the estimated prompt size before truncation, which is what the
+    scheduler orders by.
+    """
+    path = Path(source)
+    if not path.is_file():
+        return {
+            "bytes": None,
+            "pages": REMOTE_PAPER_PAGES,
+            "tokens": REMOTE_PAPER_PAGES * TOKENS_PER_PAGE,
+        }
+
+    size = path.stat().st_size
+    if path.suffix.lower() != ".pdf":
+        return {"bytes": size, "pages": None, "tokens": size // CHARS_PER_TOKEN}
+
+    try:
+        pages = len(PdfReader(str(path)).pages)
+    except Exception:
+        pages = None
+    if pages:
+        tokens = pages * TOKENS_PER_PAGE
+    else:
+        tokens = size // PDF_BYTES_PER_TOKEN
+    return {"bytes": size, "pages": pages, "tokens": tokens}
+
+
+def schedule_papers(
+    papers: List[str], policy: str = "fifo", estimates: Optional[Dict] = None
+) -> List[str]:
+    """Order papers by ``policy``; ties keep their input order.
+
+    ``shortest-first`` minimizes time to first results, ``largest-first``
+    starts the longest jobs early so concurrent workers finish together.
+    """
+    if policy not in SCHEDULING_POLICIES:
+        raise ValueError(
+            f"Unknown scheduling policy {policy!r}; "
+            f"expected one of {', '.join(SCHEDULING_POLICIES)}"
+        )
+    if policy == "fifo":
+        return list(papers)
+
+    if estimates is None:
+        estimates = {paper: estimate_paper(paper) for paper in papers}
+    return sorted(
+        papers,
+        key=lambda paper: estimates[paper]["tokens"],
+        reverse=policy == "largest-first",
+    )
 
 
 class WinnowerProcessor:
@@ -16,100 +99,945 @@ class WinnowerProcessor:
         config: Dict,
         model_provider: str = "openai",
         verbose: bool = False,
+        shared: Optional["WinnowerProcessor"] = None,
     ):
         self.config = config
         self.verbose = verbose
+        self.model_provider = model_provider
 
-        self.parser = PaperParser(verbose=verbose, config=config)
+        self.tracer = Tracer.from_config(config)
+        self.metrics = shared.metrics if shared else WinnowerMetrics()
+        self.tracer.add_hook(self.metrics.observe_span)
+        self._exporters: List = []
+        if shared is not None:
+            self.cassette = shared.cassette
+            self.flights = shared.flights
+        else:
+            self.flights = SingleFlight()
+            self.metrics.watch_cache("coalesce", self.flights)
+            self.cassette = Cassette.from_config(config)
+            if self.cassette is not None:
+                self.metrics.watch_cache("cassette", self.cassette)
+        self.parser = PaperParser(
+            verbose=verbose,
+            config=config,
+            cassette=self.cassette,
+            tracer=self.tracer,
+        )
+        self.profiles = load_profiles(config, model_provider)
+        self.usage = UsageTracker()
+        # With profiles, the main extractor only prepares content
         self.extractor = TechnicalExtractor(
-            model_provider=model_provider, config=config, verbose=verbose
+            model_provider=model_provider,
+            config=config,
+            verbose=verbose,
+            cassette=self.cassette,
+            tracer=self.tracer,
+            metrics=self.metrics,
+            shared=shared.extractor if shared else None,
+            connect=not self.profiles,
+            usage=self.usage,
+        )
+        self.profile_extractors = {
+            profile.name: TechnicalExtractor(
+                model_provider=profile.provider,
+                config=profile.config,
+                verbose=verbose,
+                cassette=self.cassette,
+                tracer=self.tracer,
+                metrics=self.metrics,
+                shared=(
+                    shared.profile_extractors[profile.name]
+                    if shared
+                    else None
+                ),
+                usage=self.usage,
+            )
+            for profile in self.profiles
+        }
+        self.formatter = MarkdownFormatter(
+            front_matter=config.get("summary_front_matter", False)
+        )
+        self.deduplicator = Deduplicator()
+        self.metrics.watch_cache("dedup", self.deduplicator)
+        self._duplicates: Dict = {}
+        self._estimates: Dict[str, Dict] = {}
+        self.sink: Optional[RecordSink] = None
+        # Services and watch sessions keep one sink open across runs
+        self.keep_sink = False
+        self.objects: Optional[ObjectStore] = None
+        self.layout: Optional[ShardedLayout] = None
+        self.store: Optional[CorpusStore] = None
+        self._run_id: Optional[int] = None
+        self._near_duplicates_file: Optional[Path] = None
+        if shared is not None:
+            # One index, loaded and saved once, for all service workers
+            self.near_duplicates = shared.near_duplicates
+        else:
+            self.near_duplicates = NearDuplicateIndex.from_config(config)
+            if self.near_duplicates is not None:
+                self.metrics.watch_cache(
+                    "near_duplicate", self.near_duplicates
+                )
+
+    def fork(self) -> "WinnowerProcessor":
+        """A processor for another worker thread.
+
+        It shares this processor's API clients, routing state, in-flight
+        requests, cassette, near-duplicate index and metrics, but has its
+        own tracer, sinks and stores so both can run :meth:`process` at
+        the same time. Metrics exporters are left to this processor.
+        """
+        config = dict(self.config, metrics_port=None, metrics_textfile=None)
+        return WinnowerProcessor(
+            config, self.model_provider, self.verbose, shared=self
         )
-        self.formatter = MarkdownFormatter()
 
     def process(
-        self, input_source: str, output_dir: Path, recursive: bool = False
+        self,
+        input_source: Union[str, List[str]],
+        output_dir: Path,
+        recursive: bool = False,
     ) -> None:
-        """Process papers and generate technical summaries."""
-        papers = self._collect_papers(input_source, recursive)
+        """Process papers and generate technical summaries.
+
+        ``input_source`` is a file, directory, URL or arXiv ID, or a list
+        of them processed as one batch.
+        """
+        self.tracer.reset()
+        self.usage.reset()
+        for extractor in self._extractors():
+            extractor.reset_cascade()
+        self._start_exporters()
+        self._duplicates = {}
+        self._estimates = {}
+        sources = self._collect_papers(input_source, recursive, output_dir)
+        first = next(sources, None)
 
-        if not papers:
+        if first is None:
             print("No papers found to process.")
             return
 
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        # Papers stream straight from the directory walk, duplicates
+        # dropped on the way; arXiv papers wait for the end of the walk in
+        # case a later version follows.
+        papers = itertools.chain([first], sources)
+        if self.config.get("deduplicate", True):
+            papers = self.deduplicator.stream(papers, self._duplicates)
+
+        if self.near_duplicates is not None:
+            self._load_near_duplicates(output_dir / "near_duplicates.jsonl")
+
         # Create organized directory structure
         papers_dir = output_dir / "papers"
         extracted_dir = output_dir / "extracted"
         summaries_dir = output_dir / "summaries"
 
-        for dir_path in [papers_dir, extracted_dir, summaries_dir]:
-            dir_path.mkdir(parents=True, exist_ok=True)
+        # A dataset sink replaces the per-paper markdown files, and the
+        # object store replaces the papers/ and extracted/ copies
+        self._open_sink(output_dir)
+        self.objects = ObjectStore.from_config(self.config, output_dir)
+        self.layout = ShardedLayout.from_config(self.config, output_dir)
+        if self.objects is not None:
+            self.metrics.watch_cache("objects", self.objects)
+            dir_paths = [summaries_dir]
+        else:
+            dir_paths = [papers_dir, extracted_dir, summaries_dir]
+        dir_paths.extend(
+            summaries_dir / profile.name for profile in self.profiles
+        )
+        if self.sink is None:
+            for dir_path in dir_paths:
+                dir_path.mkdir(parents=True, exist_ok=True)
+
+        if self.config.get("store", False):
+            self._open_store(default_store_path(self.config, output_dir))
+            self._run_id = self.store.begin_run(
+                str(input_source), self.model_provider, self.config
+            )
+
+        policy = self.config.get("schedule", "fifo")
+        if policy != "fifo":
+            papers = list(papers)
+            self._estimates = {paper: estimate_paper(paper) for paper in papers}
+            papers = schedule_papers(papers, policy, self._estimates)
+            if self.verbose:
+                total = sum(e["tokens"] for e in self._estimates.values())
+                print(
+                    f"Scheduled {len(papers)} papers {policy} "
+                    f"(~{total} tokens estimated)"
+                )
+
+        queued = isinstance(papers, list)
+        if queued:
+            self.metrics.queue_depth.set(len(papers))
+
+        def run(paper_source: str) -> None:
+            if queued:
+                self.metrics.queue_depth.dec()
+            self._process_paper(
+                paper_source, papers_dir, extracted_dir, summaries_dir
+            )
+
+        workers = max(1, int(self.config.get("workers", 1)))
+        routers = [
+            extractor.router
+            for extractor in self._extractors()
+            if extractor.router is not None
+        ]
+        for router in routers:
+            router.start_run()
+        try:
+            if workers == 1:
+                for paper_source in papers:
+                    run(paper_source)
+            else:
+                # Workers take papers in submission order, so the schedule
+                # decides which paper each free worker picks up next.
+                with ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="winnower"
+                ) as pool:
+                    futures = [pool.submit(run, paper) for paper in papers]
+                    try:
+                        for future in futures:
+                            future.result()
+                    except BaseException:
+                        for future in futures:
+                            future.cancel()
+                        raise
+            if self._duplicates:
+                self._record_duplicates(output_dir)
+        finally:
+            for extractor in self._extractors():
+                extractor.finish_hedges()
+            for router in routers:
+                router.finish_run()
+            if self._run_id is not None:
+                self.store.finish_run(self._run_id, self.usage.summary())
+                self._run_id = None
+            if self.objects is not None and self.verbose:
+                print(
+                    f"Object store: {self.objects.misses} new, "
+                    f"{self.objects.hits} reused, "
+                    f"{self.objects.bytes_written} bytes written"
+                )
+            if self.keep_sink and self.sink is not None:
+                self.sink.flush()
+            else:
+                self._close_sink()
+            if self._near_duplicates_file is not None:
+                self.near_duplicates.save(self._near_duplicates_file)
+            if self.cassette is not None and self.cassette.mode == "record":
+                self.cassette.save()
+                if self.verbose:
+                    print(
+                        f"Recorded {len(self.cassette)} responses to "
+                        f"{self.cassette.path}"
+                    )
+            self._write_run_report(output_dir)
+            for exporter in self._exporters:
+                if isinstance(exporter, TextfileExporter):
+                    exporter.write()
+
+    def watch(
+        self,
+        directory: Path,
+        output_dir: Path,
+        recursive: bool = False,
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        """Process papers as they appear in ``directory`` until stopped.
+
+        The processor stays warm between batches: clients, caches, the
+        near-duplicate index, the corpus store and the dataset sink are
+        reused. Papers
+        processed successfully are remembered in ``watch_state.json`` in
+        the output directory; failed ones are retried after
+        ``watch_retry_s``.
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            raise ValueError(f"Not a directory: {directory}")
+
+        watcher = DirectoryWatcher.from_config(
+            self.config,
+            directory,
+            lambda: self.parser.find_papers_in_directory(
+                directory, recursive, skip=[output_dir]
+            ),
+            state_file=output_dir / "watch_state.json",
+            accepts=lambda path: self.parser.accepts(
+                path, directory, recursive, skip=[output_dir]
+            ),
+        )
+        mode = "notifications" if watcher.notifications else "polling"
+        print(f"Watching {directory} for papers ({mode}); Ctrl-C to stop")
+
+        def handle(paths: List[Path]) -> List[Path]:
+            print(f"\n{len(paths)} new paper(s) in {directory}")
+            self.process([str(path) for path in paths], output_dir)
+            failed = {
+                paper["source"]
+                for paper in self.tracer.report()["papers"]
+                if paper.get("status") in ("failed", "error")
+            }
+            return [path for path in paths if str(path) in failed]
+
+        self.keep_sink = True
+        try:
+            watcher.run(handle, stop)
+        finally:
+            self._close_sink()
+
+    def _record_duplicates(self, output_dir: Path) -> None:
+        """Record the skipped duplicates in duplicates.json and the store."""
+        skipped = sum(len(dups) for dups in self._duplicates.values())
+        self.metrics.papers.inc(skipped, status="skipped")
+        duplicates_file = output_dir / "duplicates.json"
+        duplicates_file.write_text(
+            json.dumps(self._duplicates, indent=2), encoding="utf-8"
+        )
+        if self.store is not None:
+            # Copies found after their paper was stored
+            for kept, dups in self._duplicates.items():
+                self.store.add_aliases(kept, dups)
+
+        print(f"Skipped {skipped} duplicate paper(s); see {duplicates_file}")
+        if self.verbose:
+            for kept, dups in self._duplicates.items():
+                for dup in dups:
+                    print(f"  {dup['source']} -> {kept} ({dup['reason']})")
+
+    def close(self) -> None:
+        """Stop metrics exporters and close the sink and corpus store."""
+        for exporter in self._exporters:
+            exporter.stop()
+        self._exporters = []
+        self._close_sink()
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def _extractors(self) -> List[TechnicalExtractor]:
+        """The extractors that send requests in this run."""
+        return list(self.profile_extractors.values()) or [self.extractor]
+
+    def _start_exporters(self) -> None:
+        """Start the configured metrics exporters (once per processor)."""
+        if self._exporters:
+            return
+
+        textfile = self.config.get("metrics_textfile")
+        if textfile:
+            self._exporters.append(
+                TextfileExporter(
+                    self.metrics.registry,
+                    Path(textfile),
+                    interval=float(self.config.get("metrics_interval", 15)),
+                ).start()
+            )
+
+        port = self.config.get("metrics_port")
+        if port is not None:
+            host = self.config.get("metrics_host", "127.0.0.1")
+            server = MetricsServer(
+                self.metrics.registry, host=host, port=int(port)
+            ).start()
+            self._exporters.append(server)
+            print(f"Serving metrics on http://{host}:{server.port}/metrics")
 
-        for paper_source in papers:
+    def _write_run_report(self, output_dir: Path) -> None:
+        """Write the JSON run report and print a per-stage summary."""
+        if not self.config.get("run_report", True):
+            return
+
+        report_file = output_dir / "run_report.json"
+        extra = {
+            "usage": self.usage.summary(),
+            "duplicates": self._duplicates,
+            "schedule": {
+                "policy": self.config.get("schedule", "fifo"),
+                "workers": max(1, int(self.config.get("workers", 1))),
+            },
+        }
+        if self.profiles:
+            extra["profiles"] = {}
+            for name, extractor in self.profile_extractors.items():
+                profile = {"provider": extractor.model_provider}
+                if extractor.router is not None:
+                    profile["routing"] = extractor.router.stats()
+                if extractor.cascade is not None:
+                    profile["cascade"] = extractor.cascade_stats()
+                extra["profiles"][name] = profile
+        else:
+            if self.extractor.router is not None:
+                extra["routing"] = self.extractor.router.stats()
+            if self.extractor.cascade is not None:
+                extra["cascade"] = self.extractor.cascade_stats()
+        report = self.tracer.write_report(report_file, extra)
+
+        if self.verbose:
+            print(f"\nRun report: {report_file}")
+            for name in STAGES:
+                stage = report["stages"].get(name)
+                if stage:
+                    print(
+                        f"  {name:<11}{stage['total_s']:>9.2f}s total"
+                        f"{stage['p50_s']:>9.2f}s p50"
+                        f"{stage['p95_s']:>9.2f}s p95"
+                    )
+            total = report["usage"]["total"]
+            print(
+                f"  tokens: {total['input_tokens']} in "
+                f"({total['cached_tokens']} cached), "
+                f"{total['output_tokens']} out, "
+                f"est. cost ${total['cost_usd']:.4f}"
+            )
+            if report.get("peak_rss_mb"):
+                print(f"  peak RSS: {report['peak_rss_mb']:.0f} MB")
+
+    def _process_paper(
+        self,
+        paper_source: str,
+        papers_dir: Path,
+        extracted_dir: Path,
+        summaries_dir: Path,
+    ) -> None:
+        """Parse, extract and write a single paper."""
+        with self.tracer.paper(str(paper_source)) as paper_span:
             try:
                 if self.verbose:
                     print(f"\nProcessing: {paper_source}")
 
-                paper_data = self.parser.parse(str(paper_source))
-
-                # Save original paper if it's a local file
-                source_path = Path(paper_source)
-                if source_path.is_file():
-                    paper_filename = source_path.name
-                    if source_path.suffix.lower() in [".pdf", ".txt", ".md"]:
-                        import shutil
+                if paper_source in self._estimates:
+                    paper_span.attributes["estimate"] = self._estimates[
+                        paper_source
+                    ]
 
-                        paper_dest = papers_dir / paper_filename
-                        shutil.copy2(source_path, paper_dest)
-                        if self.verbose:
-                            print(f"Saved original paper: {paper_dest}")
+                paper_data = self._parse(str(paper_source), paper_span)
+                paper_span.attributes["title"] = paper_data["title"]
 
-                # Save extracted content
-                extracted_filename = self._generate_safe_filename(
-                    paper_data["title"], "extracted"
+                paths = self._output_paths(
+                    paper_source,
+                    paper_data,
+                    papers_dir,
+                    extracted_dir,
+                    summaries_dir,
                 )
-                extracted_file = (
-                    extracted_dir / f"{extracted_filename}.md"
-                )
-                extracted_file.write_text(
-                    paper_data["content"], encoding="utf-8"
-                )
-                if self.verbose:
-                    print(f"Saved extracted text: {extracted_file}")
+                targets = self._targets(paths, summaries_dir)
+                files: Dict = {}
+                if self.sink is None and self.objects is not None:
+                    files = self._store_inputs(paper_source, paper_data)
+                    paper_span.attributes["objects"] = files
+                elif self.sink is None:
+                    files = self._write_inputs(paper_source, paper_data, paths)
 
-                # Generate and save summary
-                technical_content = self.extractor.extract(paper_data)
-                markdown_output = self.formatter.format(technical_content)
+                # Reuse or skip work for near-duplicates of earlier papers
+                content = None
+                signature = None
+                if self.near_duplicates is not None:
+                    with self.tracer.span("preprocess"):
+                        content = self.extractor.prepare_content(
+                            paper_data["content"]
+                        )
+                    with self.tracer.span("near_duplicate"):
+                        signature = self.near_duplicates.signature(content)
+                        match = self.near_duplicates.best_match(signature)
+                    if match and self._handle_near_duplicate(
+                        match, paper_data, paper_span, paths, targets, files
+                    ):
+                        return
 
-                summary_filename = self._generate_safe_filename(
-                    paper_data["title"], "summary"
+                # Generate and save summaries, one per profile
+                if content is None:
+                    with self.tracer.span("preprocess"):
+                        content = self.extractor.prepare_content(
+                            paper_data["content"]
+                        )
+                results = self._summarize_targets(
+                    targets, paper_source, paper_data, content, paper_span
                 )
-                summary_file = summaries_dir / f"{summary_filename}.md"
-                summary_file.write_text(markdown_output, encoding="utf-8")
 
-                print(f"Generated summary: {summary_file}")
+                metadata = {"title": paper_data["title"]}
+                technical_content, summary_file, _ = results[0]
+                if summary_file is not None:
+                    metadata["summary"] = str(summary_file)
+                    paper_span.attributes["summary"] = str(summary_file)
+                    for _, _, written in results:
+                        files = dict(files, **written)
+                    self._index_paper(
+                        paper_source, paper_data, paths, files, summary_file
+                    )
+                if self.profiles and self.sink is None:
+                    metadata["profiles"] = {
+                        name: str(result[1])
+                        for (name, _, _), result in zip(targets, results)
+                    }
+
+                if self.store is not None:
+                    with self.tracer.span("write", kind="store"):
+                        self.store.add_paper(
+                            paper_data,
+                            technical_content,
+                            run_id=self._run_id,
+                            status=paper_span.status,
+                            timings=paper_span.stages,
+                            summary_path=metadata.get("summary"),
+                            aliases=self._duplicates.get(paper_source),
+                        )
+
+                if signature is not None and paper_span.status == "ok":
+                    self.near_duplicates.add(
+                        str(paper_source), signature, metadata
+                    )
 
             except Exception as e:
+                paper_span.status = "failed"
+                paper_span.error = str(e)
                 print(f"Error processing {paper_source}: {e}")
                 if self.verbose:
                     import traceback
 
                     traceback.print_exc()
 
-    def _collect_papers(self, input_source: str, recursive: bool) -> List[str]:
-        """Collect papers to process from input source."""
-        source_path = Path(input_source)
+    def _targets(
+        self, paths: Dict, summaries_dir: Path
+    ) -> List[Tuple[Optional[str], TechnicalExtractor, Dict]]:
+        """Each profile's name, extractor and output paths.
+
+        Profiles write their summaries under ``summaries/<name>/``; a run
+        without profiles has the one unnamed target.
+        """
+        if not self.profiles:
+            return [(None, self.extractor, self._summary_paths(paths))]
+
+        targets = []
+        for name, extractor in self.profile_extractors.items():
+            summary = paths["summary"]
+            moved = dict(
+                paths,
+                summary=summaries_dir / name / summary.relative_to(
+                    summaries_dir
+                ),
+            )
+            targets.append(
+                (name, extractor, self._summary_paths(moved, extractor))
+            )
+        return targets
+
+    def _summarize_targets(
+        self,
+        targets: List[Tuple[Optional[str], TechnicalExtractor, Dict]],
+        paper_source: str,
+        paper_data: Dict,
+        content: str,
+        paper_span,
+    ) -> List[Tuple[Dict, Optional[Path], Dict]]:
+        """Summarize a parsed paper for every target, concurrently."""
+        if len(targets) == 1:
+            return [
+                self._summarize(
+                    targets[0], paper_source, paper_data, content, paper_span
+                )
+            ]
+
+        def summarize(target) -> Tuple[Dict, Optional[Path], Dict]:
+            with self.tracer.attach(paper_span):
+                return self._summarize(
+                    target, paper_source, paper_data, content, paper_span
+                )
+
+        with ThreadPoolExecutor(
+            max_workers=len(targets), thread_name_prefix="winnower-profile"
+        ) as pool:
+            return list(pool.map(summarize, targets))
+
+    def _summarize(
+        self,
+        target: Tuple[Optional[str], TechnicalExtractor, Dict],
+        paper_source: str,
+        paper_data: Dict,
+        content: str,
+        paper_span,
+    ) -> Tuple[Dict, Optional[Path], Dict]:
+        """Extract and write one target's summary of a parsed paper.
+
+        Returns the extraction result, the main summary file (None when
+        writing to a dataset sink) and the other files written, by kind.
+        """
+        name, extractor, paths = target
+        technical_content = self._extract(
+            paper_data, content, paper_span, extractor, name
+        )
+        # A profile's details go under its name in the paper's span
+        if name is None:
+            attributes = paper_span.attributes
+        else:
+            attributes = paper_span.attributes.setdefault("profiles", {})
+            attributes = attributes.setdefault(name, {})
+
+        usage = technical_content.get("usage")
+        self.usage.record(str(paper_source), usage)
+        self.metrics.record_usage(usage)
+        if usage:
+            attributes["usage"] = usage
+        if technical_content.get("tier"):
+            attributes["tier"] = technical_content["tier"]
+        cascade = technical_content.get("cascade")
+        if cascade:
+            # The rejected cheap attempt was billed too
+            attributes["cascade"] = cascade
+            self.usage.record(str(paper_source), cascade["usage"])
+            self.metrics.record_usage(cascade["usage"])
+        if technical_content.get("error"):
+            paper_span.status = "failed"
+            paper_span.error = technical_content["error"]
+            if name is not None:
+                paper_span.error = f"{name}: {paper_span.error}"
+
+        label = "summary" if name is None else f"{name} summary"
+        if self.sink is not None:
+            record = build_record(
+                paper_data,
+                technical_content,
+                paper_span.status,
+                paper_span.stages,
+                profile=name,
+            )
+            with self.tracer.span("write", kind="record"):
+                self.sink.write(record)
+            print(f"Recorded {label}: {paper_data['title']}")
+            return technical_content, None, {}
+
+        # One file per requested length, or the one summary
+        summaries = technical_content.get("summaries") or {}
+        outputs = {
+            paths["summaries"][length]: dict(
+                technical_content, technical_content=text
+            )
+            for length, text in summaries.items()
+        } or {paths["summary"]: technical_content}
+        with self.tracer.span("format"):
+            outputs = {
+                path: self.formatter.format(data)
+                for path, data in outputs.items()
+            }
+
+        summary_file = paths["summary"]
+        with self.tracer.span("write", kind="summary"):
+            summary_file.parent.mkdir(parents=True, exist_ok=True)
+            for path, markdown_output in outputs.items():
+                path.write_text(markdown_output, encoding="utf-8")
+        for path in outputs:
+            print(f"Generated {label}: {path}")
+
+        prefix = "summary" if name is None else f"summary_{name}"
+        written = {}
+        if name is not None:
+            written[prefix] = summary_file
+            attributes["summary"] = str(summary_file)
+        for length in summaries:
+            written[f"{prefix}_{length}w"] = paths["summaries"][length]
+        return technical_content, summary_file, written
+
+    def _parse(self, paper_source: str, paper_span) -> Dict:
+        """Parse a paper, sharing the work with concurrent requests for it."""
+        if not self.config.get("coalesce", True):
+            return self.parser.parse(paper_source)
+
+        paper_data, shared = self.flights.do(
+            source_key(paper_source), lambda: self.parser.parse(paper_source)
+        )
+        if not shared:
+            return paper_data
+        paper_span.attributes.setdefault("coalesced", []).append("parse")
+        paper_data = dict(paper_data)
+        if Path(paper_source).is_file():
+            paper_data["source"] = paper_source
+        return paper_data
+
+    def _extract(
+        self,
+        paper_data: Dict,
+        content: str,
+        paper_span,
+        extractor: Optional[TechnicalExtractor] = None,
+        profile: Optional[str] = None,
+    ) -> Dict:
+        """Extract a summary, sharing the LLM call with identical requests.
+
+        A paper that joined another's call cost nothing, so its result
+        carries no usage. Calls for different profiles are never shared.
+        """
+        extractor = extractor or self.extractor
+        if not self.config.get("coalesce", True):
+            return extractor.extract(paper_data, content)
+
+        key = content_key(paper_data["title"], content)
+        if profile is not None:
+            key = f"{key}:{profile}"
+        technical_content, shared = self.flights.do(
+            key, lambda: extractor.extract(paper_data, content)
+        )
+        if not shared:
+            return technical_content
+        paper_span.attributes.setdefault("coalesced", []).append("extract")
+        return dict(
+            technical_content,
+            source=paper_data["source"],
+            usage=None,
+            cascade=None,
+        )
+
+    def _open_sink(self, output_dir: Path) -> None:
+        """Open the dataset sink, reusing a kept one across runs."""
+        if self.sink is not None:
+            if self.keep_sink and self.sink.path.parent == output_dir:
+                return
+            self._close_sink()
+        self.sink = open_sink(self.config, output_dir)
+
+    def _close_sink(self) -> None:
+        if self.sink is None:
+            return
+        self.sink.close()
+        print(f"Wrote {self.sink.written} records to {self.sink.path}")
+        self.sink = None
+
+    def _open_store(self, path: Path) -> None:
+        """Open the corpus store at ``path``, reusing it across runs."""
+        if self.store is not None and self.store.path == path:
+            return
+        if self.store is not None:
+            self.store.close()
+        self.store = CorpusStore(path)
+        if self.verbose:
+            print(f"Writing corpus store: {path}")
+
+    def _store_inputs(self, paper_source: str, paper_data: Dict) -> Dict:
+        """Add the original paper and extracted text to the object store."""
+        original = None
+        source_path = Path(paper_source)
+        if (
+            source_path.is_file()
+            and source_path.suffix.lower() in PAPER_EXTENSIONS
+        ):
+            with self.tracer.span("write", kind="original"):
+                original = self.objects.put_file(source_path)
+
+        with self.tracer.span("write", kind="extracted"):
+            extracted = self.objects.put_text(paper_data["content"])
+
+        objects = self.objects.record(
+            str(paper_source), original=original, extracted=extracted
+        )
+        if self.verbose:
+            print(f"Stored objects: {', '.join(objects.values())}")
+        return objects
+
+    def _output_paths(
+        self,
+        paper_source: str,
+        paper_data: Dict,
+        papers_dir: Path,
+        extracted_dir: Path,
+        summaries_dir: Path,
+    ) -> Dict:
+        """Where a paper's original, extracted text and summary are written."""
+        if self.layout is not None:
+            return self.layout.paths(str(paper_source), paper_data)
 
+        extracted_filename = self._generate_safe_filename(
+            paper_data["title"], "extracted"
+        )
+        summary_filename = self._generate_safe_filename(
+            paper_data["title"], "summary"
+        )
+        return {
+            "original": papers_dir / Path(paper_source).name,
+            "extracted": extracted_dir / f"{extracted_filename}.md",
+            "summary": summaries_dir / f"{summary_filename}.md",
+        }
+
+    def _summary_paths(
+        self, paths: Dict, extractor: Optional[TechnicalExtractor] = None
+    ) -> Dict:
+        """``paths`` with a summary file for each of ``summary_lengths``.
+
+        ``summaries`` maps each length to its file, e.g.
+        ``..._summary_100w.md``, and ``summary`` becomes the file of the
+        main length.
+        """
+        extractor = extractor or self.extractor
+        lengths = extractor.summary_lengths()
+        if lengths:
+            paths = dict(paths)
+            summary = paths["summary"]
+            paths["summaries"] = {
+                length: summary.with_name(
+                    f"{summary.stem}_{length}w{summary.suffix}"
+                )
+                for length in lengths
+            }
+            paths["summary"] = paths["summaries"][extractor.main_length()]
+        return paths
+
+    def _index_paper(
+        self,
+        paper_source: str,
+        paper_data: Dict,
+        paths: Dict,
+        files: Dict,
+        summary_file: Path,
+    ) -> None:
+        """Add a paper's files to the sharded layout's index."""
+        if self.layout is None:
+            return
+        self.layout.record(
+            paths["id"],
+            paper_data["title"],
+            str(paper_source),
+            dict(files, summary=summary_file),
+        )
+
+    def _write_inputs(
+        self, paper_source: str, paper_data: Dict, paths: Dict
+    ) -> Dict[str, Path]:
+        """Copy the original paper and save its extracted text."""
+        written = {}
+
+        # Save original paper if it's a local file
+        source_path = Path(paper_source)
         if source_path.is_file():
-            return [input_source]
-        elif source_path.is_dir():
+            if source_path.suffix.lower() in PAPER_EXTENSIONS:
+                import shutil
+
+                paper_dest = paths["original"]
+                with self.tracer.span("write", kind="original"):
+                    paper_dest.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(source_path, paper_dest)
+                written["original"] = paper_dest
+                if self.verbose:
+                    print(f"Saved original paper: {paper_dest}")
+
+        # Save extracted content
+        extracted_file = paths["extracted"]
+        with self.tracer.span("write", kind="extracted"):
+            extracted_file.parent.mkdir(parents=True, exist_ok=True)
+            extracted_file.write_text(paper_data["content"], encoding="utf-8")
+        written["extracted"] = extracted_file
+        if self.verbose:
+            print(f"Saved extracted text: {extracted_file}")
+        return written
+
+    def _load_near_duplicates(self, index_file: Path) -> None:
+        """Load the persisted near-duplicate index for this output dir."""
+        if self._near_duplicates_file == index_file:
+            return
+        self._near_duplicates_file = index_file
+        if index_file.exists():
+            self.near_duplicates.load(index_file)
+            if self.verbose:
+                print(
+                    f"Loaded {len(self.near_duplicates)} signatures "
+                    f"from {index_file}"
+                )
+
+    def _handle_near_duplicate(
+        self,
+        match: Tuple[str, float, Dict],
+        paper_data: Dict,
+        paper_span,
+        paths: Dict,
+        targets: List[Tuple[Optional[str], TechnicalExtractor, Dict]],
+        files: Dict,
+    ) -> bool:
+        """Apply the near_duplicates policy; True if the paper is done.
+
+        Summaries are reused only when the earlier paper has one for
+        every profile of this run.
+        """
+        key, score, metadata = match
+        mode = self.config.get("near_duplicates", "off")
+        paper_span.attributes["near_duplicate_of"] = {
+            "source": key,
+            "similarity": round(score, 4),
+        }
+        print(
+            f"Near-duplicate of {key} "
+            f"(similarity {score:.2f}): {paper_data['title']}"
+        )
+
+        if mode == "skip":
+            paper_span.status = "skipped"
+            return True
+
+        originals = metadata.get("profiles") or {
+            None: metadata.get("summary")
+        }
+        reuse = [
+            (Path(originals.get(name) or ""), target_paths["summary"])
+            for name, _, target_paths in targets
+        ]
+        if mode != "reuse" or not all(
+            original.is_file() for original, _ in reuse
+        ):
+            return False
+
+        for original, summary_file in reuse:
+            if summary_file == original:
+                continue
+            lines = original.read_text(encoding="utf-8").split("\n")
+            note = (
+                f"> Near-duplicate of {key} (similarity {score:.2f}); "
+                f"summary reused from {original.name}."
+            )
+            heading = next(
+                (i for i, line in enumerate(lines) if line.startswith("# ")),
+                0,
+            )
+            lines[heading + 1:heading + 1] = ["", note]
+
+            with self.tracer.span("write", kind="summary"):
+                summary_file.parent.mkdir(parents=True, exist_ok=True)
+                summary_file.write_text("\n".join(lines), encoding="utf-8")
+            print(f"Reused summary: {summary_file}")
+
+        original, summary_file = reuse[0]
+        if summary_file != original:
+            self._index_paper(
+                paper_data["source"], paper_data, paths, files, summary_file
+            )
+        paper_span.status = "skipped"
+        paper_span.attributes["reused_summary"] = str(original)
+        return True
+
+    def _collect_papers(
+        self,
+        input_source: Union[str, List[str]],
+        recursive: bool,
+        output_dir: Optional[Path] = None,
+    ) -> Iterator[str]:
+        """Yield papers to process from input source."""
+        if isinstance(input_source, (list, tuple)):
+            for source in input_source:
+                yield from self._collect_papers(source, recursive, output_dir)
+            return
+
+        source_path = Path(input_source)
+
+        if source_path.is_dir():
             files = self.parser.find_papers_in_directory(
-                source_path, recursive
+                source_path,
+                recursive,
+                skip=[output_dir] if output_dir is not None else None,
             )
-            return [str(f) for f in files]
+            for f in files:
+                yield str(f)
         else:
-            return [input_source]
+            yield input_source
 
     def _generate_safe_filename(self, title: str, suffix: str = "") -> str:
         """Generate a safe filename from paper title, focusing on security."""
@@ -0,0 +1,202 @@
+"""Duplicate detection ahead of LLM dispatch."""
+
+import hashlib
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+ARXIV_ID_PATTERN = re.compile(r"(?<![\d.])(\d{4}\.\d{4,5})(?:v(\d+))?(?!\d)")
+
+# Version rank of a bare remote ID such as "2501.00089": arXiv serves the
+# latest version for it, so it outranks any explicit version.
+LATEST = float("inf")
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes, read in chunks.
+
+    Digests are remembered by real path, size and modification time, so
+    deduplication, request coalescing and the object store read each
+    version of a file once between them.
+    """
+    stat = os.stat(path)
+    return _file_hash(
+        os.path.realpath(path), stat.st_size, stat.st_mtime_ns, chunk_size
+    )
+
+
+@lru_cache(maxsize=4096)
+def _file_hash(path: str, size: int, mtime_ns: int, chunk_size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_arxiv_id(source: str) -> Optional[Tuple[str, float]]:
+    """Return ``(base_id, version_rank)`` for an arXiv source, if any.
+
+    Recognizes bare IDs, arxiv.org URLs and file names such as
+    ``2501.00089v2.pdf``. Unversioned local files rank lowest because the
+    version they hold is unknown.
+    """
+    if "://" in source:
+        parsed = urlparse(source)
+        if "arxiv.org" not in parsed.netloc:
+            return None
+        name = parsed.path.rsplit("/", 1)[-1]
+        remote = True
+    else:
+        path = Path(source)
+        remote = not path.exists()
+        name = path.name
+
+    match = ARXIV_ID_PATTERN.search(name)
+    if not match:
+        return None
+    if match.group(2):
+        return match.group(1), float(match.group(2))
+    return match.group(1), LATEST if remote else 0.0
+
+
+class DedupResult:
+    """Unique sources to process and the duplicates folded into each."""
+
+    def __init__(self, unique: List[str], duplicates: Dict[str, List[Dict]]):
+        self.unique = unique
+        self.duplicates = duplicates
+
+    @property
+    def skipped(self) -> int:
+        return sum(len(dups) for dups in self.duplicates.values())
+
+    def to_dict(self) -> Dict:
+        return {"unique": len(self.unique), "duplicates": self.duplicates}
+
+
+class Deduplicator:
+    """Group sources by arXiv ID and content hash, keeping one of each.
+
+    Sources naming the same arXiv paper collapse to the latest version,
+    then byte-identical local files are grouped by SHA-256 (only files
+    sharing a size are hashed). ``hits`` and ``misses`` count duplicates
+    and unique papers so the deduplicator can be watched like a cache.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def deduplicate(self, sources: List[str]) -> DedupResult:
+        sources = list(sources)
+        duplicates: Dict[str, List[Dict]] = {}
+        unique = list(self.stream(sources, duplicates))
+        order = {source: index for index, source in enumerate(sources)}
+        unique.sort(key=order.__getitem__)
+        return DedupResult(unique, duplicates)
+
+    def stream(
+        self, sources: Iterable[str], duplicates: Dict[str, List[Dict]]
+    ) -> Iterator[str]:
+        """Yield the unique sources while ``sources`` is still produced.
+
+        Byte-identical files are dropped as they are seen, so papers from
+        a directory walk start processing at once. Sources naming an
+        arXiv paper are held back until ``sources`` is exhausted, since a
+        later version may still follow; the latest version is kept
+        whatever the walk order, and dropped only if it is a copy of a
+        file already yielded. The skipped duplicates are then added to
+        ``duplicates``, keyed by the source kept for them.
+        """
+        seen = set()
+        first_of_size: Dict[int, str] = {}
+        by_hash: Dict[str, str] = {}
+        canonical: Dict[str, str] = {}
+        reasons: Dict[str, str] = {}
+        order: List[str] = []
+        versions: Dict[str, List[Tuple[float, int, str]]] = {}
+        copies: Dict[str, str] = {}
+
+        def kept_copy(source: str) -> Optional[str]:
+            path = Path(source)
+            if not path.is_file():
+                return None
+            size = path.stat().st_size
+            first = first_of_size.setdefault(size, source)
+            if first == source:
+                return None
+            # A second file of this size: hash both, once
+            by_hash.setdefault(file_hash(Path(first)), first)
+            return by_hash.setdefault(file_hash(path), source)
+
+        def identical(a: str, b: str) -> bool:
+            path_a, path_b = Path(a), Path(b)
+            return (
+                path_a.is_file()
+                and path_b.is_file()
+                and path_a.stat().st_size == path_b.stat().st_size
+                and file_hash(path_a) == file_hash(path_b)
+            )
+
+        unique = 0
+        for source in sources:
+            if source in seen:
+                continue
+            seen.add(source)
+            order.append(source)
+
+            kept = kept_copy(source)
+            parsed = parse_arxiv_id(source)
+            if parsed:
+                # The version is decided first, at the end of the walk
+                if kept is not None and kept != source:
+                    copies[source] = kept
+                base_id, rank = parsed
+                index = len(order)
+                versions.setdefault(base_id, []).append((rank, -index, source))
+                continue
+            if kept is not None and kept != source:
+                canonical[source] = kept
+                reasons[source] = "identical content"
+                continue
+            unique += 1
+            yield source
+
+        held = []
+        for base_id, entries in versions.items():
+            keep = max(entries)[2]
+            for _, _, source in entries:
+                if source == keep:
+                    continue
+                canonical[source] = keep
+                if identical(source, keep):
+                    reasons[source] = "identical content"
+                else:
+                    reasons[source] = f"older version of arXiv:{base_id}"
+            copy = copies.get(keep)
+            if copy is not None and not parse_arxiv_id(copy):
+                # The same file was already yielded under another name
+                canonical[keep] = copy
+                reasons[keep] = "identical content"
+            else:
+                held.append((-max(entries)[1], keep))
+
+        for source in order:
+            if source not in canonical:
+                continue
+            root = canonical[source]
+            while root in canonical:
+                root = canonical[root]
+            duplicates.setdefault(root, []).append(
+                {"source": source, "reason": reasons[source]}
+            )
+        self.hits += len(canonical)
+        self.misses += unique + len(held)
+
+        for _, source in sorted(held):
+            yield source
@@ -0,0 +1,491 @@
+"""Share papers between workers on several hosts through lease files."""
+
+import hashlib
+import json
+import os
+import random
+import shutil
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .core import WinnowerProcessor
+
+
+# Outputs of a staged run that are not published
+UNPUBLISHED = {"run_report.json", "near_duplicates.jsonl", "duplicates.json"}
+# Age after which an append lock was left by a crashed worker
+APPEND_LOCK_STALE_S = 60.0
+
+
+class Lease:
+    """A worker's claim on one paper until ``expires_at`` (epoch seconds)."""
+
+    def __init__(
+        self, key: str, source: str, worker: str, token: str, expires_at: float
+    ):
+        self.key = key
+        self.source = source
+        self.worker = worker
+        self.token = token
+        self.expires_at = expires_at
+
+    def to_dict(self) -> Dict:
+        return {
+            "key": self.key,
+            "source": self.source,
+            "worker": self.worker,
+            "token": self.token,
+            "expires_at": self.expires_at,
+        }
+
+
+class LeaseQueue:
+    """A work queue kept as files in a directory on a shared filesystem.
+
+    ``tasks/<key>.json`` holds each queued paper, ``leases/<key>.json``
+    the worker processing it and ``done/<key>.json`` its outcome. Every
+    state change is one exclusive create, rename or replace, which NFS,
+    SMB and cluster filesystems perform atomically, so workers need no
+    coordinator. Leases last ``lease_s`` and are renewed by heartbeats;
+    the paper of a crashed worker is taken over once its lease expires.
+    Expiry compares wall clocks, so hosts need synchronized time.
+
+    Outputs are written to a private staging directory and published by
+    :meth:`commit`, which only the first worker to finish a paper gets
+    to do, so each summary is written exactly once. A paper that fails
+    goes back to the queue (:meth:`fail`) until it has been tried
+    ``max_attempts`` times.
+    """
+
+    def __init__(
+        self, root: Path, lease_s: float = 60.0, max_attempts: int = 3
+    ):
+        self.root = Path(root)
+        self.lease_s = lease_s
+        self.max_attempts = max(1, max_attempts)
+        self.tasks_dir = self.root / "tasks"
+        self.leases_dir = self.root / "leases"
+        self.done_dir = self.root / "done"
+        self.staging_dir = self.root / "staging"
+        self._keys: List[str] = []
+        for directory in (self.tasks_dir, self.leases_dir, self.done_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key_for(source: str) -> str:
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()[:20]
+
+    def enqueue(self, source: str) -> bool:
+        """Queue ``source``; False if it was already queued."""
+        if Path(source).exists():
+            source = str(Path(source).resolve())
+        key = self.key_for(source)
+        return _create(
+            self.tasks_dir / f"{key}.json",
+            {"source": source, "queued_at": time.time()},
+        )
+
+    def acquire(self, worker: str) -> Optional[Lease]:
+        """Lease an unfinished paper nobody holds, or None.
+
+        The queued keys are listed once and taken in turn by later
+        calls; ``tasks/`` is only listed again when they run out, so a
+        worker does not rescan the whole queue for every paper.
+        """
+        listed = False
+        while True:
+            if not self._keys:
+                if listed:
+                    return None
+                self._keys = [
+                    path.stem for path in self.tasks_dir.glob("*.json")
+                ]
+                # Workers scan in different orders so they rarely collide
+                random.shuffle(self._keys)
+                listed = True
+            while self._keys:
+                key = self._keys.pop()
+                if (self.done_dir / f"{key}.json").exists():
+                    continue
+                lease = self._try_lease(key, worker)
+                if lease is not None:
+                    return lease
+
+    def renew(self, lease: Lease) -> bool:
+        """Extend ``lease``; False if another worker has taken it over."""
+        current = _read(self.leases_dir / f"{lease.key}.json")
+        if current is None or current.get("token") != lease.token:
+            return False
+        lease.expires_at = time.time() + self.lease_s
+        _replace(self.leases_dir / f"{lease.key}.json", lease.to_dict())
+        return True
+
+    def release(self, lease: Lease) -> None:
+        """Give up ``lease`` if this worker still holds it."""
+        path = self.leases_dir / f"{lease.key}.json"
+        current = _read(path)
+        if current is not None and current.get("token") == lease.token:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def staging_for(self, lease: Lease) -> Path:
+        return self.staging_dir / f"{lease.key}-{lease.token}"
+
+    def commit(self, lease: Lease, output_dir: Path, result: Dict) -> bool:
+        """Publish a paper's staged outputs unless it is already done.
+
+        The done marker is created exclusively before anything is
+        published, so of two workers that both processed a paper (after
+        a lease expired) only one publishes. A commit interrupted by a
+        crash is finished by :meth:`recover`.
+        """
+        staging = self.staging_for(lease)
+        marker = self.done_dir / f"{lease.key}.json"
+        entry = {
+            "source": lease.source,
+            "worker": lease.worker,
+            "staging": str(staging),
+            "output_dir": str(output_dir),
+            "status": "committing",
+            "started_at": time.time(),
+            "result": result,
+        }
+        if not _create(marker, entry):
+            shutil.rmtree(staging, ignore_errors=True)
+            self.release(lease)
+            return False
+
+        publish(staging, Path(output_dir))
+        _replace(marker, dict(entry, status="committed"))
+        shutil.rmtree(staging, ignore_errors=True)
+        self.release(lease)
+        return True
+
+    def fail(self, lease: Lease, result: Dict) -> bool:
+        """Record a failed attempt at a paper and give up its lease.
+
+        Nothing is published. The paper is leased again later unless it
+        has now failed ``max_attempts`` times, when it is marked done
+        with status ``failed``. Returns True if it will be retried.
+        """
+        shutil.rmtree(self.staging_for(lease), ignore_errors=True)
+        current = _read(self.leases_dir / f"{lease.key}.json")
+        if current is None or current.get("token") != lease.token:
+            # Whoever took the paper over decides its outcome
+            return False
+
+        task_path = self.tasks_dir / f"{lease.key}.json"
+        task = _read(task_path) or {"source": lease.source}
+        attempts = task.get("attempts", 0) + 1
+        retry = attempts < self.max_attempts
+        if retry:
+            _replace(task_path, dict(task, attempts=attempts))
+        else:
+            _create(
+                self.done_dir / f"{lease.key}.json",
+                {
+                    "source": lease.source,
+                    "worker": lease.worker,
+                    "status": "failed",
+                    "attempts": attempts,
+                    "result": result,
+                },
+            )
+        self.release(lease)
+        return retry
+
+    def recover(self) -> int:
+        """Finish commits left half-done by crashed workers."""
+        recovered = 0
+        for marker in self.done_dir.glob("*.json"):
+            entry = _read(marker)
+            if (
+                entry is None
+                or entry.get("status") != "committing"
+                or time.time() - entry.get("started_at", 0) < self.lease_s
+            ):
+                continue
+            staging = Path(entry["staging"])
+            if staging.exists():
+                publish(staging, Path(entry["output_dir"]))
+                shutil.rmtree(staging, ignore_errors=True)
+            _replace(marker, dict(entry, status="committed"))
+            recovered += 1
+        return recovered
+
+    def status(self) -> Dict[str, int]:
+        """Counts of queued, leased and done papers."""
+        tasks = {path.stem for path in self.tasks_dir.glob("*.json")}
+        done = {path.stem for path in self.done_dir.glob("*.json")}
+        now = time.time()
+        leased = 0
+        for path in self.leases_dir.glob("*.json"):
+            lease = _read(path)
+            if lease and lease.get("expires_at", 0) > now:
+                leased += path.stem not in done
+        return {
+            "tasks": len(tasks),
+            "done": len(tasks & done),
+            "leased": leased,
+            "remaining": len(tasks - done),
+        }
+
+    def _try_lease(self, key: str, worker: str) -> Optional[Lease]:
+        task = _read(self.tasks_dir / f"{key}.json")
+        if task is None:
+            return None
+        path = self.leases_dir / f"{key}.json"
+        lease = Lease(
+            key,
+            task["source"],
+            worker,
+            uuid.uuid4().hex[:12],
+            time.time() + self.lease_s,
+        )
+        if _create(path, lease.to_dict()):
+            return lease
+
+        current = _read(path)
+        if current is None or current.get("expires_at", 0) > time.time():
+            return None
+
+        # Expired: move the stale lease aside (only one worker can) and
+        # restore it if its holder renewed it in the meantime.
+        tombstone = path.with_name(f"{key}.{lease.token}.expired")
+        try:
+            os.rename(path, tombstone)
+        except FileNotFoundError:
+            return None
+        stale = _read(tombstone) or {}
+        if stale.get("expires_at", 0) > time.time():
+            try:
+                os.link(tombstone, path)
+            except FileExistsError:
+                pass
+            tombstone.unlink()
+            return None
+        tombstone.unlink()
+
+        lease.expires_at = time.time() + self.lease_s
+        if _create(path, lease.to_dict()):
+            print(f"Took over {task['source']} from {stale.get('worker')}")
+            return lease
+        return None
+
+
+class DistributedWorker:
+    """Process papers from a :class:`LeaseQueue` with one warm processor.
+
+    Each paper is processed into the lease's staging directory while a
+    heartbeat thread renews the lease, then committed to ``output_dir``.
+    With ``follow`` the worker waits for new papers instead of exiting
+    once the queue is finished.
+    """
+
+    def __init__(
+        self,
+        processor: WinnowerProcessor,
+        queue: LeaseQueue,
+        output_dir: Path,
+        worker_id: Optional[str] = None,
+        poll_interval_s: float = 2.0,
+        follow: bool = False,
+    ):
+        self.processor = processor
+        self.queue = queue
+        self.output_dir = Path(output_dir)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.poll_interval_s = poll_interval_s
+        self.follow = follow
+        self.committed = 0
+        self.discarded = 0
+        self.failed = 0
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"Finished {recovered} interrupted commit(s)")
+
+        while not stop.is_set():
+            lease = self.queue.acquire(self.worker_id)
+            if lease is not None:
+                self._run_task(lease)
+                continue
+            if not self.follow and self.queue.status()["remaining"] == 0:
+                break
+            # Papers leased by other workers may still come back
+            stop.wait(self.poll_interval_s)
+
+    def _run_task(self, lease: Lease) -> None:
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(lease, stop_heartbeat), daemon=True
+        )
+        heartbeat.start()
+        staging = self.queue.staging_for(lease)
+        try:
+            self.processor.process(lease.source, staging)
+        except BaseException:
+            self.queue.release(lease)
+            raise
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+        papers = self.processor.tracer.report()["papers"]
+        result = {
+            "papers": [
+                {
+                    key: paper.get(key)
+                    for key in ("source", "title", "status", "error", "usage")
+                }
+                for paper in papers
+            ]
+        }
+        if not papers or any(p.get("status") == "failed" for p in papers):
+            self.failed += 1
+            if self.queue.fail(lease, result):
+                print(f"{lease.source} failed; it will be retried")
+            else:
+                print(f"{lease.source} failed; giving up")
+        elif self.queue.commit(lease, self.output_dir, result):
+            self.committed += 1
+            store = self.processor.store
+            if store is not None:
+                store.relocate(str(staging), str(self.output_dir))
+        else:
+            self.discarded += 1
+            print(f"{lease.source} was already committed by another worker")
+
+    def _heartbeat(self, lease: Lease, stop: threading.Event) -> None:
+        while not stop.wait(self.queue.lease_s / 3):
+            if not self.queue.renew(lease):
+                print(f"Lost lease on {lease.source}")
+                return
+
+
+def worker_config(config: Dict) -> Dict:
+    """Adapt ``config`` for a worker that stages outputs per paper."""
+    config = dict(config, run_report=False, workers=1)
+    if config.get("store") and not config.get("store_path"):
+        # SQLite locking is unreliable on network filesystems, so workers
+        # never share a database in the output directory.
+        print(
+            "The corpus store needs a store_path on local disk for "
+            "workers; not storing"
+        )
+        config["store"] = False
+    if config.get("near_duplicates", "off") != "off":
+        print("Near-duplicate detection is not available to workers")
+        config["near_duplicates"] = "off"
+    return config
+
+
+def publish(staging: Path, output_dir: Path) -> List[Path]:
+    """Move staged outputs into ``output_dir``.
+
+    Files are moved one at a time and ``.jsonl`` files appended to their
+    counterparts, each removed from staging once published, so an
+    interrupted publish can simply be run again. Before an append a
+    ``.<name>.publishing`` marker is left in staging; if it is still
+    there on a rerun and the target already holds the staged records,
+    they are not appended a second time. Appends are not atomic on NFS,
+    so workers append to a shared file one at a time, under a
+    ``.<name>.lock`` file created with ``O_EXCL``.
+    """
+    published = []
+    for root, _, files in sorted(os.walk(staging)):
+        for name in sorted(files):
+            path = Path(root) / name
+            if name in UNPUBLISHED or name.endswith(".publishing"):
+                continue
+            target = output_dir / path.relative_to(staging)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if path.suffix == ".jsonl":
+                data = path.read_bytes()
+                pending = path.with_name(f".{name}.publishing")
+                with _append_lock(target):
+                    if not (pending.exists() and _contains(target, data)):
+                        pending.touch()
+                        with open(target, "ab") as out:
+                            out.write(data)
+                            out.flush()
+                            os.fsync(out.fileno())
+                path.unlink()
+                pending.unlink()
+            else:
+                os.replace(path, target)
+            published.append(target)
+    return published
+
+
+@contextmanager
+def _append_lock(path: Path) -> Iterator[None]:
+    """Hold the lock file for appending to ``path``.
+
+    ``O_EXCL`` creation is atomic on NFSv3 and later. A lock older than
+    ``APPEND_LOCK_STALE_S`` belongs to a worker that died mid-append and
+    is broken.
+    """
+    lock = path.with_name(f".{path.name}.lock")
+    while True:
+        try:
+            fd = os.open(lock, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            try:
+                age = time.time() - lock.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age > APPEND_LOCK_STALE_S:
+                try:
+                    lock.unlink()
+                except FileNotFoundError:
+                    pass
+                continue
+            time.sleep(random.uniform(0.01, 0.1))
+            continue
+        os.close(fd)
+        break
+    try:
+        yield
+    finally:
+        lock.unlink()
+
+
+def _contains(path: Path, data: bytes) -> bool:
+    try:
+        return data in path.read_bytes()
+    except FileNotFoundError:
+        return False
+
+
+def _create(path: Path, data: Dict) -> bool:
+    """Write ``path`` only if it does not exist yet."""
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return True
+
+
+def _replace(path: Path, data: Dict) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read(path: Path) -> Optional[Dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
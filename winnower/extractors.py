@@ -1,9 +1,26 @@
 """Technical content extraction using AI models."""
 
+import json
 import os
 import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, List, Optional
+
+from .cassettes import Cassette
+from .metrics import WinnowerMetrics
+from .quality import check_summary
+from .routing import Route, Router
+from .tracing import Tracer
+from .usage import (
+    UsageTracker,
+    anthropic_usage,
+    estimate_cost,
+    openai_usage,
+)
 
 try:
     import openai
@@ -16,6 +33,101 @@ except ImportError:
     anthropic = None
 
 
+# Rough size of a token, for budgets set in tokens.
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "[Content truncated for processing]"
+
+
+def content_budget(config: Dict) -> int:
+    """Characters of preprocessed content sent to the model."""
+    return int(config.get("max_content_tokens", 25000)) * CHARS_PER_TOKEN
+
+
+# LaTeX control words beginning with "n", which would otherwise read as
+# a newline followed by text.
+LATEX_N_COMMANDS = (
+    "nabla natural ne nearrow neg negthinspace neq newcommand "
+    "newenvironment newline newpage nexists ngeq ni nleq nmid noindent "
+    "nolimits nonumber normalsize not notin nparallel nsim nsubseteq "
+    "nu nwarrow"
+).split()
+# A backslash and the JSON escape it begins, if any; \b, \f, \r and \t
+# followed by a letter begin LaTeX commands (\beta, \frac, \rho, \theta),
+# as does \n followed by one of LATEX_N_COMMANDS (\nu, \nabla).
+BACKSLASH = re.compile(
+    r"\\(?:(?=(?:%s)(?![A-Za-z]))"
+    r'|(["\\/n]|u[0-9a-fA-F]{4}|[bfrt](?![A-Za-z])))?'
+    % "|".join(LATEX_N_COMMANDS)
+)
+FENCED_JSON = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", flags=re.DOTALL)
+
+
+def split_summaries(
+    text: Optional[str], lengths: List[int]
+) -> Optional[Dict[int, str]]:
+    """The summary of each length in a reply to a multi-length prompt.
+
+    The reply is a JSON object keyed by length, taken from the first
+    ```json fence or else from the outermost braces. LaTeX the model
+    left unescaped is kept as written: backslashes that do not begin a
+    JSON escape are escaped before parsing. Returns None unless every
+    length has a summary.
+    """
+    text = text or ""
+    match = FENCED_JSON.search(text)
+    if match:
+        body = match.group(1)
+    else:
+        match = re.search(r"\{.*\}", text, flags=re.DOTALL)
+        if not match:
+            return None
+        body = match.group(0)
+
+    # Matched left to right, so an escaped "\\" is never split
+    body = BACKSLASH.sub(
+        lambda m: m.group(0) if m.group(1) else "\\\\", body
+    )
+    try:
+        data = json.loads(body, strict=False)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    summaries = {}
+    for length in lengths:
+        summary = data.get(str(length))
+        if not isinstance(summary, str) or not summary.strip():
+            return None
+        summaries[length] = summary.strip()
+    return summaries
+
+
+class ContentBuffer:
+    """Paper text built up page by page, up to the prompt budget.
+
+    Pages are kept as converted, with their line and markdown structure;
+    only their whitespace-collapsed size counts against ``limit``, as in
+    the prompt. :meth:`add` returns False once the budget is reached and
+    further pages would be cut from the prompt anyway.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.size = 0
+        self.pages = 0
+        self._parts: List[str] = []
+
+    def add(self, page: str) -> bool:
+        self._parts.append(page)
+        self.size += len(re.sub(r"\s+", " ", page).strip()) + 1
+        self.pages += 1
+        return self.size <= self.limit
+
+    def text(self) -> str:
+        return "\n".join(self._parts)
+
+
 class TechnicalExtractor:
     """Extract technical content from papers using AI models."""
 
@@ -63,6 +175,14 @@ Paper Content:
 
 Extract ONLY the core technical details following the guidelines
 above. Limit your response to approximately {length} words:
+"""
+
+    SUMMARY_LENGTHS_PROMPT = """
+Write one version of this summary for each of these lengths: {lengths}
+words. Each version must stand on its own. Reply with only a JSON object
+in a ```json code block, mapping each length to its summary, like
+{example}
+Escape every backslash in LaTeX as \\\\.
 """
 
     def __init__(
@@ -70,47 +190,145 @@ above. Limit your response to approximately {length} words:
         model_provider: str = "openai",
         config: Dict = None,
         verbose: bool = False,
+        cassette: Optional[Cassette] = None,
+        tracer: Optional[Tracer] = None,
+        metrics: Optional[WinnowerMetrics] = None,
+        shared: Optional["TechnicalExtractor"] = None,
+        connect: bool = True,
+        usage: Optional[UsageTracker] = None,
     ):
         self.model_provider = model_provider
         self.config = config or {}
         self.verbose = verbose
+        self.cassette = cassette
+        self.tracer = tracer or Tracer()
+        self.metrics = metrics
+        # Where requests finishing after their answer was used are billed
+        self.usage = usage
         self.extraction_prompt = self._load_extraction_prompt()
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._cascade_lock = threading.Lock()
+        self.reset_cascade()
+
+        if shared is not None:
+            # Reuse another extractor's API clients (and so their
+            # connection pools) and its routing state and quotas
+            self.router = shared.router
+            self.cascade = shared.cascade
+            self.clients = shared.clients
+            self.client = shared.client
+            return
 
-        if model_provider == "openai":
+        self.router = Router.from_config(self.config)
+        self.cascade = self._cascade_route()
+        if not connect:
+            # Enough to build prompts and requests, but not to send them
+            self.clients = {}
+            self.client = None
+            return
+
+        # With routes configured, only the routed providers need clients
+        providers = self.router.providers if self.router else [model_provider]
+        if self.cascade is not None and self.cascade.provider not in providers:
+            providers = providers + [self.cascade.provider]
+        self.clients = {p: self._create_client(p) for p in providers}
+        self.client = self.clients.get(model_provider) or self.clients[
+            providers[0]
+        ]
+
+    def _create_client(self, provider: str):
+        """Create the API client for ``provider``."""
+        # Replayed runs never reach the API, so they need no real key.
+        replaying = self.cassette is not None and self.cassette.mode == "replay"
+
+        if provider == "openai":
             if not openai:
                 raise ImportError(
                     "OpenAI package not installed. Run: pip install openai"
                 )
-            self.client = openai.OpenAI(
+            return openai.OpenAI(
                 api_key=os.getenv("OPENAI_API_KEY")
+                or ("cassette-replay" if replaying else None)
             )
-        elif model_provider == "anthropic":
+        elif provider == "anthropic":
             if not anthropic:
                 raise ImportError(
                     "Anthropic package not installed. "
                     "Run: pip install anthropic"
                 )
-            self.client = anthropic.Anthropic(
+            return anthropic.Anthropic(
                 api_key=os.getenv("ANTHROPIC_API_KEY")
+                or ("cassette-replay" if replaying else None)
             )
         else:
-            raise ValueError(f"Unsupported model provider: {model_provider}")
+            raise ValueError(f"Unsupported model provider: {provider}")
+
+    def _cascade_route(self) -> Optional[Route]:
+        """The cheap first tier, when ``cascade_model`` is configured."""
+        model = self.config.get("cascade_model")
+        if not model:
+            return None
+        provider = self.config.get("cascade_provider") or self.model_provider
+        return Route(provider, model)
+
+    def full_routes(self) -> List[Route]:
+        """Routes the full tier sends to: the routes, or the one model."""
+        if self.router is not None:
+            return list(self.router.routes)
+        if self.model_provider == "openai":
+            return [Route("openai", self.config.get("openai_model", "gpt-4"))]
+        return [
+            Route(
+                "anthropic",
+                self.config.get(
+                    "anthropic_model", "claude-3-sonnet-20240229"
+                ),
+            )
+        ]
+
+    def reset_cascade(self) -> None:
+        """Clear the per-tier counts for a new run."""
+        with self._cascade_lock:
+            self._cascade_counts = {"cheap": 0, "full": 0}
+            self._failed_checks: Dict[str, int] = {}
+
+    def cascade_stats(self) -> Dict:
+        """Papers served by each tier and why the cheap tier was rejected."""
+        with self._cascade_lock:
+            return {
+                "model": self.cascade.key if self.cascade else None,
+                "tiers": dict(self._cascade_counts),
+                "failed_checks": dict(self._failed_checks),
+            }
+
+    def extract(self, paper_data: Dict, content: Optional[str] = None) -> Dict:
+        """Extract technical content from paper data.
 
-    def extract(self, paper_data: Dict) -> Dict:
-        """Extract technical content from paper data."""
+        ``content`` may carry the output of :meth:`prepare_content` when the
+        caller has already computed it.
+        """
         if self.verbose:
             print("Extracting technical content...")
 
-        content = self._preprocess_content(paper_data["content"])
+        if content is None:
+            with self.tracer.span("preprocess"):
+                content = self.prepare_content(paper_data["content"])
 
-        if len(content) > 100000:
-            content = (
-                content[:100000] + "\n[Content truncated for processing]"
-            )
+        with self.tracer.span("extract", provider=self.model_provider):
+            result = self._extract_with_ai(paper_data["title"], content)
 
-        technical_content = self._extract_with_ai(
-            paper_data["title"], content
-        )
+        text = result["text"]
+        error = result.get("error")
+        summaries = None
+        lengths = self.summary_lengths()
+        if lengths and not error:
+            summaries = result.get("summaries") or split_summaries(
+                text, lengths
+            )
+            if summaries is None:
+                error = "Response lacks a summary for every requested length"
+            else:
+                text = summaries[self.main_length()]
 
         return {
             "title": paper_data["title"],
@@ -118,9 +336,24 @@ above. Limit your response to approximately {length} words:
             "source": paper_data["source"],
             "url": paper_data["url"],
             "abstract": paper_data["abstract"],
-            "technical_content": technical_content,
+            "technical_content": text,
+            "summaries": summaries,
+            "usage": result.get("usage"),
+            "error": error,
+            "tier": result.get("tier"),
+            "cascade": result.get("cascade"),
         }
 
+    def prepare_content(self, content: str) -> str:
+        """Preprocess and truncate paper content as sent to the model."""
+        content = self._preprocess_content(content)
+
+        limit = content_budget(self.config)
+        if len(content) > limit:
+            content = content[:limit] + "\n" + TRUNCATION_MARKER
+
+        return content
+
     def _preprocess_content(self, content: str) -> str:
         """Clean and preprocess paper content."""
         content = re.sub(r"\n+", "\n", content)
@@ -156,56 +389,359 @@ above. Limit your response to approximately {length} words:
 
         return self.DEFAULT_EXTRACTION_PROMPT
 
-    def _extract_with_ai(self, title: str, content: str) -> str:
-        """Extract technical content using AI model."""
+    def summary_lengths(self) -> List[int]:
+        """Lengths summarized together in one call, or [] for one summary."""
+        lengths = self.config.get("summary_lengths") or []
+        return sorted({int(length) for length in lengths})
+
+    def main_length(self) -> int:
+        """Length of the summary used where a paper has only one.
+
+        That is ``summary_length`` if it is among ``summary_lengths``,
+        else the longest of them.
+        """
+        lengths = self.summary_lengths()
+        length = self.config.get("summary_length", 200)
+        if not lengths or length in lengths:
+            return length
+        return lengths[-1]
+
+    def build_prompt(self, title: str, content: str) -> str:
+        """The prompt for a paper's prepared content.
+
+        With ``summary_lengths`` set, the model is asked for a summary of
+        each length in one JSON reply, so the paper is sent only once.
+        """
+        lengths = self.summary_lengths()
+        if not lengths:
+            return self.extraction_prompt.format(
+                title=title,
+                content=content,
+                length=self.config.get("summary_length", 200),
+            )
+
+        names = [str(length) for length in lengths]
+        if len(names) > 1:
+            names[-2:] = [f"{names[-2]} and {names[-1]}"]
         prompt = self.extraction_prompt.format(
-            title=title, 
-            content=content,
-            length=self.config.get("summary_length", 200)
+            title=title, content=content, length=", ".join(names)
+        )
+        return prompt + self.SUMMARY_LENGTHS_PROMPT.format(
+            lengths=", ".join(names),
+            example=json.dumps({str(length): "..." for length in lengths}),
         )
 
+    def build_request(self, route: Route, prompt: str) -> Dict:
+        """The API request sending ``prompt`` to ``route``."""
+        if route.provider == "openai":
+            return self._openai_request(prompt, route.model)
+        return self._anthropic_request(prompt, route.model)
+
+    def _extract_with_ai(self, title: str, content: str) -> Dict:
+        """Extract technical content using AI model."""
+        prompt = self.build_prompt(title, content)
+
+        if self.cascade is None:
+            return self._extract_full(prompt)
+
+        cheap = self._extract_cheap(prompt)
+        if not cheap["failed_checks"]:
+            self._count_tier("cheap")
+            return dict(cheap, tier="cheap")
+
+        if self.verbose:
+            print(
+                f"{self.cascade.key} summary failed checks "
+                f"({', '.join(cheap['failed_checks'])}), escalating"
+            )
+        self._count_tier("full", cheap["failed_checks"])
+        result = self._extract_full(prompt)
+        return dict(
+            result,
+            tier="full",
+            cascade={
+                "model": self.cascade.key,
+                "failed_checks": cheap["failed_checks"],
+                "usage": cheap.get("usage"),
+            },
+        )
+
+    def _extract_full(self, prompt: str) -> Dict:
+        """Extract with the configured routes or model."""
+        if self.router is not None:
+            return self._extract_routed(prompt)
         if self.model_provider == "openai":
             return self._extract_with_openai(prompt)
         elif self.model_provider == "anthropic":
             return self._extract_with_anthropic(prompt)
 
-    def _extract_with_openai(self, prompt: str) -> str:
+    def _extract_cheap(self, prompt: str) -> Dict:
+        """Try the cascade's cheap model and check its summary.
+
+        The result's ``failed_checks`` is empty when the summary can be
+        used as is.
+        """
+        route = self.cascade
+        request = self.build_request(route, prompt)
+        if route.provider == "openai":
+            send = self._request_openai
+        else:
+            send = self._request_anthropic
+
+        with self.tracer.span("cascade", model=route.model):
+            try:
+                result = self._call_llm(route.provider, request, send)
+            except Exception as e:
+                if self.verbose:
+                    print(f"{route.key} failed, escalating: {e}")
+                return {"text": "", "failed_checks": ["error"]}
+
+        lengths = self.summary_lengths()
+        if not lengths:
+            failures = check_summary(
+                result.get("text") or "",
+                self.config.get("summary_length", 200),
+                result.get("finish_reason"),
+            )
+            return dict(result, failed_checks=failures)
+
+        summaries = split_summaries(result.get("text"), lengths)
+        if summaries is None:
+            return dict(result, failed_checks=["malformed"])
+        failures = []
+        for length, summary in summaries.items():
+            for failure in check_summary(
+                summary, length, result.get("finish_reason")
+            ):
+                if failure not in failures:
+                    failures.append(failure)
+        return dict(result, summaries=summaries, failed_checks=failures)
+
+    def _count_tier(self, tier: str, failures=()) -> None:
+        with self._cascade_lock:
+            self._cascade_counts[tier] += 1
+            for failure in failures:
+                self._failed_checks[failure] = (
+                    self._failed_checks.get(failure, 0) + 1
+                )
+
+    def _extract_with_openai(self, prompt: str) -> Dict:
         """Extract using OpenAI API."""
+        request = self._openai_request(
+            prompt, self.config.get("openai_model", "gpt-4")
+        )
         try:
-            response = self.client.chat.completions.create(
-                model=self.config.get("openai_model", "gpt-4"),
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a technical reviewer extracting "
-                            "core technical details from research papers."
-                        ),
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=self.config.get("max_tokens", 4000),
-                temperature=self.config.get("temperature", 0.1),
-            )
-            return response.choices[0].message.content
+            return self._call_llm("openai", request, self._request_openai)
         except Exception as e:
             if self.verbose:
                 print(f"OpenAI API error: {e}")
-            return f"Error extracting technical content: {e}"
+            return {
+                "text": f"Error extracting technical content: {e}",
+                "error": str(e),
+            }
 
-    def _extract_with_anthropic(self, prompt: str) -> str:
+    def _extract_with_anthropic(self, prompt: str) -> Dict:
         """Extract using Anthropic API."""
+        request = self._anthropic_request(
+            prompt,
+            self.config.get("anthropic_model", "claude-3-sonnet-20240229"),
+        )
         try:
-            response = self.client.messages.create(
-                model=self.config.get(
-                    "anthropic_model", "claude-3-sonnet-20240229"
-                ),
-                max_tokens=self.config.get("max_tokens", 4000),
-                temperature=self.config.get("temperature", 0.1),
-                messages=[{"role": "user", "content": prompt}],
+            return self._call_llm(
+                "anthropic", request, self._request_anthropic
             )
-            return response.content[0].text
         except Exception as e:
             if self.verbose:
                 print(f"Anthropic API error: {e}")
-            return f"Error extracting technical content: {e}"
+            return {
+                "text": f"Error extracting technical content: {e}",
+                "error": str(e),
+            }
+
+    def _extract_routed(self, prompt: str) -> Dict:
+        """Extract through the router, failing over between routes."""
+        errors = []
+        for route in self.router.order():
+            try:
+                return self._call_route(route, prompt)
+            except Exception as e:
+                errors.append(f"{route.key}: {e}")
+                if self.verbose:
+                    print(f"{route.key} failed, trying next route: {e}")
+
+        if not errors:
+            errors.append("no route has quota left")
+        message = "; ".join(errors)
+        return {
+            "text": f"Error extracting technical content: {message}",
+            "error": message,
+        }
+
+    def _call_route(self, route: Route, prompt: str) -> Dict:
+        """Call ``route``, hedging with a second request if it is slow."""
+        delay = self.router.hedge_delay(route)
+        if delay is None:
+            return self._send_route(route, prompt)
+
+        if self._hedge_pool is None:
+            # A primary and a hedge for each paper worker
+            workers = max(1, int(self.config.get("workers", 1)))
+            self._hedge_pool = ThreadPoolExecutor(
+                max_workers=2 * workers, thread_name_prefix="winnower-hedge"
+            )
+        primary = self._hedge_pool.submit(self._send_route, route, prompt)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        hedge_route = self.router.hedge_route(route)
+        if self.verbose:
+            print(
+                f"{route.key} slower than {delay:.1f}s, "
+                f"hedging on {hedge_route.key}"
+            )
+        hedge = self._hedge_pool.submit(self._send_route, hedge_route, prompt)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    paper = self.tracer.current_paper
+                    for loser in pending:
+                        loser.add_done_callback(
+                            lambda f: self._record_hedge_loser(paper, f)
+                        )
+                    self.router.record_hedge(won=future is hedge)
+                    result = dict(future.result())
+                    result["usage"] = dict(result["usage"], hedged=True)
+                    return result
+        self.router.record_hedge(won=False)
+        return primary.result()
+
+    def _record_hedge_loser(self, paper: Optional[str], future) -> None:
+        """Count the tokens of the slower hedged request, which still cost."""
+        if future.exception() is not None:
+            return
+        usage = dict(future.result().get("usage") or {}, hedge_loser=True)
+        if self.metrics is not None:
+            self.metrics.record_usage(usage)
+        if self.usage is not None:
+            self.usage.record(paper or "", usage)
+
+    def finish_hedges(self) -> None:
+        """Wait for the hedged requests still running and free their pool.
+
+        Losing requests are billed when they finish, so a run waits for
+        them before reporting its usage.
+        """
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=True)
+            self._hedge_pool = None
+
+    def _send_route(self, route: Route, prompt: str) -> Dict:
+        """Send one request on ``route`` and update its health."""
+        request = self.build_request(route, prompt)
+        if route.provider == "openai":
+            send = self._request_openai
+        else:
+            send = self._request_anthropic
+
+        self.router.record_start(route)
+        try:
+            result = self._call_llm(route.provider, request, send)
+        except Exception as e:
+            self.router.record_failure(route, e)
+            raise
+        self.router.record_success(route, result["usage"]["latency_s"])
+        return result
+
+    def _openai_request(self, prompt: str, model: str) -> Dict:
+        """Build a chat completion request."""
+        request = {
+            "model": model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": (
+                        "You are a technical reviewer extracting "
+                        "core technical details from research papers."
+                    ),
+                },
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": self.config.get("max_tokens", 4000),
+            "temperature": self.config.get("temperature", 0.1),
+        }
+        if self.summary_lengths():
+            request["response_format"] = {"type": "json_object"}
+        return request
+
+    def _anthropic_request(self, prompt: str, model: str) -> Dict:
+        """Build a messages request."""
+        return {
+            "model": model,
+            "max_tokens": self.config.get("max_tokens", 4000),
+            "temperature": self.config.get("temperature", 0.1),
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+    def _request_openai(self, request: Dict) -> Dict:
+        """Send one chat completion request and normalize the response."""
+        response = self.clients["openai"].chat.completions.create(**request)
+        return {
+            "text": response.choices[0].message.content,
+            "usage": openai_usage(response),
+            "finish_reason": _as_str(response.choices[0].finish_reason),
+        }
+
+    def _request_anthropic(self, request: Dict) -> Dict:
+        """Send one messages request and normalize the response."""
+        response = self.clients["anthropic"].messages.create(**request)
+        return {
+            "text": response.content[0].text,
+            "usage": anthropic_usage(response),
+            "finish_reason": _as_str(getattr(response, "stop_reason", None)),
+        }
+
+    def _call_llm(
+        self,
+        provider: str,
+        request: Dict,
+        send: Callable[[Dict], Dict],
+    ) -> Dict:
+        """Send a request, through the cassette when one is set.
+
+        The result's ``usage`` is completed with the provider, model,
+        latency and estimated cost of the call.
+        """
+        start = time.perf_counter()
+        with self._in_flight():
+            if self.cassette is None:
+                result = send(request)
+            else:
+                result = self.cassette.play(
+                    "llm",
+                    {"provider": provider, **request},
+                    lambda: send(request),
+                )
+
+        usage = dict(result.get("usage") or {})
+        usage.update(
+            provider=provider,
+            model=request["model"],
+            latency_s=time.perf_counter() - start,
+        )
+        usage["cost_usd"] = estimate_cost(
+            request["model"], usage, self.config.get("model_pricing")
+        )
+        return dict(result, usage=usage)
+
+    def _in_flight(self):
+        """Count the enclosed request in the in-flight gauge, if any."""
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.llm_in_flight.track()
+
+
+def _as_str(value) -> Optional[str]:
+    return value if isinstance(value, str) else None
@@ -1,16 +1,23 @@
 """Output formatting utilities."""
 
+import json
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
 
 
 class MarkdownFormatter:
     """Format extracted technical content as markdown."""
 
+    def __init__(self, front_matter: bool = False):
+        self.front_matter = front_matter
+
     def format(self, technical_data: Dict) -> str:
         """Format technical data as markdown document."""
         lines = []
 
+        if self.front_matter and technical_data.get("usage"):
+            lines.extend(self._front_matter(technical_data))
+
         lines.append(f"# {technical_data['title']}")
         lines.append("")
 
@@ -56,3 +63,24 @@ class MarkdownFormatter:
         )
 
         return "\n".join(lines)
+
+    def _front_matter(self, technical_data: Dict) -> List[str]:
+        """YAML front matter with the token usage of the summary."""
+        usage = technical_data["usage"]
+        lines = ["---", f"title: {json.dumps(technical_data['title'])}"]
+        for key in [
+            "provider",
+            "model",
+            "input_tokens",
+            "output_tokens",
+            "cached_tokens",
+            "latency_s",
+            "cost_usd",
+        ]:
+            value = usage.get(key)
+            if isinstance(value, float):
+                value = round(value, 6)
+            if value is not None:
+                lines.append(f"{key}: {json.dumps(value)}")
+        lines.extend(["---", ""])
+        return lines
@@ -0,0 +1,216 @@
+"""Plain LaTeX text from arXiv e-print source archives."""
+
+import gzip
+import io
+import re
+import tarfile
+from pathlib import PurePosixPath
+from typing import Dict, Optional
+
+TEX_EXTENSIONS = (".tex", ".ltx")
+
+# Files larger than this are generated data, not prose worth reading.
+MAX_TEX_BYTES = 4 * 1024 * 1024
+
+# Nested \input/\include deeper than this is treated as a cycle.
+MAX_INPUT_DEPTH = 10
+
+# Names authors commonly give the root file, tried before the largest one.
+MAIN_NAMES = ("main.tex", "ms.tex", "paper.tex", "article.tex")
+
+INPUT_PATTERN = re.compile(
+    r"\\(?:input|include|subfile)\s*\{([^}]+)\}|\\input\s+([^\s{}\\]+)"
+)
+
+# Unescaped ``%`` to the end of the line (``\%`` is a literal percent).
+COMMENT_PATTERN = re.compile(r"(?<!\\)((?:\\\\)*)%.*")
+
+# Environments that hold no text for the model.
+REMOVE_ENVIRONMENTS = [
+    "figure",
+    "figure*",
+    "wrapfigure",
+    "SCfigure",
+    "tikzpicture",
+    "thebibliography",
+    "comment",
+]
+
+# Commands removed together with their (bracketed and braced) arguments.
+REMOVE_COMMANDS = [
+    "includegraphics",
+    "bibliography",
+    "bibliographystyle",
+    "addbibresource",
+    "printbibliography",
+    "maketitle",
+    "label",
+    "vspace",
+    "hspace",
+    "newpage",
+    "clearpage",
+    "pagebreak",
+    "tableofcontents",
+]
+
+
+def extract_latex(archive: bytes) -> Optional[Dict[str, str]]:
+    """Extract the text of the paper in an arXiv e-print.
+
+    ``archive`` is what ``arxiv.org/e-print/<id>`` serves: a gzipped
+    tarball, a single gzipped ``.tex`` file, or a PDF for papers
+    submitted without source. The main file is the one with
+    ``\\documentclass`` and ``\\begin{document}``; ``\\input`` and
+    ``\\include`` are resolved, then comments, figures and the
+    bibliography are stripped. Equations are kept verbatim.
+
+    Returns the ``title``, ``abstract`` and ``content`` of the paper,
+    or None when the archive holds no LaTeX source.
+    """
+    files = _tex_files(archive)
+    main = _main_file(files)
+    if main is None:
+        return None
+
+    source = _resolve(main, files, 0)
+    body = source.partition("\\begin{document}")[2]
+    body = body.split("\\end{document}")[0]
+
+    abstract = ""
+    match = re.search(
+        r"\\begin\{abstract\}(.*?)\\end\{abstract\}", body, flags=re.S
+    )
+    if match:
+        abstract = _clean(match.group(1))
+        body = body[: match.start()] + body[match.end():]
+
+    content = _clean(body)
+    if not content:
+        return None
+    return {
+        "title": _clean(_argument(source, "title")),
+        "abstract": abstract,
+        "content": content,
+    }
+
+
+def _tex_files(archive: bytes) -> Dict[str, str]:
+    """The LaTeX files in ``archive`` by path, decoded."""
+    try:
+        with tarfile.open(fileobj=io.BytesIO(archive), mode="r:*") as tar:
+            files = {}
+            for member in tar.getmembers():
+                if (
+                    not member.isfile()
+                    or member.size > MAX_TEX_BYTES
+                    or not member.name.lower().endswith(TEX_EXTENSIONS)
+                ):
+                    continue
+                data = tar.extractfile(member).read()
+                files[_normalize(member.name)] = _decode(data)
+            return files
+    except tarfile.TarError:
+        pass
+
+    # A single-file submission is served as gzipped .tex without a tar
+    try:
+        data = gzip.decompress(archive)
+    except (OSError, EOFError):
+        data = archive
+    if data.startswith(b"%PDF") or len(data) > MAX_TEX_BYTES:
+        return {}
+    text = _decode(data)
+    return {"main.tex": text} if "\\begin{document}" in text else {}
+
+
+def _main_file(files: Dict[str, str]) -> Optional[str]:
+    """Path of the root LaTeX file, the one that begins the document."""
+    roots = [
+        name
+        for name, text in files.items()
+        if "\\begin{document}" in _strip_comments(text)
+        and "\\documentclass" in text
+    ]
+    if not roots:
+        return None
+    for name in roots:
+        if PurePosixPath(name).name.lower() in MAIN_NAMES:
+            return name
+    return max(roots, key=lambda name: len(files[name]))
+
+
+def _resolve(name: str, files: Dict[str, str], depth: int) -> str:
+    """``files[name]`` without comments and with its inputs inlined."""
+    text = _strip_comments(files.get(name, ""))
+    if depth >= MAX_INPUT_DEPTH:
+        return text
+    directory = PurePosixPath(name).parent
+
+    def inline(match: re.Match) -> str:
+        target = (match.group(1) or match.group(2)).strip()
+        for candidate in (target, target + ".tex"):
+            # Inputs are relative to the main file's directory, which is
+            # the archive root for almost every submission.
+            for base in (directory, PurePosixPath(".")):
+                path = _normalize(str(base / candidate))
+                if path in files:
+                    return _resolve(path, files, depth + 1)
+        return ""
+
+    return INPUT_PATTERN.sub(inline, text)
+
+
+def _strip_comments(text: str) -> str:
+    text = COMMENT_PATTERN.sub(r"\1", text)
+    return re.sub(r"\\iffalse\b.*?\\fi\b", "", text, flags=re.S)
+
+
+def _clean(text: str) -> str:
+    """Drop figures, the bibliography and layout commands."""
+    for environment in REMOVE_ENVIRONMENTS:
+        name = re.escape(environment)
+        text = re.sub(
+            rf"\\begin\{{{name}\}}.*?\\end\{{{name}\}}", "", text, flags=re.S
+        )
+    commands = "|".join(REMOVE_COMMANDS)
+    text = re.sub(
+        rf"\\(?:{commands})\b\*?(?:\s*\[[^\]]*\])*(?:\s*\{{[^{{}}]*\}})*",
+        "",
+        text,
+    )
+    text = re.sub(r"[ \t]+\n", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _argument(source: str, command: str) -> str:
+    """The braced argument of the first ``\\command``, braces balanced."""
+    match = re.search(rf"\\{command}\s*(?:\[[^\]]*\])?\s*\{{", source)
+    if not match:
+        return ""
+    depth = 1
+    for end in range(match.end(), len(source)):
+        if source[end] == "{":
+            depth += 1
+        elif source[end] == "}":
+            depth -= 1
+            if depth == 0:
+                return " ".join(source[match.end():end].split())
+    return ""
+
+
+def _normalize(path: str) -> str:
+    parts = []
+    for part in PurePosixPath(path).parts:
+        if part == "..":
+            if parts:
+                parts.pop()
+        elif part not in (".", "/"):
+            parts.append(part)
+    return "/".join(parts)
+
+
+def _decode(data: bytes) -> str:
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
@@ -0,0 +1,97 @@
+"""Collision-free, sharded output layout for very large runs."""
+
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from .dedup import parse_arxiv_id
+
+
+LAYOUTS = ["flat", "sharded"]
+
+SLUG_LENGTH = 60
+
+
+def slugify(title: str, length: int = SLUG_LENGTH) -> str:
+    """Lowercase ASCII slug of ``title``, e.g. ``attention-is-all-you-need``."""
+    slug = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
+    return slug[:length].rstrip("-") or "untitled"
+
+
+def paper_id(source: str, paper_data: Dict) -> str:
+    """Stable ID for a paper: its arXiv ID, else a hash of its text.
+
+    The arXiv ID is taken from the source or the paper's URL and drops
+    the version, so re-processing a newer version replaces the older
+    outputs. Other papers are identified by the SHA-256 of their
+    extracted text, which no title collision can change.
+    """
+    for candidate in [source, paper_data.get("url") or ""]:
+        parsed = parse_arxiv_id(candidate) if candidate else None
+        if parsed:
+            return f"arxiv-{parsed[0]}"
+    content = paper_data.get("content", "").encode("utf-8")
+    return f"sha-{hashlib.sha256(content).hexdigest()[:16]}"
+
+
+class ShardedLayout:
+    """Name outputs ``<id>_<slug>`` under hash-prefix subdirectories.
+
+    Each of ``papers/``, ``extracted/`` and ``summaries/`` is split into
+    256 shards by the first two hex digits of the ID's SHA-256, which
+    keeps directories small past millions of papers. ``index.jsonl`` in
+    the output directory maps every ID and title to its files.
+    """
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.index_file = self.output_dir / "index.jsonl"
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls, config: Dict, output_dir: Path
+    ) -> Optional["ShardedLayout"]:
+        """Build the layout for ``output_layout``, or None for flat."""
+        layout = config.get("output_layout", "flat")
+        if layout not in LAYOUTS:
+            raise ValueError(
+                f"Unknown output layout {layout!r}; "
+                f"expected one of {', '.join(LAYOUTS)}"
+            )
+        if layout == "flat":
+            return None
+        return cls(output_dir)
+
+    def paths(self, source: str, paper_data: Dict) -> Dict:
+        """Paths for a paper's original, extracted text and summary."""
+        stable_id = paper_id(source, paper_data)
+        shard = hashlib.sha256(stable_id.encode("utf-8")).hexdigest()[:2]
+        name = f"{stable_id}_{slugify(paper_data.get('title', ''))}"
+        suffix = Path(source).suffix.lower()
+        root = self.output_dir
+        return {
+            "id": stable_id,
+            "original": root / "papers" / shard / f"{name}{suffix}",
+            "extracted": root / "extracted" / shard / f"{name}_extracted.md",
+            "summary": root / "summaries" / shard / f"{name}_summary.md",
+        }
+
+    def record(
+        self, stable_id: str, title: str, source: str, files: Dict[str, Path]
+    ) -> None:
+        """Append one paper's ID, title and output files to the index."""
+        entry = {"id": stable_id, "title": title, "source": source}
+        for kind, path in files.items():
+            path = Path(path)
+            if self.output_dir in path.parents:
+                path = path.relative_to(self.output_dir)
+            entry[kind] = str(path)
+
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.index_file, "a", encoding="utf-8") as f:
+                f.write(line)
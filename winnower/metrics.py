@@ -0,0 +1,371 @@
+"""Prometheus-compatible metrics for long-running batches."""
+
+import os
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .tracing import Span
+
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[Tuple[str, Labels, float]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_labels(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, k, v) for k, v in self._values.items()]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    @contextmanager
+    def track(self, **labels) -> Iterator[None]:
+        """Increment for the duration of the enclosed block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed observations, optionally split by labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, buckets=LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, Dict] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._series.setdefault(
+                key,
+                {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0},
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, series in self._series.items():
+                for bound, count in zip(self.buckets, series["counts"]):
+                    samples.append(
+                        (
+                            f"{self.name}_bucket",
+                            key + (("le", _format_value(bound)),),
+                            count,
+                        )
+                    )
+                samples.append(
+                    (
+                        f"{self.name}_bucket",
+                        key + (("le", "+Inf"),),
+                        series["count"],
+                    )
+                )
+                samples.append((f"{self.name}_sum", key, series["sum"]))
+                samples.append((f"{self.name}_count", key, series["count"]))
+        return samples
+
+
+class CallbackMetric(_Metric):
+    """Metric whose samples are read from a callback at scrape time.
+
+    The callback returns a mapping of label dicts (as sorted tuples) to
+    values, which suits counters owned by other objects such as caches.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Dict[Labels, float]],
+        kind: str = "gauge",
+    ):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self):
+        return [(self.name, k, v) for k, v in self.callback().items()]
+
+
+class MetricsRegistry:
+    """A set of metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self.register(Counter(name, documentation))
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        return self.register(Gauge(name, documentation))
+
+    def histogram(self, name: str, documentation: str, **kwargs) -> Histogram:
+        return self.register(Histogram(name, documentation, **kwargs))
+
+    def render(self) -> str:
+        """Render every metric in the text exposition format (v0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                label_str = ",".join(
+                    f'{k}="{_escape(v)}"' for k, v in labels
+                )
+                label_str = f"{{{label_str}}}" if label_str else ""
+                lines.append(f"{name}{label_str} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class WinnowerMetrics:
+    """The standard metrics exported while ``WinnowerProcessor`` runs."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.papers = r.counter(
+            "winnower_papers_total",
+            "Papers finished, by status (processed, failed, skipped).",
+        )
+        self.stage_seconds = r.histogram(
+            "winnower_stage_duration_seconds",
+            "Wall-clock duration of pipeline stages.",
+        )
+        self.paper_seconds = r.histogram(
+            "winnower_paper_duration_seconds",
+            "Wall-clock time to process one paper end to end.",
+        )
+        self.llm_in_flight = r.gauge(
+            "winnower_llm_requests_in_flight",
+            "LLM requests currently awaiting a response.",
+        )
+        self.queue_depth = r.gauge(
+            "winnower_queue_depth",
+            "Papers collected for this run that have not started yet.",
+        )
+        self.tokens = r.counter(
+            "winnower_tokens_total",
+            "LLM tokens consumed, by model and type (input, output, cached).",
+        )
+        self.cost = r.counter(
+            "winnower_cost_usd_total",
+            "Estimated LLM spend in USD, by model.",
+        )
+        self._caches: Dict[str, object] = {}
+        r.register(
+            CallbackMetric(
+                "winnower_cache_requests_total",
+                "Cache lookups, by cache and result (hit, miss).",
+                self._collect_caches,
+                kind="counter",
+            )
+        )
+
+    def observe_span(self, span: Span) -> None:
+        """Tracer hook feeding stage latencies and paper outcomes."""
+        if span.name != "paper":
+            self.stage_seconds.observe(span.duration, stage=span.name)
+            return
+
+        self.paper_seconds.observe(span.duration)
+        if span.status == "ok":
+            self.papers.inc(status="processed")
+        elif span.status == "skipped":
+            self.papers.inc(status="skipped")
+        else:
+            self.papers.inc(status="failed")
+
+    def record_usage(self, usage: Optional[Dict]) -> None:
+        if not usage:
+            return
+        model = usage.get("model", "")
+        for kind in ["input", "output", "cached"]:
+            self.tokens.inc(
+                usage.get(f"{kind}_tokens", 0), model=model, type=kind
+            )
+        if usage.get("cost_usd") is not None:
+            self.cost.inc(usage["cost_usd"], model=model)
+
+    def watch_cache(self, name: str, cache) -> None:
+        """Export the ``hits``/``misses`` attributes of ``cache``."""
+        self._caches[name] = cache
+
+    def _collect_caches(self) -> Dict[Labels, float]:
+        samples = {}
+        for name, cache in list(self._caches.items()):
+            samples[_labels({"cache": name, "result": "hit"})] = cache.hits
+            samples[_labels({"cache": name, "result": "miss"})] = cache.misses
+        return samples
+
+
+class TextfileExporter:
+    """Periodically write metrics for node-exporter's textfile collector."""
+
+    def __init__(
+        self, registry: MetricsRegistry, path: Path, interval: float = 15.0
+    ):
+        self.registry = registry
+        self.path = Path(path)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        """Write the current metrics atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+        tmp_path.write_text(self.registry.render(), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def start(self) -> "TextfileExporter":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.write()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                print(f"Warning: could not write metrics textfile: {e}")
+
+
+class MetricsServer:
+    """Serve ``/metrics`` over HTTP from a background thread."""
+
+    def __init__(
+        self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 0
+    ):
+        self.registry = registry
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def _make_handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", "text/plain; version=0.0.4; charset=utf-8"
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,228 @@
+"""Near-duplicate detection with MinHash signatures and LSH banding."""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import numpy
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    numpy = None
+
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def shingle_hashes(text: str, k: int = 5) -> List[int]:
+    """32-bit hashes of the distinct word ``k``-shingles of ``text``."""
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < k:
+        words = words + [""] * (k - len(words))
+    hashes = set()
+    for i in range(len(words) - k + 1):
+        shingle = " ".join(words[i:i + k]).encode("utf-8")
+        digest = hashlib.blake2b(shingle, digest_size=4).digest()
+        hashes.add(int.from_bytes(digest, "little"))
+    return list(hashes)
+
+
+class MinHasher:
+    """Compute MinHash signatures with ``num_perm`` universal hashes."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        # 32-bit coefficients keep a * x + b below 2**64, so the numpy path
+        # computes exactly the same signatures as the pure-Python one.
+        self.a = [rng.randrange(1, MAX_HASH) for _ in range(num_perm)]
+        self.b = [rng.randrange(0, MAX_HASH) for _ in range(num_perm)]
+
+    def signature(self, hashes: List[int]) -> List[int]:
+        if not hashes:
+            return [MAX_HASH] * self.num_perm
+        if NUMPY_AVAILABLE:
+            return self._signature_numpy(hashes)
+
+        signature = []
+        for a, b in zip(self.a, self.b):
+            signature.append(
+                min(((a * x + b) % MERSENNE_PRIME) & MAX_HASH for x in hashes)
+            )
+        return signature
+
+    def _signature_numpy(self, hashes: List[int]) -> List[int]:
+        values = numpy.asarray(hashes, dtype=numpy.uint64)[None, :]
+        a = numpy.asarray(self.a, dtype=numpy.uint64)[:, None]
+        b = numpy.asarray(self.b, dtype=numpy.uint64)[:, None]
+        permuted = (values * a + b) % numpy.uint64(MERSENNE_PRIME)
+        return (permuted & numpy.uint64(MAX_HASH)).min(axis=1).tolist()
+
+
+def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not sig_a:
+        return 0.0
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures of preprocessed paper text.
+
+    Signatures are split into ``bands`` bands of ``num_perm // bands``
+    rows; papers sharing any band bucket become candidates, so lookups
+    touch only a handful of entries regardless of corpus size. Candidates
+    are then confirmed against ``threshold`` by signature agreement.
+    ``hits`` and ``misses`` count lookups with and without a match.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm, seed)
+        self.hits = 0
+        self.misses = 0
+        self._signatures: Dict[str, List[int]] = {}
+        self._metadata: Dict[str, Dict] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+        self._loaded: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["NearDuplicateIndex"]:
+        """Build an index when near-duplicate detection is enabled."""
+        if config.get("near_duplicates", "off") == "off":
+            return None
+        return cls(threshold=float(config.get("near_duplicate_threshold", 0.9)))
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> List[int]:
+        return self.hasher.signature(
+            shingle_hashes(text, self.shingle_size)
+        )
+
+    def query(self, signature: List[int]) -> List[Tuple[str, float]]:
+        """Indexed keys at or above the threshold, most similar first."""
+        with self._lock:
+            candidates = set()
+            for band in self._band_keys(signature):
+                candidates.update(self._buckets.get(band, ()))
+            matches = [
+                (key, similarity(signature, self._signatures[key]))
+                for key in candidates
+            ]
+
+        matches = [m for m in matches if m[1] >= self.threshold]
+        matches.sort(key=lambda m: -m[1])
+        with self._lock:
+            if matches:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return matches
+
+    def best_match(
+        self, signature: List[int]
+    ) -> Optional[Tuple[str, float, Dict]]:
+        matches = self.query(signature)
+        if not matches:
+            return None
+        key, score = matches[0]
+        return key, score, self._metadata.get(key, {})
+
+    def add(
+        self, key: str, signature: List[int], metadata: Optional[Dict] = None
+    ) -> None:
+        with self._lock:
+            if key in self._signatures:
+                self._remove(key)
+            self._signatures[key] = signature
+            self._metadata[key] = metadata or {}
+            for band in self._band_keys(signature):
+                self._buckets.setdefault(band, []).append(key)
+
+    def save(self, path: Path) -> None:
+        """Write signatures and metadata as JSON lines, atomically.
+
+        Saves of a shared index are serialized, so they never write the
+        same temporary file at once.
+        """
+        tmp_path = path.with_name(path.name + ".tmp")
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for key, signature in self._signatures.items():
+                    packed = array("I", signature).tobytes()
+                    f.write(
+                        json.dumps(
+                            {
+                                "key": key,
+                                "signature": base64.b64encode(
+                                    packed
+                                ).decode(),
+                                "metadata": self._metadata[key],
+                            }
+                        )
+                        + "\n"
+                    )
+            os.replace(tmp_path, path)
+            self._loaded.add(os.path.realpath(path))
+
+    def load(self, path: Path) -> None:
+        """Add entries previously written with :meth:`save`.
+
+        A file already loaded into or saved from this index is skipped.
+        """
+        real = os.path.realpath(path)
+        with self._lock:
+            if real in self._loaded:
+                return
+            self._loaded.add(real)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                signature = array("I")
+                signature.frombytes(base64.b64decode(entry["signature"]))
+                if len(signature) == self.hasher.num_perm:
+                    self.add(
+                        entry["key"], signature.tolist(), entry["metadata"]
+                    )
+
+    def _band_keys(self, signature: List[int]):
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            yield band, array("I", rows).tobytes()
+
+    def _remove(self, key: str) -> None:
+        for band in self._band_keys(self._signatures.pop(key)):
+            bucket = self._buckets.get(band, [])
+            if key in bucket:
+                bucket.remove(key)
+        self._metadata.pop(key, None)
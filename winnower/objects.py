@@ -0,0 +1,195 @@
+"""Content-addressed object store for originals and extracted text."""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from .dedup import file_hash
+
+try:
+    import zstandard
+
+    ZSTANDARD_AVAILABLE = True
+except ImportError:
+    ZSTANDARD_AVAILABLE = False
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+
+# ioctl request cloning one file's extents into another (Btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    return data
+
+
+def read_bytes(path: Path) -> bytes:
+    """Read a stored object, decompressing it based on its suffix."""
+    path = Path(path)
+    data = path.read_bytes()
+    if path.suffix == ".zst":
+        if not ZSTANDARD_AVAILABLE:
+            raise ImportError(f"Reading {path} requires zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if path.suffix == ".gz":
+        return gzip.decompress(data)
+    return data
+
+
+def read_text(path: Path) -> str:
+    """Read stored text such as extracted content, compressed or not."""
+    return read_bytes(path).decode("utf-8")
+
+
+def link_or_copy(src: Path, dst: Path) -> str:
+    """Place ``src`` at ``dst`` as cheaply as possible.
+
+    Tries a reflink (copy-on-write clone), then a hard link, then a full
+    copy, and returns which one worked. Hard links share the inode, so
+    originals should not be edited in place afterwards.
+    """
+    if fcntl is not None and sys.platform.startswith("linux"):
+        with open(src, "rb") as s, open(dst, "xb") as d:
+            try:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+                cloned = True
+            except OSError:
+                cloned = False
+        if cloned:
+            return "reflink"
+        dst.unlink()
+
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        pass
+
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}")
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+    return "copy"
+
+
+class ObjectStore:
+    """Store files and text under ``root`` by their SHA-256.
+
+    Objects live at ``root/ab/<sha256><suffix>``; anything already present
+    is not written again, so repeated runs and duplicate inputs cost no
+    extra space. Originals are reflinked or hard-linked when possible and
+    text is compressed (``gzip``, ``zstd`` or ``none``). ``manifest.jsonl``
+    maps each source to its objects. ``hits`` counts objects that already
+    existed and ``misses`` new ones.
+    """
+
+    def __init__(self, root: Path, compression: str = "gzip"):
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown compression {compression!r}; "
+                f"expected one of {', '.join(COMPRESSIONS)}"
+            )
+        if compression == "zstd" and not ZSTANDARD_AVAILABLE:
+            print("zstandard not available, compressing text with gzip")
+            compression = "gzip"
+
+        self.root = Path(root)
+        self.compression = compression
+        self.hits = 0
+        self.misses = 0
+        self.bytes_written = 0
+        self.links: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls, config: Dict, output_dir: Path
+    ) -> Optional["ObjectStore"]:
+        """Build a store under ``output_dir`` when ``object_store`` is set."""
+        if not config.get("object_store", False):
+            return None
+        return cls(
+            Path(output_dir) / "objects", config.get("compression", "gzip")
+        )
+
+    def path_for(self, digest: str, suffix: str = "") -> Path:
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def put_file(self, path: Path) -> Path:
+        """Add a file, keeping its extension; return the object path."""
+        path = Path(path)
+        target = self.path_for(file_hash(path), path.suffix.lower())
+        if self._exists(target):
+            return target
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            method = link_or_copy(path, target)
+        except FileExistsError:
+            return target
+        with self._lock:
+            self.links[method] = self.links.get(method, 0) + 1
+            if method == "copy":
+                self.bytes_written += target.stat().st_size
+        return target
+
+    def put_text(self, text: str, suffix: str = ".md") -> Path:
+        """Add text, compressed; return the object path."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        target = self.path_for(
+            digest, suffix + COMPRESSIONS[self.compression]
+        )
+        if self._exists(target):
+            return target
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        payload = compress(data, self.compression)
+        tmp = target.with_name(
+            f".{target.name}.{os.getpid()}.{threading.get_ident()}"
+        )
+        tmp.write_bytes(payload)
+        os.replace(tmp, target)
+        with self._lock:
+            self.bytes_written += len(payload)
+        return target
+
+    def record(self, source: str, **objects: Path) -> Dict[str, str]:
+        """Append ``source`` and its object paths to the manifest."""
+        entry = {
+            name: str(path.relative_to(self.root.parent))
+            for name, path in objects.items()
+            if path is not None
+        }
+        line = json.dumps(dict(entry, source=source)) + "\n"
+        manifest = self.root / "manifest.jsonl"
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(manifest, "a", encoding="utf-8") as f:
+                f.write(line)
+        return entry
+
+    def _exists(self, target: Path) -> bool:
+        exists = target.exists()
+        with self._lock:
+            if exists:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return exists
@@ -1,9 +1,11 @@
 """Paper parsing utilities for different input types."""
 
+import fnmatch
+import os
 import re
 import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from urllib.parse import urlparse
 
 import arxiv
@@ -11,21 +13,44 @@ import requests
 from bs4 import BeautifulSoup
 from PyPDF2 import PdfReader
 
+from .articles import LXML_AVAILABLE, extract_article
+from .cassettes import Cassette
+from .extractors import TRUNCATION_MARKER, ContentBuffer, content_budget
+from .latex import extract_latex
+from .tracing import Tracer
+
 try:
+    import pymupdf
     import pymupdf4llm
 
     PYMUPDF4LLM_AVAILABLE = True
 except ImportError:
     PYMUPDF4LLM_AVAILABLE = False
+    pymupdf = None
     pymupdf4llm = None
 
 
+PAPER_EXTENSIONS = (".pdf", ".txt", ".md")
+
+# Directories never searched for papers: winnower's own output and common
+# tool/cache directories. Hidden directories are skipped as well.
+SKIP_DIRECTORIES = {"winnower_output", "__pycache__", "node_modules"}
+
+
 class PaperParser:
     """Parse papers from various sources."""
 
-    def __init__(self, verbose: bool = False, config: Dict = None):
+    def __init__(
+        self,
+        verbose: bool = False,
+        config: Dict = None,
+        cassette: Optional[Cassette] = None,
+        tracer: Optional[Tracer] = None,
+    ):
         self.verbose = verbose
         self.config = config or {}
+        self.cassette = cassette
+        self.tracer = tracer or Tracer()
 
     def parse(self, source: str) -> Dict[str, str]:
         """Parse paper from source and return structured content."""
@@ -56,21 +81,93 @@ class PaperParser:
         if self.verbose:
             print(f"Fetching arXiv paper: {arxiv_id}")
 
-        search = arxiv.Search(id_list=[arxiv_id])
-        paper = next(search.results())
+        if self.config.get("arxiv_source", False):
+            paper = self._parse_arxiv_source(arxiv_id)
+            if paper is not None:
+                return paper
+            if self.verbose:
+                print(f"No LaTeX source for {arxiv_id}, using the PDF")
+
+        fetched = self._fetch(
+            "arxiv", {"id": arxiv_id}, lambda: self._fetch_arxiv(arxiv_id)
+        )
 
         with tempfile.NamedTemporaryFile(
             suffix=".pdf", delete=False
         ) as tmp_file:
-            paper.download_pdf(filename=tmp_file.name)
-            content = self._extract_pdf_text(Path(tmp_file.name))
+            tmp_file.write(fetched["pdf"])
+        content = self._extract_pdf_text(Path(tmp_file.name))
+
+        return {
+            "title": fetched["title"],
+            "authors": fetched["authors"],
+            "abstract": fetched["abstract"],
+            "content": content,
+            "source": f"arXiv:{arxiv_id}",
+            "url": fetched["url"],
+        }
+
+    def _parse_arxiv_source(self, arxiv_id: str) -> Optional[Dict[str, str]]:
+        """Parse an arXiv paper from its LaTeX source, if it has one.
+
+        The e-print archive is read in memory, which is far cheaper than
+        converting the PDF and keeps equations as the authors wrote them.
+        """
+        fetched = self._fetch(
+            "arxiv_source",
+            {"id": arxiv_id},
+            lambda: self._fetch_arxiv_source(arxiv_id),
+        )
+        with self.tracer.span("convert", format="latex"):
+            latex = extract_latex(fetched["source"])
+        if latex is None:
+            return None
 
+        return {
+            "title": fetched["title"] or latex["title"],
+            "authors": fetched["authors"],
+            "abstract": fetched["abstract"] or latex["abstract"],
+            "content": latex["content"],
+            "source": f"arXiv:{arxiv_id}",
+            "url": fetched["url"],
+        }
+
+    def _fetch_arxiv(self, arxiv_id: str) -> Dict:
+        """Download arXiv metadata and PDF bytes."""
+        paper = self._arxiv_result(arxiv_id)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pdf_path = Path(tmp_dir) / "paper.pdf"
+            paper.download_pdf(filename=str(pdf_path))
+            pdf_bytes = pdf_path.read_bytes() if pdf_path.exists() else b""
+
+        return dict(self._arxiv_metadata(paper), pdf=pdf_bytes)
+
+    def _fetch_arxiv_source(self, arxiv_id: str) -> Dict:
+        """Download arXiv metadata and the e-print source archive."""
+        paper = self._arxiv_result(arxiv_id)
+
+        response = requests.get(
+            f"https://arxiv.org/e-print/{arxiv_id}",
+            headers={"User-Agent": "Winnower/0.1.0"},
+        )
+        if response.status_code == 404:
+            source = b""
+        else:
+            response.raise_for_status()
+            source = response.content
+
+        return dict(self._arxiv_metadata(paper), source=source)
+
+    def _arxiv_result(self, arxiv_id: str):
+        search = arxiv.Search(id_list=[arxiv_id])
+        return next(search.results())
+
+    def _arxiv_metadata(self, paper) -> Dict:
         return {
             "title": paper.title,
             "authors": [str(author) for author in paper.authors],
             "abstract": paper.summary,
-            "content": content,
-            "source": f"arXiv:{arxiv_id}",
             "url": paper.entry_id,
         }
 
@@ -84,17 +181,16 @@ class PaperParser:
             if arxiv_id:
                 return self._parse_arxiv(arxiv_id)
 
-        response = requests.get(
-            url, headers={"User-Agent": "Winnower/0.1.0"}
+        response = self._fetch(
+            "url", {"url": url}, lambda: self._fetch_url(url)
         )
-        response.raise_for_status()
 
-        if "application/pdf" in response.headers.get("content-type", ""):
+        if "application/pdf" in response["content_type"]:
             with tempfile.NamedTemporaryFile(
                 suffix=".pdf", delete=False
             ) as tmp_file:
-                tmp_file.write(response.content)
-                content = self._extract_pdf_text(Path(tmp_file.name))
+                tmp_file.write(response["content"])
+            content = self._extract_pdf_text(Path(tmp_file.name))
 
             return {
                 "title": self._extract_title_from_url(url),
@@ -105,15 +201,47 @@ class PaperParser:
                 "url": url,
             }
         else:
-            soup = BeautifulSoup(response.content, "html.parser")
-            return {
-                "title": self._extract_title_from_html(soup),
-                "authors": [],
-                "abstract": "",
-                "content": soup.get_text(),
-                "source": url,
-                "url": url,
-            }
+            with self.tracer.span("convert", format="html"):
+                article = self._convert_html(response["content"])
+            return dict(article, source=url, url=url)
+
+    def _convert_html(self, content: bytes) -> Dict:
+        """Extract an HTML page's article, or all its text."""
+        if self.config.get("html_main_content", True) and LXML_AVAILABLE:
+            try:
+                return extract_article(content)
+            except Exception as e:
+                if self.verbose:
+                    print(
+                        f"Article extraction failed, using the whole "
+                        f"page: {e}"
+                    )
+
+        soup = BeautifulSoup(content, "html.parser")
+        return {
+            "title": self._extract_title_from_html(soup),
+            "authors": [],
+            "abstract": "",
+            "content": soup.get_text(),
+        }
+
+    def _fetch_url(self, url: str) -> Dict:
+        """Download a URL and return its content type and body."""
+        response = requests.get(
+            url, headers={"User-Agent": "Winnower/0.1.0"}
+        )
+        response.raise_for_status()
+        return {
+            "content_type": response.headers.get("content-type", ""),
+            "content": response.content,
+        }
+
+    def _fetch(self, kind: str, request: Dict, fetch) -> Dict:
+        """Run a network fetch, through the cassette when one is set."""
+        with self.tracer.span("fetch", kind=kind):
+            if self.cassette is None:
+                return fetch()
+            return self.cassette.play(kind, request, fetch)
 
     def _parse_file(self, file_path: Path) -> Dict[str, str]:
         """Parse paper from local file."""
@@ -123,7 +251,10 @@ class PaperParser:
         if file_path.suffix.lower() == ".pdf":
             content = self._extract_pdf_text(file_path)
         else:
-            content = file_path.read_text(encoding="utf-8", errors="ignore")
+            with self.tracer.span("convert", format="text"):
+                content = file_path.read_text(
+                    encoding="utf-8", errors="ignore"
+                )
 
         return {
             "title": file_path.stem,
@@ -136,6 +267,16 @@ class PaperParser:
 
     def _extract_pdf_text(self, pdf_path: Path) -> str:
         """Extract text from PDF file, with optional markdown conversion."""
+        with self.tracer.span("convert", format="pdf"):
+            return self._convert_pdf(pdf_path)
+
+    def _convert_pdf(self, pdf_path: Path) -> str:
+        """Convert a PDF with pymupdf4llm, falling back to PyPDF2."""
+        pages = self._count_pages(pdf_path)
+        threshold = self.config.get("stream_pdf_pages", 50)
+        if threshold is not None and pages is not None and pages >= threshold:
+            return self._stream_pdf(pdf_path, pages)
+
         # Check if we should use markdown conversion
         use_markdown = self.config.get("pdf_to_markdown", True)
 
@@ -161,6 +302,65 @@ class PaperParser:
         # Legacy PyPDF2 extraction
         return self._extract_pdf_text_legacy(pdf_path)
 
+    def _count_pages(self, pdf_path: Path) -> Optional[int]:
+        try:
+            if PYMUPDF4LLM_AVAILABLE:
+                with pymupdf.open(str(pdf_path)) as doc:
+                    return doc.page_count
+            return len(PdfReader(str(pdf_path)).pages)
+        except Exception:
+            return None
+
+    def _stream_pdf(self, pdf_path: Path, pages: int) -> str:
+        """Convert a long PDF page by page, up to the content budget.
+
+        Pages are converted only until the prompt budget is filled, so
+        memory no longer grows with the length of the document. The text
+        keeps its line and markdown structure and ends with the
+        truncation marker when later pages were left out.
+        """
+        buffer = ContentBuffer(content_budget(self.config))
+        converted = self._pdf_pages(pdf_path)
+        try:
+            for page in converted:
+                if not buffer.add(page):
+                    break
+        finally:
+            converted.close()
+        if self.verbose:
+            print(
+                f"Converted {buffer.pages} of {pages} pages "
+                f"({buffer.size} characters)"
+            )
+        text = buffer.text()
+        if buffer.pages < pages:
+            text += "\n\n" + TRUNCATION_MARKER
+        return text
+
+    def _pdf_pages(self, pdf_path: Path) -> Iterator[str]:
+        """Yield the text of each page, as markdown when configured."""
+        use_markdown = self.config.get("pdf_to_markdown", True)
+        if not PYMUPDF4LLM_AVAILABLE:
+            for page in PdfReader(str(pdf_path)).pages:
+                yield page.extract_text() or ""
+            return
+
+        with pymupdf.open(str(pdf_path)) as doc:
+            for number in range(doc.page_count):
+                if use_markdown:
+                    try:
+                        yield pymupdf4llm.to_markdown(
+                            doc, pages=[number], show_progress=False
+                        )
+                        continue
+                    except Exception as e:
+                        if self.verbose:
+                            print(
+                                f"Markdown conversion of page {number + 1} "
+                                f"failed, extracting text: {e}"
+                            )
+                yield doc[number].get_text()
+
     def _extract_pdf_text_legacy(self, pdf_path: Path) -> str:
         """Legacy PDF text extraction using PyPDF2."""
         try:
@@ -192,17 +392,128 @@ class PaperParser:
             title_tag.get_text().strip() if title_tag else "Unknown Title"
         )
 
+    def accepts(
+        self,
+        path: Path,
+        directory: Path,
+        recursive: bool = False,
+        skip: Optional[List[Path]] = None,
+    ) -> bool:
+        """Whether :meth:`find_papers_in_directory` would yield ``path``.
+
+        Lets a single changed file be checked without walking the tree.
+        """
+        include = self.config.get("include_patterns") or []
+        exclude = self.config.get("exclude_patterns") or []
+        max_depth = self.config.get("max_depth") if recursive else 0
+        try:
+            parts = Path(path).relative_to(directory).parts
+        except ValueError:
+            return False
+        if not parts or (max_depth is not None and len(parts) > max_depth + 1):
+            return False
+
+        real = os.path.realpath(path)
+        for skipped in skip or []:
+            if real.startswith(os.path.realpath(skipped) + os.sep):
+                return False
+        for depth, name in enumerate(parts[:-1]):
+            relative = "/".join(parts[: depth + 1])
+            if (
+                name.startswith(".")
+                or name in SKIP_DIRECTORIES
+                or _matches(relative, name, exclude)
+            ):
+                return False
+
+        name, relative = parts[-1], "/".join(parts)
+        return (
+            name.lower().endswith(PAPER_EXTENSIONS)
+            and not _matches(relative, name, exclude)
+            and (not include or _matches(relative, name, include))
+        )
+
     def find_papers_in_directory(
-        self, directory: Path, recursive: bool = False
-    ) -> List[Path]:
-        """Find paper files in directory."""
-        patterns = ["*.pdf", "*.txt", "*.md"]
-        files = []
-
-        for pattern in patterns:
-            if recursive:
-                files.extend(directory.rglob(pattern))
-            else:
-                files.extend(directory.glob(pattern))
-
-        return sorted(files)
+        self,
+        directory: Path,
+        recursive: bool = False,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        max_depth: Optional[int] = None,
+        skip: Optional[List[Path]] = None,
+    ) -> Iterator[Path]:
+        """Yield paper files in directory as they are found.
+
+        The tree is walked once with ``os.scandir``, entries of each
+        directory in name order, so processing can start before the walk
+        finishes. ``include``/``exclude`` are glob patterns matched against
+        the path relative to ``directory`` and against the bare name;
+        excluded directories are not descended into. ``max_depth`` limits
+        recursion (0 is ``directory`` itself). Hidden directories, winnower
+        output directories and the directories in ``skip`` are ignored.
+        Symlinked directories are followed, but each real directory is
+        walked only once, so symlink cycles end.
+        """
+        if include is None:
+            include = self.config.get("include_patterns") or []
+        if exclude is None:
+            exclude = self.config.get("exclude_patterns") or []
+        if max_depth is None:
+            max_depth = self.config.get("max_depth")
+        if not recursive:
+            max_depth = 0
+        skipped = {os.path.realpath(p) for p in skip or []}
+        visited = {os.path.realpath(directory)}
+
+        stack = [(Path(directory), "", 0)]
+        while stack:
+            current, prefix, depth = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                if self.verbose:
+                    print(f"Warning: cannot read {current}: {e}")
+                continue
+
+            subdirectories = []
+            for entry in entries:
+                relative = prefix + entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+
+                if is_dir:
+                    if (
+                        (max_depth is not None and depth >= max_depth)
+                        or entry.name.startswith(".")
+                        or entry.name in SKIP_DIRECTORIES
+                        or _matches(relative, entry.name, exclude)
+                    ):
+                        continue
+                    real = os.path.realpath(entry.path)
+                    if real in skipped or real in visited:
+                        continue
+                    visited.add(real)
+                    subdirectories.append(
+                        (Path(entry.path), relative + "/", depth + 1)
+                    )
+                elif (
+                    entry.name.lower().endswith(PAPER_EXTENSIONS)
+                    and not _matches(relative, entry.name, exclude)
+                    and (
+                        not include or _matches(relative, entry.name, include)
+                    )
+                ):
+                    yield Path(entry.path)
+
+            stack.extend(reversed(subdirectories))
+
+
+def _matches(relative: str, name: str, patterns: List[str]) -> bool:
+    """Whether a glob in ``patterns`` matches the relative path or name."""
+    return any(
+        fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(name, pattern)
+        for pattern in patterns
+    )
@@ -0,0 +1,644 @@
+"""Estimate a run's tokens, cost and wall time without calling a model."""
+
+import hashlib
+import json
+import math
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .cassettes import Cassette
+from .dedup import Deduplicator
+from .extractors import CHARS_PER_TOKEN, TRUNCATION_MARKER, TechnicalExtractor
+from .parsers import PaperParser
+from .profiles import load_profiles
+from .routing import Route
+from .singleflight import source_key
+from .tracing import Tracer
+from .usage import estimate_cost
+
+try:
+    import tiktoken
+
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+    tiktoken = None
+
+
+# Chat formatting adds a few tokens around each message.
+TOKENS_PER_MESSAGE = 4
+# Summaries run about this many tokens per requested word.
+TOKENS_PER_WORD = 1.4
+# Request latency assumed for models the last run report has not seen.
+REQUEST_OVERHEAD_S = 1.0
+OUTPUT_TOKENS_PER_S = 50.0
+# Share of papers escalated past a cascade's cheap model when no earlier
+# run has measured it.
+DEFAULT_ESCALATION_RATE = 0.25
+# OpenAI caches prompt prefixes of at least 1024 tokens, in 128-token steps.
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_STEP = 128
+
+PLAN_CACHE_FILE = "plan_cache.json"
+
+# A profile's name (None without profiles), extractor, full routes and
+# cascade route
+Target = Tuple[
+    Optional[str], TechnicalExtractor, List[Route], Optional[Route]
+]
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """The tiktoken encoding for ``model``, or None if unavailable."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception:
+        return None
+    # Models tiktoken does not know (e.g. Claude) get a close stand-in
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """Tokens in ``text`` for ``model``, estimated without tiktoken."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def request_tokens(request: Dict) -> int:
+    """Input tokens of a chat completion or messages request."""
+    return sum(
+        count_tokens(message["content"], request["model"])
+        + TOKENS_PER_MESSAGE
+        for message in request["messages"]
+    )
+
+
+class CapacityPlanner:
+    """Plan a run from its papers' real prompts, without model calls.
+
+    Papers are discovered, deduplicated and parsed as in a run, and each
+    request is built by the extractor itself, so token counts include
+    preprocessing, truncation and the prompt template. Tokens are counted
+    with tiktoken when installed, else estimated at ``CHARS_PER_TOKEN``.
+    Per-paper results are kept in ``plan_cache.json`` in the output
+    directory, so planning the same papers with the same settings again
+    skips parsing them.
+
+    With ``profiles``, each active profile's routes are planned with its
+    own prompt, model and lengths, and the totals add them up.
+
+    Cost comes from the pricing table. Wall time spreads the measured
+    conversion times and the model latency (as observed in the output
+    directory's last run report, when there is one) over ``workers``,
+    and is capped by ``rate_limit_rpm`` and ``rate_limit_tpm``.
+    """
+
+    def __init__(
+        self,
+        config: Dict,
+        model_provider: str = "openai",
+        verbose: bool = False,
+    ):
+        self.config = config
+        self.verbose = verbose
+        self.cassette = Cassette.from_config(config)
+        tracer = Tracer()
+        self.parser = PaperParser(
+            verbose=verbose,
+            config=config,
+            cassette=self.cassette,
+            tracer=tracer,
+        )
+        self.extractor = TechnicalExtractor(
+            model_provider=model_provider,
+            config=config,
+            verbose=verbose,
+            cassette=self.cassette,
+            tracer=tracer,
+            connect=False,
+        )
+        # With profiles, the main extractor only prepares content
+        self.targets = [
+            (
+                profile.name,
+                TechnicalExtractor(
+                    model_provider=profile.provider,
+                    config=profile.config,
+                    verbose=verbose,
+                    cassette=self.cassette,
+                    tracer=tracer,
+                    connect=False,
+                ),
+            )
+            for profile in load_profiles(config, model_provider)
+        ] or [(None, self.extractor)]
+
+    def plan(
+        self,
+        input_source: Union[str, List[str]],
+        output_dir: Path,
+        recursive: bool = False,
+    ) -> Dict:
+        """Plan processing ``input_source`` into ``output_dir``.
+
+        The plan is also written to ``output_dir/plan.json``.
+        """
+        output_dir = Path(output_dir)
+        found = 0
+
+        def collect() -> Iterator[str]:
+            nonlocal found
+            for source in self._collect_papers(
+                input_source, recursive, output_dir
+            ):
+                found += 1
+                yield source
+
+        sources = collect()
+        if self.config.get("deduplicate", True):
+            sources = Deduplicator().stream(sources, {})
+
+        targets: List[Target] = []
+        routes = []
+        for name, extractor in self.targets:
+            cascade = extractor.cascade
+            full_routes = extractor.full_routes()
+            targets.append((name, extractor, full_routes, cascade))
+            for route in full_routes + ([cascade] if cascade else []):
+                routes.append((_label(name, route), extractor, route))
+
+        cache_file = output_dir / PLAN_CACHE_FILE
+        cache = _read_json(cache_file) or {}
+        fingerprint = self._fingerprint()
+        route_ids = {
+            label: self._route_id(extractor, route)
+            for label, extractor, route in routes
+        }
+        papers: List[Dict] = []
+        failed: List[Dict] = []
+        hits = unique = 0
+        for source in sources:
+            unique += 1
+            key = f"{source_key(source)}:{fingerprint}"
+            entry = cache.get(key)
+            if entry is not None and set(route_ids.values()) <= set(
+                entry["routes"]
+            ):
+                hits += 1
+            else:
+                try:
+                    fresh = self._analyze(source, routes, route_ids)
+                except Exception as e:
+                    print(f"Error parsing {source}: {e}")
+                    failed.append({"source": source, "error": str(e)})
+                    continue
+                if entry is not None:
+                    fresh["routes"] = dict(entry["routes"], **fresh["routes"])
+                entry = cache[key] = fresh
+            papers.append(
+                dict(
+                    entry,
+                    source=source,
+                    routes={
+                        name: entry["routes"][route_id]
+                        for name, route_id in route_ids.items()
+                    },
+                )
+            )
+
+        plan = {
+            "input": str(input_source),
+            "papers": found,
+            "duplicates": found - unique,
+            "failed": failed,
+            "text_cache": {"hits": hits, "misses": unique - hits},
+        }
+        if self.targets[0][0] is not None:
+            plan["profiles"] = [name for name, _ in self.targets]
+        plan.update(self._project(papers, targets, output_dir))
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        _write_json(cache_file, cache)
+        _write_json(output_dir / "plan.json", plan)
+        return plan
+
+    def _collect_papers(
+        self,
+        input_source: Union[str, List[str]],
+        recursive: bool,
+        output_dir: Path,
+    ) -> Iterator[str]:
+        if isinstance(input_source, (list, tuple)):
+            for source in input_source:
+                yield from self._collect_papers(source, recursive, output_dir)
+            return
+        if Path(input_source).is_dir():
+            for path in self.parser.find_papers_in_directory(
+                Path(input_source), recursive, skip=[output_dir]
+            ):
+                yield str(path)
+        else:
+            yield input_source
+
+    def _fingerprint(self) -> str:
+        """Identify the settings that change how papers are read."""
+        settings = {
+            "pdf_to_markdown": self.config.get("pdf_to_markdown", True),
+            "stream_pdf_pages": self.config.get("stream_pdf_pages", 50),
+            "html_main_content": self.config.get("html_main_content", True),
+            "arxiv_source": self.config.get("arxiv_source", False),
+            "max_content_tokens": self.config.get("max_content_tokens"),
+            "tiktoken": TIKTOKEN_AVAILABLE,
+        }
+        if self._replaying:
+            path = self.cassette.path
+            settings["cassette"] = [str(path), path.stat().st_mtime]
+        return _digest(settings)
+
+    def _route_id(self, extractor: TechnicalExtractor, route: Route) -> str:
+        """Identify the requests sent to ``route``, less the paper."""
+        empty = extractor.build_prompt("", "")
+        return _digest(extractor.build_request(route, empty))
+
+    @property
+    def _replaying(self) -> bool:
+        return self.cassette is not None and self.cassette.mode == "replay"
+
+    def _analyze(
+        self,
+        source: str,
+        routes: List[Tuple[str, TechnicalExtractor, Route]],
+        route_ids: Dict[str, str],
+    ) -> Dict:
+        """Parse one paper and size its request on each route."""
+        if self.verbose:
+            print(f"Planning: {source}")
+        start = time.perf_counter()
+        paper_data = self.parser.parse(source)
+        convert_s = time.perf_counter() - start
+
+        content = self.extractor.prepare_content(paper_data["content"])
+        prompts: Dict[int, str] = {}
+        sizes = {}
+        for label, extractor, route in routes:
+            prompt = prompts.get(id(extractor))
+            if prompt is None:
+                prompt = prompts[id(extractor)] = extractor.build_prompt(
+                    paper_data["title"], content
+                )
+            request = extractor.build_request(route, prompt)
+            replayed = self._replaying and self.cassette.has(
+                "llm", {"provider": route.provider, **request}
+            )
+            sizes[route_ids[label]] = {
+                "input_tokens": request_tokens(request),
+                "replayed": replayed,
+            }
+        return {
+            "title": paper_data["title"],
+            "convert_s": round(convert_s, 4),
+            "truncated": content.endswith(TRUNCATION_MARKER),
+            "routes": sizes,
+        }
+
+    def _project(
+        self,
+        papers: List[Dict],
+        targets: List[Target],
+        output_dir: Path,
+    ) -> Dict:
+        """Totals, cost and wall time for ``papers`` on every target."""
+        last_run = _read_json(output_dir / "run_report.json") or {}
+        observed = (last_run.get("usage") or {}).get("models") or {}
+        escalation = _escalation_rate(last_run)
+
+        route_plans = []
+        # Full-tier plans behind a cascade, which only escalated papers use
+        escalated = set()
+        cascades = []
+        over_quota = 0.0
+        for name, extractor, full_routes, cascade in targets:
+            shares, over = _allocate(full_routes, len(papers))
+            over_quota += over
+            tiers = [
+                (route, "full", shares[route.key]) for route in full_routes
+            ]
+            if cascade is not None:
+                tiers.append((cascade, "cheap", 1.0))
+                cascades.append(_label(name, cascade))
+            for route, tier, share in tiers:
+                route_plan = self._route_plan(
+                    papers,
+                    extractor,
+                    _label(name, route),
+                    route,
+                    tier,
+                    share,
+                    observed,
+                )
+                if tier == "full" and cascade is not None:
+                    escalated.add(id(route_plan))
+                route_plans.append(route_plan)
+
+        # Escalated papers go to the full tier after the cheap one
+        def weight(route_plan: Dict, rate: float = escalation) -> float:
+            return rate if id(route_plan) in escalated else 1.0
+
+        def total(field: str) -> float:
+            return sum(r[field] * weight(r) for r in route_plans)
+
+        def cost(rate: float) -> float:
+            return sum(
+                (r["cost_usd"] or 0.0) * weight(r, rate) for r in route_plans
+            )
+
+        requests = total("requests")
+        tokens = {
+            "input": round(total("input_tokens")),
+            "cached": round(total("cached_tokens")),
+            "output": round(total("output_tokens")),
+        }
+        plan = {
+            "planned": len(papers),
+            "truncated": sum(1 for paper in papers if paper["truncated"]),
+            "requests": round(requests, 2),
+            "replayed": round(total("replayed"), 2),
+            "over_quota": round(over_quota, 2),
+            "tokens": tokens,
+            "tokenizer": "tiktoken" if TIKTOKEN_AVAILABLE else "estimate",
+            "cost_usd": {
+                "estimate": cost(escalation),
+                "low": cost(0.0),
+                "high": cost(1.0),
+                "unpriced": [
+                    r["route"] for r in route_plans if r["cost_usd"] is None
+                ],
+            },
+            "wall_time_s": self._wall_time(
+                papers, route_plans, weight, requests, tokens
+            ),
+            "routes": route_plans,
+            "papers_planned": [
+                {
+                    key: paper[key]
+                    for key in ("source", "title", "convert_s", "truncated")
+                }
+                for paper in papers
+            ],
+        }
+        if cascades:
+            plan["cascade"] = {
+                "model": ", ".join(cascades),
+                "escalation_rate": escalation,
+            }
+        return plan
+
+    def _route_plan(
+        self,
+        papers: List[Dict],
+        extractor: TechnicalExtractor,
+        label: str,
+        route: Route,
+        tier: str,
+        share: float,
+        observed: Dict,
+    ) -> Dict:
+        """Requests, tokens, latency and cost of ``share`` of the papers."""
+        config = extractor.config
+        output_tokens = min(
+            config.get("max_tokens", 4000),
+            math.ceil(
+                (
+                    sum(extractor.summary_lengths())
+                    or config.get("summary_length", 200)
+                )
+                * TOKENS_PER_WORD
+            ),
+        )
+        requests = replayed = input_tokens = 0.0
+        for paper in papers:
+            size = paper["routes"][label]
+            if size["replayed"]:
+                replayed += share
+                continue
+            requests += share
+            input_tokens += share * size["input_tokens"]
+        cached = self._prompt_cache_tokens(extractor, route) * max(
+            0.0, requests - 1
+        )
+        usage = {
+            "input_tokens": input_tokens,
+            "cached_tokens": cached,
+            "output_tokens": requests * output_tokens,
+        }
+        seen = observed.get(route.key) or {}
+        if seen.get("requests"):
+            latency = seen["latency_s"] / seen["requests"]
+        else:
+            latency = REQUEST_OVERHEAD_S + output_tokens / OUTPUT_TOKENS_PER_S
+        return dict(
+            usage,
+            route=label,
+            tier=tier,
+            requests=requests,
+            replayed=replayed,
+            latency_s=round(latency, 3),
+            cost_usd=estimate_cost(
+                route.model, usage, self.config.get("model_pricing")
+            ),
+        )
+
+    def _prompt_cache_tokens(
+        self, extractor: TechnicalExtractor, route: Route
+    ) -> int:
+        """Prompt prefix tokens the provider caches across requests.
+
+        OpenAI caches long shared prefixes automatically; Anthropic only
+        caches marked prompts, which the extractor does not send.
+        """
+        if route.provider != "openai":
+            return 0
+        marker = "\0"
+        prompt = extractor.build_prompt(marker, marker)
+        request = extractor.build_request(route, prompt)
+        prefix = dict(request, messages=[])
+        for message in request["messages"]:
+            content = message["content"]
+            if marker in content:
+                content = content.split(marker)[0]
+                prefix["messages"].append(dict(message, content=content))
+                break
+            prefix["messages"].append(message)
+        tokens = request_tokens(prefix)
+        if tokens < PROMPT_CACHE_MIN_TOKENS:
+            return 0
+        return tokens // PROMPT_CACHE_STEP * PROMPT_CACHE_STEP
+
+    def _wall_time(
+        self,
+        papers: List[Dict],
+        route_plans: List[Dict],
+        weight,
+        requests: float,
+        tokens: Dict,
+    ) -> Dict:
+        """The slowest of the latency, request-rate and token-rate bounds."""
+        workers = max(1, int(self.config.get("workers", 1)))
+        convert = sum(paper["convert_s"] for paper in papers)
+        model = sum(
+            r["requests"] * r["latency_s"] * weight(r) for r in route_plans
+        )
+        longest = max((paper["convert_s"] for paper in papers), default=0.0)
+        longest += max((r["latency_s"] for r in route_plans), default=0.0)
+        bounds = {"latency": max((convert + model) / workers, longest)}
+
+        rpm = self.config.get("rate_limit_rpm")
+        if rpm:
+            bounds["rpm"] = requests / rpm * 60
+        tpm = self.config.get("rate_limit_tpm")
+        if tpm:
+            bounds["tpm"] = (tokens["input"] + tokens["output"]) / tpm * 60
+        bound_by = max(bounds, key=bounds.get)
+        return {
+            "estimate": round(bounds[bound_by], 2) if papers else 0.0,
+            "bound_by": bound_by,
+            "workers": workers,
+            "convert_s": round(convert, 2),
+            "model_s": round(model, 2),
+            "bounds": {name: round(s, 2) for name, s in bounds.items()},
+        }
+
+
+def format_plan(plan: Dict) -> str:
+    """A short human-readable summary of a plan."""
+    tokens = plan["tokens"]
+    cost = plan["cost_usd"]
+    wall = plan["wall_time_s"]
+    lines = [
+        f"Plan for {plan['planned']} paper(s) "
+        f"({plan['duplicates']} duplicate(s) skipped, "
+        f"{len(plan['failed'])} failed to parse)",
+        f"  tokens:     {tokens['input']:,} in ({tokens['cached']:,} cached), "
+        f"{tokens['output']:,} out ({plan['tokenizer']}); "
+        f"{plan['truncated']} truncated",
+        f"  requests:   {plan['requests']:g} "
+        f"({plan['replayed']:g} replayed from cassette)",
+    ]
+    if cost["low"] != cost["high"]:
+        lines.append(
+            f"  cost:       ~${cost['estimate']:.4f} "
+            f"(${cost['low']:.4f} to ${cost['high']:.4f})"
+        )
+    else:
+        lines.append(f"  cost:       ~${cost['estimate']:.4f}")
+    if cost["unpriced"]:
+        lines.append(
+            f"              no pricing for {', '.join(cost['unpriced'])}"
+        )
+    lines.append(
+        f"  wall time:  ~{_duration(wall['estimate'])} with "
+        f"{wall['workers']} worker(s), bound by {wall['bound_by']}"
+    )
+    text_cache = plan["text_cache"]
+    lines.append(
+        f"  text cache: {text_cache['hits']} reused, "
+        f"{text_cache['misses']} parsed"
+    )
+    if plan["over_quota"]:
+        lines.append(
+            f"  over quota: ~{plan['over_quota']:g} paper(s) would fail"
+        )
+    if "cascade" in plan:
+        lines.append(
+            f"  cascade:    {plan['cascade']['model']}, "
+            f"{plan['cascade']['escalation_rate']:.0%} assumed escalated"
+        )
+    for route in plan["routes"]:
+        route_cost = route["cost_usd"]
+        lines.append(
+            f"    {route['route']:<32}{route['tier']:>6}"
+            f"{route['requests']:>9.1f} req"
+            f"{round(route['input_tokens']):>12,} in"
+            + (f"  ${route_cost:.4f}" if route_cost is not None else "")
+        )
+    return "\n".join(lines)
+
+
+def _label(profile: Optional[str], route: Route) -> str:
+    """A route's name in the plan, under its profile if it has one."""
+    return route.key if profile is None else f"{profile}/{route.key}"
+
+
+def _allocate(routes: List[Route], papers: int):
+    """Expected requests per route by weight within quotas, and the excess."""
+    shares = {route.key: 0.0 for route in routes}
+    remaining = float(papers)
+    active = [route for route in routes if route.quota != 0]
+    while remaining > 1e-9 and active:
+        weights = sum(route.weight for route in active)
+        if weights <= 0:
+            break
+        placed = 0.0
+        for route in list(active):
+            want = remaining * route.weight / weights
+            if route.quota is not None:
+                want = min(want, route.quota - shares[route.key])
+            shares[route.key] += want
+            placed += want
+            if route.quota is not None and shares[route.key] >= route.quota:
+                active.remove(route)
+        remaining -= placed
+        if placed <= 1e-9:
+            break
+    if papers:
+        shares = {key: count / papers for key, count in shares.items()}
+    return shares, max(0.0, remaining)
+
+
+def _escalation_rate(last_run: Dict) -> float:
+    """Share of papers the last run escalated past the cheap model."""
+    tiers = (last_run.get("cascade") or {}).get("tiers") or {}
+    served = tiers.get("cheap", 0) + tiers.get("full", 0)
+    if not served:
+        return DEFAULT_ESCALATION_RATE
+    return tiers.get("full", 0) / served
+
+
+def _duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
+
+
+def _digest(data) -> str:
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _read_json(path: Path) -> Optional[Dict]:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_json(path: Path, data: Dict) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    tmp.replace(path)
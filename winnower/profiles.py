@@ -0,0 +1,91 @@
+"""Named extraction profiles run side by side over the same papers."""
+
+import re
+from typing import Dict, List
+
+from .routing import PROVIDERS
+
+
+# Settings a profile may change: how a paper is summarized, not how it
+# is read, so every profile shares one parse of each paper.
+PROFILE_KEYS = {
+    "provider",
+    "prompt_file",
+    "extraction_prompt",
+    "openai_model",
+    "anthropic_model",
+    "max_tokens",
+    "temperature",
+    "summary_length",
+    "summary_lengths",
+    "routes",
+    "hedge",
+    "hedge_after_s",
+    "cascade_model",
+    "cascade_provider",
+}
+
+# Profile names become directory names under summaries/.
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+class Profile:
+    """A named prompt, model and length, with summaries of its own.
+
+    ``config`` is the run's configuration with the profile's settings
+    applied on top.
+    """
+
+    def __init__(self, name: str, provider: str, config: Dict):
+        self.name = name
+        self.provider = provider
+        self.config = config
+
+    def __repr__(self) -> str:
+        return f"Profile({self.name!r}, provider={self.provider!r})"
+
+
+def load_profiles(
+    config: Dict, model_provider: str = "openai"
+) -> List[Profile]:
+    """The profiles a run uses, or [] for a single-profile run.
+
+    ``profiles`` maps each name to its settings (any of
+    ``PROFILE_KEYS``; ``provider`` picks the model provider) and
+    ``active_profiles`` chooses which of them run, by default all.
+    """
+    profiles = config.get("profiles") or {}
+    names = config.get("active_profiles") or list(profiles)
+    unknown = [name for name in names if name not in profiles]
+    if unknown:
+        raise ValueError(
+            f"Unknown profile {', '.join(unknown)}; configured profiles: "
+            f"{', '.join(profiles) or 'none'}"
+        )
+
+    loaded = []
+    for name in dict.fromkeys(names):
+        if not NAME_PATTERN.match(name):
+            raise ValueError(
+                f"Invalid profile name {name!r}: use letters, digits, "
+                f"'.', '_' and '-'"
+            )
+        settings = dict(profiles[name] or {})
+        invalid = sorted(set(settings) - PROFILE_KEYS)
+        if invalid:
+            raise ValueError(
+                f"Profile {name!r} cannot set {', '.join(invalid)}; "
+                f"profiles may set {', '.join(sorted(PROFILE_KEYS))}"
+            )
+
+        provider = settings.pop("provider", model_provider)
+        if provider not in PROVIDERS:
+            raise ValueError(
+                f"Profile {name!r} has unsupported provider {provider!r}"
+            )
+        profile_config = dict(config, **settings)
+        if "extraction_prompt" in settings and "prompt_file" not in settings:
+            # The run's prompt file would otherwise take precedence
+            profile_config["prompt_file"] = None
+        loaded.append(Profile(name, provider, profile_config))
+    return loaded
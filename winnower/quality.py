@@ -0,0 +1,62 @@
+"""Fast local quality checks for generated summaries."""
+
+import re
+from typing import List, Optional
+
+
+REFUSAL_PATTERN = re.compile(
+    r"\b(I'?m sorry|I apologi[sz]e|I (?:cannot|can't|am unable to|"
+    r"won't be able to)|as an AI\b|I do not have access)",
+    re.IGNORECASE,
+)
+
+# Signs of technical substance: math notation or method vocabulary.
+EQUATION_PATTERN = re.compile(r"\$|\\[a-zA-Z]+|[=≈∝∑∫∂∇]|\^\{?\w")
+METHOD_PATTERN = re.compile(
+    r"\b(algorithm|method|model|equation|loss|objective|estimat|optimi[sz]|"
+    r"architecture|procedure|formulation|framework|parameter|approximat|"
+    r"inference|gradient|distribution|theorem|kernel|network)",
+    re.IGNORECASE,
+)
+
+TRUNCATED_FINISH_REASONS = {"length", "max_tokens"}
+
+# Summaries may stray from the requested length; only flag big misses.
+MIN_LENGTH_RATIO = 0.3
+MAX_LENGTH_RATIO = 3.0
+MIN_WORDS = 20
+
+
+def check_summary(
+    text: str,
+    summary_length: int = 200,
+    finish_reason: Optional[str] = None,
+) -> List[str]:
+    """Names of the checks ``text`` fails; empty when it looks usable.
+
+    Checks: ``too_short``/``too_long`` against ``summary_length`` words,
+    ``refusal``, ``truncated`` (by the API's finish reason or an unclosed
+    math or code block) and ``not_technical`` (neither equations nor
+    method terms).
+    """
+    failures = []
+    words = len(text.split())
+    if words < max(MIN_WORDS, MIN_LENGTH_RATIO * summary_length):
+        failures.append("too_short")
+    elif words > MAX_LENGTH_RATIO * summary_length:
+        failures.append("too_long")
+
+    if REFUSAL_PATTERN.search(text[:500]):
+        failures.append("refusal")
+
+    if (
+        finish_reason in TRUNCATED_FINISH_REASONS
+        or text.count("$$") % 2
+        or text.count("```") % 2
+    ):
+        failures.append("truncated")
+
+    if not EQUATION_PATTERN.search(text) and not METHOD_PATTERN.search(text):
+        failures.append("not_technical")
+
+    return failures
@@ -0,0 +1,274 @@
+"""Spread LLM requests across providers and models."""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from .tracing import percentile
+
+
+PROVIDERS = ["openai", "anthropic"]
+
+
+class Route:
+    """One provider/model pair requests can be sent to.
+
+    ``weight`` sets its share of traffic and ``quota``, if given, the
+    number of requests it may serve per run; its share shrinks as the
+    quota is used up.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        weight: float = 1.0,
+        quota: Optional[int] = None,
+    ):
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unsupported model provider: {provider}")
+        self.provider = provider
+        self.model = model
+        self.weight = float(weight)
+        self.quota = quota
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.latencies = deque(maxlen=200)
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.quota is None:
+            return None
+        return max(0, self.quota - self.requests)
+
+    def effective_weight(self) -> float:
+        if self.quota:
+            return self.weight * self.remaining / self.quota
+        return self.weight
+
+    def to_dict(self) -> Dict:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "weight": self.weight,
+            "quota": self.quota,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "p95_s": percentile(list(self.latencies), 95),
+        }
+
+
+class Router:
+    """Choose routes by weight and quota, with failover and hedging.
+
+    :meth:`order` returns the routes to try for one request: healthy
+    routes in a weighted random order, then routes cooling down after
+    failures, soonest first. Routes out of quota are left out. Each
+    failure puts a route into an exponentially growing cooldown (longer
+    when throttled) that a success resets.
+
+    With ``hedge`` set, :meth:`hedge_delay` gives how long to wait for a
+    request before sending a duplicate: the route's observed p95 latency
+    once ``hedge_min_samples`` calls have finished, else
+    ``hedge_after_s`` (None disables hedging until then).
+    """
+
+    BASE_COOLDOWN_S = 1.0
+    MAX_COOLDOWN_S = 120.0
+
+    def __init__(
+        self,
+        routes: List[Route],
+        hedge: bool = False,
+        hedge_after_s: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        seed: Optional[int] = None,
+    ):
+        if not routes:
+            raise ValueError("Router needs at least one route")
+        self.routes = routes
+        self.hedge = hedge
+        self.hedge_after_s = hedge_after_s
+        self.hedge_min_samples = hedge_min_samples
+        self.hedges = 0
+        self.hedge_wins = 0
+        # Runs using the router, which may be shared by service workers
+        self._runs = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["Router"]:
+        """Build a router from the ``routes`` config key, if any.
+
+        Each route is a dict with ``provider``, ``model`` and optional
+        ``weight`` and ``quota``.
+        """
+        specs = config.get("routes") or []
+        if not specs:
+            return None
+        routes = [
+            Route(
+                spec["provider"],
+                spec.get("model") or config.get(f"{spec['provider']}_model"),
+                spec.get("weight", 1.0),
+                spec.get("quota"),
+            )
+            for spec in specs
+        ]
+        return cls(
+            routes,
+            hedge=config.get("hedge", False),
+            hedge_after_s=config.get("hedge_after_s"),
+            hedge_min_samples=config.get("hedge_min_samples", 20),
+        )
+
+    @property
+    def providers(self) -> List[str]:
+        return sorted({route.provider for route in self.routes})
+
+    def order(self) -> List[Route]:
+        now = time.monotonic()
+        with self._lock:
+            usable = [r for r in self.routes if r.remaining != 0]
+            healthy = [
+                r
+                for r in usable
+                if r.cooldown_until <= now and r.effective_weight() > 0
+            ]
+            cooling = sorted(
+                (r for r in usable if r not in healthy),
+                key=lambda r: r.cooldown_until,
+            )
+            # Weighted sampling without replacement (Efraimidis-Spirakis)
+            keyed = [
+                (self._random.random() ** (1.0 / r.effective_weight()), r)
+                for r in healthy
+            ]
+        keyed.sort(key=lambda item: item[0], reverse=True)
+        return [r for _, r in keyed] + cooling
+
+    def reset(self) -> None:
+        """Restore every route's quota for a new run."""
+        with self._lock:
+            for route in self.routes:
+                route.requests = 0
+
+    def start_run(self) -> None:
+        """Begin a run, restoring quotas unless another run is under way.
+
+        Processors forked for service workers share one router; a job
+        starting must not hand fresh quotas to the jobs already running.
+        """
+        with self._lock:
+            if not self._runs:
+                for route in self.routes:
+                    route.requests = 0
+            self._runs += 1
+
+    def finish_run(self) -> None:
+        with self._lock:
+            self._runs = max(0, self._runs - 1)
+
+    def hedge_route(self, primary: Route) -> Route:
+        """The route for a hedged duplicate: another healthy one if any."""
+        for route in self.order():
+            if route is not primary:
+                return route
+        return primary
+
+    def hedge_delay(self, route: Route) -> Optional[float]:
+        if not self.hedge:
+            return None
+        with self._lock:
+            latencies = list(route.latencies)
+        if len(latencies) >= self.hedge_min_samples:
+            return percentile(latencies, 95)
+        return self.hedge_after_s
+
+    def record_start(self, route: Route) -> None:
+        with self._lock:
+            route.requests += 1
+
+    def record_success(self, route: Route, latency: float) -> None:
+        with self._lock:
+            route.latencies.append(latency)
+            route.consecutive_failures = 0
+            route.cooldown_until = 0.0
+
+    def record_failure(self, route: Route, error: Exception) -> None:
+        throttled = is_throttled(error)
+        with self._lock:
+            route.errors += 1
+            route.throttled += throttled
+            route.consecutive_failures += 1
+            cooldown = self.BASE_COOLDOWN_S * 2 ** (
+                route.consecutive_failures - 1
+            )
+            if throttled:
+                cooldown *= 4
+            route.cooldown_until = time.monotonic() + min(
+                cooldown, self.MAX_COOLDOWN_S
+            )
+
+    def record_hedge(self, won: bool) -> None:
+        with self._lock:
+            self.hedges += 1
+            self.hedge_wins += won
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "routes": [route.to_dict() for route in self.routes],
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+            }
+
+
+def is_throttled(error: Exception) -> bool:
+    """Whether ``error`` is a rate-limit or overload response."""
+    status = getattr(error, "status_code", None)
+    return status in (429, 529) or "RateLimit" in type(error).__name__
+
+
+def parse_route(spec: str) -> Dict:
+    """Parse ``provider:model[:weight[:quota]]`` from the command line.
+
+    Trailing numeric fields are the weight and quota, so model names that
+    contain colons (fine-tuned OpenAI models) still parse.
+    """
+    provider, _, rest = spec.partition(":")
+    fields = rest.split(":")
+    numbers = []
+    while len(fields) > 1 and len(numbers) < 2 and _is_number(fields[-1]):
+        numbers.insert(0, fields.pop())
+    model = ":".join(fields)
+    if not provider or not model:
+        raise ValueError(
+            f"Route must look like provider:model[:weight[:quota]]: {spec}"
+        )
+
+    route = {"provider": provider, "model": model}
+    if numbers:
+        route["weight"] = float(numbers[0])
+    if len(numbers) > 1:
+        route["quota"] = int(float(numbers[1]))
+    return route
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,383 @@
+"""Local HTTP service: a persistent job queue and a warm worker pool."""
+
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .core import WinnowerProcessor
+from .parsers import PAPER_EXTENSIONS
+
+
+JOB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    input TEXT NOT NULL,
+    status TEXT NOT NULL,
+    title TEXT,
+    error TEXT,
+    summary_path TEXT,
+    result TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, seq);
+"""
+
+JOB_STATUSES = ["queued", "running", "done", "failed"]
+
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+
+
+class JobQueue:
+    """Jobs and their results in a SQLite file, oldest first.
+
+    Jobs survive restarts: anything still ``running`` when the service
+    stopped is put back in the queue by :meth:`requeue_running`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, timeout=30
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(JOB_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def submit(self, input_source: str, job_id: Optional[str] = None) -> Dict:
+        job_id = job_id or uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, input, status, created_at)"
+                " VALUES (?, ?, 'queued', ?)",
+                (job_id, input_source, _now()),
+            )
+        return self.get(job_id)
+
+    def claim(self) -> Optional[Dict]:
+        """Mark the oldest queued job as running and return it."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued'"
+                " ORDER BY seq LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?"
+                " WHERE id = ?",
+                (_now(), row["id"]),
+            )
+        return self.get(row["id"])
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        papers: List[Dict],
+        error: Optional[str] = None,
+    ) -> None:
+        """Record a job's outcome and its per-paper run report entries."""
+        summaries = [p.get("summary") or p.get("reused_summary") for p in papers]
+        summary = next((path for path in summaries if path), None)
+        title = next((p["title"] for p in papers if p.get("title")), None)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, title = ?, error = ?,"
+                " summary_path = ?, result = ?, finished_at = ?"
+                " WHERE id = ?",
+                (
+                    status,
+                    title,
+                    error,
+                    summary,
+                    json.dumps(papers, default=str),
+                    _now(),
+                    job_id,
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _job(row) if row else None
+
+    def list(self, limit: int = 50) -> List[Dict]:
+        """The most recent jobs, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs ORDER BY seq DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [_job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
+
+    def requeue_running(self) -> int:
+        """Put jobs interrupted by a shutdown back in the queue."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL"
+                " WHERE status = 'running'"
+            )
+        return cursor.rowcount
+
+
+class WinnowerService:
+    """Summarize papers on demand over a small local HTTP API.
+
+    ``workers`` warm :class:`WinnowerProcessor` instances take jobs from
+    the persistent :class:`JobQueue` (``jobs.db`` in ``output_dir``).
+    They share API clients and their connection pools, routing state and
+    metrics, so requests cost no startup time. Endpoints:
+
+    - ``POST /jobs`` with ``{"input": "<path, URL or arXiv ID>"}``, or
+      a paper file as the request body (``?filename=paper.pdf``)
+    - ``GET /jobs/<id>`` for a job's status and run report entries
+    - ``GET /jobs/<id>/summary`` for the summary once it is done
+    - ``GET /jobs`` and ``GET /health``
+
+    Inputs may be any local path readable by the service, so bind it to
+    localhost only.
+    """
+
+    def __init__(
+        self,
+        config: Dict,
+        output_dir: Path,
+        model_provider: str = "openai",
+        verbose: bool = False,
+        workers: int = 2,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        poll_interval_s: float = 1.0,
+    ):
+        self.output_dir = Path(output_dir)
+        self.uploads_dir = self.output_dir / "uploads"
+        self.poll_interval_s = poll_interval_s
+        self.queue = JobQueue(self.output_dir / "jobs.db")
+
+        # Each job gets its report in the queue instead of run_report.json,
+        # and papers within a job run one at a time.
+        config = dict(config, run_report=False, workers=1)
+        primary = WinnowerProcessor(config, model_provider, verbose)
+        self.processors = [primary] + [
+            primary.fork() for _ in range(max(1, workers) - 1)
+        ]
+        # One dataset file per worker for the life of the service, not
+        # one per job
+        for processor in self.processors:
+            processor.keep_sink = True
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def start(self) -> "WinnowerService":
+        requeued = self.queue.requeue_running()
+        if requeued:
+            print(f"Requeued {requeued} interrupted job(s)")
+        self._threads = [
+            threading.Thread(
+                target=self._work,
+                args=(processor,),
+                name=f"winnower-worker-{i}",
+                daemon=True,
+            )
+            for i, processor in enumerate(self.processors)
+        ]
+        self._threads.append(
+            threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        )
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop accepting requests and wait for running jobs to finish."""
+        self._stop.set()
+        self._wake.set()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        for thread in self._threads:
+            thread.join()
+        for processor in self.processors:
+            processor.close()
+        self.queue.close()
+
+    def submit(self, input_source: str) -> Dict:
+        job = self.queue.submit(input_source)
+        self._wake.set()
+        return job
+
+    def submit_upload(self, filename: str, data: bytes) -> Dict:
+        """Save an uploaded paper and queue it."""
+        name = Path(filename).name
+        if not name.lower().endswith(PAPER_EXTENSIONS):
+            raise ValueError(
+                f"Uploads must be one of {', '.join(PAPER_EXTENSIONS)}"
+            )
+        name = re.sub(r"[^\w.\-]+", "_", name).lstrip(".")
+        job_id = uuid.uuid4().hex
+        path = self.uploads_dir / job_id / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        job = self.queue.submit(str(path), job_id=job_id)
+        self._wake.set()
+        return job
+
+    def _work(self, processor: WinnowerProcessor) -> None:
+        while not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self._wake.wait(self.poll_interval_s)
+                self._wake.clear()
+                continue
+            self._run_job(processor, job)
+
+    def _run_job(self, processor: WinnowerProcessor, job: Dict) -> None:
+        try:
+            processor.process(job["input"], self.output_dir)
+        except Exception as e:
+            self.queue.finish(job["id"], "failed", [], error=str(e))
+            return
+
+        papers = processor.tracer.report()["papers"]
+        failed = [p for p in papers if p.get("status") == "failed"]
+        if not papers:
+            self.queue.finish(job["id"], "failed", [], "No papers found")
+        elif len(failed) == len(papers):
+            self.queue.finish(
+                job["id"], "failed", papers, failed[0].get("error")
+            )
+        else:
+            self.queue.finish(job["id"], "done", papers)
+
+    def _make_handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                parts = urlparse(self.path).path.strip("/").split("/")
+                if parts == ["health"]:
+                    self._json(
+                        200,
+                        {
+                            "status": "ok",
+                            "workers": len(service.processors),
+                            "jobs": service.queue.counts(),
+                        },
+                    )
+                elif parts == ["jobs"]:
+                    self._json(200, {"jobs": service.queue.list()})
+                elif len(parts) == 2 and parts[0] == "jobs":
+                    job = service.queue.get(parts[1])
+                    if job is None:
+                        self._json(404, {"error": "No such job"})
+                    else:
+                        self._json(200, job)
+                elif len(parts) == 3 and parts[::2] == ["jobs", "summary"]:
+                    self._summary(parts[1])
+                else:
+                    self._json(404, {"error": "Not found"})
+
+            def do_POST(self):
+                if urlparse(self.path).path.rstrip("/") != "/jobs":
+                    self._json(404, {"error": "Not found"})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_UPLOAD_BYTES:
+                    self._json(413, {"error": "Upload too large"})
+                    return
+                body = self.rfile.read(length)
+
+                content_type = self.headers.get("Content-Type", "")
+                try:
+                    if content_type.startswith("application/json"):
+                        payload = json.loads(body or b"{}")
+                        source = None
+                        if isinstance(payload, dict):
+                            source = payload.get("input")
+                        if not source:
+                            raise ValueError('Expected {"input": ...}')
+                        job = service.submit(str(source))
+                    else:
+                        query = parse_qs(urlparse(self.path).query)
+                        filename = (query.get("filename") or [""])[0]
+                        if not body or not filename:
+                            raise ValueError(
+                                "Upload a paper as the body with ?filename="
+                            )
+                        job = service.submit_upload(filename, body)
+                except ValueError as e:
+                    self._json(400, {"error": str(e)})
+                    return
+                self._json(202, job)
+
+            def _summary(self, job_id: str):
+                job = service.queue.get(job_id)
+                if job is None:
+                    self._json(404, {"error": "No such job"})
+                elif job["status"] != "done":
+                    self._json(409, {"error": f"Job is {job['status']}"})
+                elif not job["summary_path"]:
+                    self._json(404, {"error": "Job wrote no summary file"})
+                else:
+                    body = Path(job["summary_path"]).read_bytes()
+                    self._send(200, body, "text/markdown; charset=utf-8")
+
+            def _json(self, status: int, payload: Dict):
+                body = json.dumps(payload, default=str).encode("utf-8")
+                self._send(status, body, "application/json")
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def _job(row: sqlite3.Row) -> Dict:
+    job = dict(row)
+    job.pop("seq", None)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
@@ -0,0 +1,73 @@
+"""Coalesce concurrent requests for the same paper into one computation."""
+
+import hashlib
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+from .dedup import file_hash, parse_arxiv_id
+
+
+class SingleFlight:
+    """Run one call per key at a time and share its outcome.
+
+    A caller asking for a key that is already being computed waits for
+    that computation and receives its result (or exception) instead of
+    starting another. Nothing is kept once the call finishes. ``hits``
+    counts callers that joined a call in flight and ``misses`` calls that
+    ran, so it can be watched like a cache.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``func()``'s result and whether it came from another call."""
+        with self._lock:
+            in_flight = self._calls.get(key)
+            if in_flight is not None:
+                self.hits += 1
+            else:
+                future = Future()
+                self._calls[key] = future
+                self.misses += 1
+        if in_flight is not None:
+            return in_flight.result(), True
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return result, False
+
+
+def source_key(source: str) -> str:
+    """Identity of the paper behind ``source`` for coalescing.
+
+    Local files are identified by content hash, so different paths to the
+    same bytes coalesce; arXiv IDs, URLs and file names by their ID and
+    version; other URLs by themselves.
+    """
+    path = Path(source)
+    if path.is_file():
+        return f"sha256:{file_hash(path)}"
+    parsed = parse_arxiv_id(source)
+    if parsed:
+        return f"arxiv:{parsed[0]}:{parsed[1]}"
+    return f"source:{source}"
+
+
+def content_key(title: str, content: str) -> str:
+    """Identity of an extraction request for coalescing."""
+    digest = hashlib.sha256(f"{title}\0{content}".encode("utf-8"))
+    return f"extract:{digest.hexdigest()}"
@@ -0,0 +1,211 @@
+"""Consolidated dataset output: one record per paper in JSONL or Parquet."""
+
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pyarrow = None
+
+
+OUTPUT_FORMATS = ["markdown", "jsonl", "parquet"]
+
+
+def build_record(
+    paper_data: Dict,
+    technical_data: Dict,
+    status: str = "ok",
+    timings: Optional[Dict[str, float]] = None,
+    profile: Optional[str] = None,
+) -> Dict:
+    """The dataset record for one processed paper.
+
+    Multi-profile runs write one record per paper and ``profile``.
+    """
+    return {
+        "source": paper_data.get("source", ""),
+        "title": paper_data.get("title", ""),
+        "authors": list(paper_data.get("authors") or []),
+        "url": paper_data.get("url") or "",
+        "abstract": paper_data.get("abstract") or "",
+        "extracted": paper_data.get("content", ""),
+        "summary": technical_data.get("technical_content", ""),
+        "summaries": {
+            str(length): summary
+            for length, summary in (
+                technical_data.get("summaries") or {}
+            ).items()
+        },
+        "status": status,
+        "error": technical_data.get("error"),
+        "usage": technical_data.get("usage") or {},
+        "tier": technical_data.get("tier"),
+        "profile": profile,
+        "timings": dict(timings or {}),
+        "processed_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+class RecordSink:
+    """Buffer records in memory and write them out in batches.
+
+    ``write`` may be called from several worker threads; records are
+    appended under a lock and flushed every ``batch_size`` records and on
+    :meth:`close`. ``written`` counts records that reached the file.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 100):
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        self.written = 0
+        self._buffer: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict) -> None:
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        self.flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        self._write_batch(self._buffer)
+        self.written += len(self._buffer)
+        self._buffer = []
+
+    def _write_batch(self, records: List[Dict]) -> None:
+        raise NotImplementedError
+
+
+class JSONLSink(RecordSink):
+    """Append records as JSON lines to a single file.
+
+    Each batch is appended through an ``O_APPEND`` descriptor under an
+    exclusive ``flock``, so batches from several sinks on the same file
+    (service workers, concurrent runs) never interleave.
+    """
+
+    def _write_batch(self, records: List[Dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        ).encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            # Closing the descriptor releases the lock
+            os.close(fd)
+
+
+class ParquetSink(RecordSink):
+    """Write records as row groups of one Parquet file per run.
+
+    Parquet files cannot be appended to once closed, so each run, or
+    each service or watch session, writes its own
+    ``papers-<timestamp>-<id>.parquet`` next to earlier ones; read them
+    together as a dataset. A file is only readable once its sink is
+    closed. ``summaries``, ``usage`` and ``timings`` are
+    stored as JSON strings so the schema stays fixed across papers and
+    providers.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 100):
+        if not PYARROW_AVAILABLE:
+            raise ImportError(
+                "Parquet output requires pyarrow: pip install 'winnower[parquet]'"
+            )
+        super().__init__(path, batch_size)
+        self.schema = pyarrow.schema(
+            [
+                ("source", pyarrow.string()),
+                ("title", pyarrow.string()),
+                ("authors", pyarrow.list_(pyarrow.string())),
+                ("url", pyarrow.string()),
+                ("abstract", pyarrow.string()),
+                ("extracted", pyarrow.string()),
+                ("summary", pyarrow.string()),
+                ("summaries", pyarrow.string()),
+                ("status", pyarrow.string()),
+                ("error", pyarrow.string()),
+                ("usage", pyarrow.string()),
+                ("tier", pyarrow.string()),
+                ("profile", pyarrow.string()),
+                ("timings", pyarrow.string()),
+                ("processed_at", pyarrow.string()),
+            ]
+        )
+        self._writer = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _write_batch(self, records: List[Dict]) -> None:
+        rows = [
+            dict(
+                record,
+                summaries=json.dumps(record["summaries"]),
+                usage=json.dumps(record["usage"]),
+                timings=json.dumps(record["timings"]),
+            )
+            for record in records
+        ]
+        table = pyarrow.Table.from_pylist(rows, schema=self.schema)
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pyarrow.parquet.ParquetWriter(
+                str(self.path), self.schema
+            )
+        self._writer.write_table(table)
+
+
+def open_sink(config: Dict, output_dir: Path) -> Optional[RecordSink]:
+    """Create the dataset sink for ``output_format``, or None for markdown."""
+    output_format = config.get("output_format", "markdown")
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format {output_format!r}; "
+            f"expected one of {', '.join(OUTPUT_FORMATS)}"
+        )
+    batch_size = int(config.get("output_batch_size", 100))
+
+    if output_format == "jsonl":
+        return JSONLSink(output_dir / "papers.jsonl", batch_size)
+    if output_format == "parquet":
+        # Runs started in the same second must not share a file
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        name = f"papers-{stamp}-{uuid.uuid4().hex[:8]}.parquet"
+        return ParquetSink(output_dir / name, batch_size)
+    return None
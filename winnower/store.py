@@ -0,0 +1,292 @@
+"""SQLite corpus store with full-text search over processed papers."""
+
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+ARXIV_ID = re.compile(r"^\d{4}\.\d{4,5}(v\d+)?$")
+ARXIV_URL = re.compile(r"arxiv\.org/(?:abs|pdf)/(\d{4}\.\d{4,5})")
+
+
+def source_key(source: str) -> str:
+    """The source a paper given as ``source`` is stored under.
+
+    The parser records arXiv papers as ``arXiv:<id>``, whether they were
+    given as a bare ID or as an arxiv.org URL; other sources are kept.
+    """
+    if ARXIV_ID.match(source):
+        return f"arXiv:{source}"
+    if "://" in source and "arxiv.org" in source:
+        match = ARXIV_URL.search(source)
+        if match:
+            return f"arXiv:{match.group(1)}"
+    return source
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    input TEXT,
+    model_provider TEXT,
+    config TEXT,
+    usage TEXT
+);
+CREATE TABLE IF NOT EXISTS papers (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    title TEXT,
+    authors TEXT,
+    url TEXT,
+    abstract TEXT,
+    status TEXT,
+    error TEXT,
+    usage TEXT,
+    timings TEXT,
+    summary_path TEXT,
+    run_id INTEGER REFERENCES runs(id),
+    processed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    paper_id INTEGER NOT NULL REFERENCES papers(id) ON DELETE CASCADE,
+    reason TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS paper_text USING fts5(
+    title, abstract, summary, extracted, tokenize = 'porter unicode61'
+);
+"""
+
+# bm25() column weights for title, abstract, summary and extracted text:
+# a hit in the title or summary says more than one deep in the body.
+RANK_WEIGHTS = (10.0, 5.0, 4.0, 1.0)
+
+
+class CorpusStore:
+    """Papers, their sources, text and run metadata in one SQLite file.
+
+    ``paper_text`` is an FTS5 index over titles, abstracts, summaries
+    and extracted text, so :meth:`search` answers ranked queries without
+    reading the output files. One connection is shared by all worker
+    threads and serialized with a lock; WAL mode lets ``winnower search``
+    read while a run is writing.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, timeout=30
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        try:
+            self._conn.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            self._conn.close()
+            raise RuntimeError(
+                f"SQLite in this Python build lacks FTS5 support: {e}"
+            ) from e
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def begin_run(
+        self, input_source: str, model_provider: str, config: Dict
+    ) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, input, model_provider, config)"
+                " VALUES (?, ?, ?, ?)",
+                (_now(), input_source, model_provider, _json(config)),
+            )
+            return cursor.lastrowid
+
+    def finish_run(self, run_id: int, usage: Optional[Dict] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, usage = ? WHERE id = ?",
+                (_now(), _json(usage or {}), run_id),
+            )
+
+    def add_paper(
+        self,
+        paper_data: Dict,
+        technical_data: Dict,
+        run_id: Optional[int] = None,
+        status: str = "ok",
+        timings: Optional[Dict] = None,
+        summary_path: Optional[str] = None,
+        aliases: Optional[List[Dict]] = None,
+    ) -> int:
+        """Insert or replace a paper, its text and its source aliases.
+
+        ``aliases`` lists other sources (``{"source", "reason"}``) that
+        resolve to this paper, such as skipped duplicates.
+        """
+        source = paper_data.get("source", "")
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO papers (
+                    source, title, authors, url, abstract, status, error,
+                    usage, timings, summary_path, run_id, processed_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(source) DO UPDATE SET
+                    title = excluded.title,
+                    authors = excluded.authors,
+                    url = excluded.url,
+                    abstract = excluded.abstract,
+                    status = excluded.status,
+                    error = excluded.error,
+                    usage = excluded.usage,
+                    timings = excluded.timings,
+                    summary_path = excluded.summary_path,
+                    run_id = excluded.run_id,
+                    processed_at = excluded.processed_at
+                """,
+                (
+                    source,
+                    paper_data.get("title", ""),
+                    _json(paper_data.get("authors") or []),
+                    paper_data.get("url") or "",
+                    paper_data.get("abstract") or "",
+                    status,
+                    technical_data.get("error"),
+                    _json(technical_data.get("usage") or {}),
+                    _json(timings or {}),
+                    summary_path,
+                    run_id,
+                    _now(),
+                ),
+            )
+            paper_id = self._conn.execute(
+                "SELECT id FROM papers WHERE source = ?", (source,)
+            ).fetchone()[0]
+
+            self._conn.execute(
+                "DELETE FROM paper_text WHERE rowid = ?", (paper_id,)
+            )
+            self._conn.execute(
+                "INSERT INTO paper_text "
+                "(rowid, title, abstract, summary, extracted)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    paper_id,
+                    paper_data.get("title", ""),
+                    paper_data.get("abstract") or "",
+                    technical_data.get("technical_content", ""),
+                    paper_data.get("content", ""),
+                ),
+            )
+
+            sources = [{"source": source, "reason": None}] + list(aliases or [])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sources (source, paper_id, reason)"
+                " VALUES (?, ?, ?)",
+                [
+                    (source_key(s["source"]), paper_id, s.get("reason"))
+                    for s in sources
+                ],
+            )
+        return paper_id
+
+    def add_aliases(self, source: str, aliases: List[Dict]) -> None:
+        """Record ``aliases`` for the paper from ``source``, if stored.
+
+        Both are matched as :func:`source_key` records them, so an arXiv
+        ID or URL finds the paper stored as ``arXiv:<id>``.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM papers WHERE source = ?",
+                (source_key(source),),
+            ).fetchone()
+            if row is None:
+                return
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sources (source, paper_id, reason)"
+                " VALUES (?, ?, ?)",
+                [
+                    (source_key(a["source"]), row[0], a.get("reason"))
+                    for a in aliases
+                ],
+            )
+
+    def relocate(self, old_prefix: str, new_prefix: str) -> None:
+        """Point summary paths under ``old_prefix`` to ``new_prefix``."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE papers SET summary_path = ? || substr(summary_path, ?)"
+                " WHERE substr(summary_path, 1, ?) = ?",
+                (
+                    new_prefix,
+                    len(old_prefix) + 1,
+                    len(old_prefix),
+                    old_prefix,
+                ),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()
+        return row[0]
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Best-ranked papers matching ``query``, best first.
+
+        ``query`` may use FTS5 syntax (``"exact phrase"``, ``OR``,
+        ``title:transformer``, ``prefix*``); if it does not parse, its
+        words are searched for as plain terms instead.
+        """
+        try:
+            return self._search(query, limit)
+        except sqlite3.OperationalError:
+            terms = ['"' + t.replace('"', '""') + '"' for t in query.split()]
+            if not terms:
+                return []
+            return self._search(" ".join(terms), limit)
+
+    def _search(self, match: str, limit: int) -> List[Dict]:
+        weights = ", ".join(str(w) for w in RANK_WEIGHTS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT papers.id, papers.source, papers.title,
+                       papers.summary_path, papers.status,
+                       bm25(paper_text, {weights}) AS score,
+                       snippet(paper_text, -1, '[', ']', '...', 16) AS snippet
+                FROM paper_text
+                JOIN papers ON papers.id = paper_text.rowid
+                WHERE paper_text MATCH ?
+                ORDER BY score
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def default_store_path(config: Dict, output_dir: Path) -> Path:
+    """Where the store lives: ``store_path`` or ``output_dir/winnower.db``."""
+    if config.get("store_path"):
+        return Path(config["store_path"]).expanduser()
+    return Path(output_dir) / "winnower.db"
+
+
+def _json(value) -> str:
+    return json.dumps(value, default=str)
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
@@ -0,0 +1,253 @@
+"""Span-style timing instrumentation for the processing pipeline."""
+
+import importlib
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Pipeline stages, in the order a paper passes through them.
+STAGES = ["fetch", "convert", "preprocess", "extract", "format", "write"]
+
+
+class Span:
+    """A timed section of work, optionally attributed to one paper."""
+
+    def __init__(self, name: str, paper: Optional[str] = None, **attributes):
+        self.name = name
+        self.paper = paper
+        self.attributes = attributes
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start = time.time()
+        self.duration = 0.0
+        self.cpu = 0.0
+        # Paper spans collect the total duration of each stage within them
+        self.stages: Dict[str, float] = {}
+
+    def to_dict(self) -> Dict:
+        data = {
+            "name": self.name,
+            "paper": self.paper,
+            "start": self.start,
+            "duration_s": self.duration,
+            "cpu_s": self.cpu,
+            "status": self.status,
+        }
+        if self.error:
+            data["error"] = self.error
+        if self.attributes:
+            data["attributes"] = self.attributes
+        return data
+
+
+class Tracer:
+    """Record spans and forward them to pluggable hooks.
+
+    A hook is any callable taking a finished :class:`Span`; use it to
+    forward spans to an external tracing system. Spans opened inside
+    :meth:`paper` are attributed to that paper (per thread).
+    """
+
+    def __init__(self, hooks: Optional[List[Callable[[Span], None]]] = None):
+        self.hooks = list(hooks or [])
+        self.spans: List[Span] = []
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "Tracer":
+        """Build a tracer with hooks named as ``"module:function"``."""
+        return cls([load_hook(spec) for spec in config.get("trace_hooks") or []])
+
+    def add_hook(self, hook: Callable[[Span], None]) -> None:
+        self.hooks.append(hook)
+
+    def reset(self) -> None:
+        """Drop recorded spans and restart the run clock."""
+        with self._lock:
+            self.spans = []
+            self.started_at = time.time()
+
+    @property
+    def current_paper(self) -> Optional[str]:
+        return getattr(self._local, "paper", None)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Time the enclosed block as a span called ``name``."""
+        span = Span(name, self.current_paper, **attributes)
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = str(e)
+            raise
+        finally:
+            span.duration = time.perf_counter() - wall
+            span.cpu = time.thread_time() - cpu
+            self._finish(span)
+
+    @contextmanager
+    def paper(self, source: str) -> Iterator[Span]:
+        """Attribute spans opened in this block to ``source``."""
+        previous = self.current_paper
+        previous_span = getattr(self._local, "paper_span", None)
+        self._local.paper = source
+        try:
+            with self.span("paper") as span:
+                self._local.paper_span = span
+                peak_before = peak_rss_mb()
+                try:
+                    yield span
+                finally:
+                    peak = peak_rss_mb()
+                    if peak is not None:
+                        span.attributes["peak_rss_mb"] = round(peak, 1)
+                        span.attributes["peak_rss_growth_mb"] = round(
+                            peak - peak_before, 1
+                        )
+        finally:
+            self._local.paper = previous
+            self._local.paper_span = previous_span
+
+    @contextmanager
+    def attach(self, paper_span: Span) -> Iterator[Span]:
+        """Attribute spans opened in this thread to ``paper_span``.
+
+        For work a paper hands off to another thread.
+        """
+        previous = self.current_paper
+        previous_span = getattr(self._local, "paper_span", None)
+        self._local.paper = paper_span.paper
+        self._local.paper_span = paper_span
+        try:
+            yield paper_span
+        finally:
+            self._local.paper = previous
+            self._local.paper_span = previous_span
+
+    def _finish(self, span: Span) -> None:
+        paper_span = getattr(self._local, "paper_span", None)
+        if paper_span is not None and span is not paper_span:
+            paper_span.stages[span.name] = (
+                paper_span.stages.get(span.name, 0.0) + span.duration
+            )
+        with self._lock:
+            self.spans.append(span)
+        for hook in self.hooks:
+            try:
+                hook(span)
+            except Exception as e:
+                print(f"Warning: trace hook failed: {e}")
+
+    def report(self) -> Dict:
+        """Summarize recorded spans per paper and per stage."""
+        with self._lock:
+            spans = list(self.spans)
+
+        papers: Dict[str, Dict] = {}
+        for span in spans:
+            if span.paper is None:
+                continue
+            entry = papers.setdefault(
+                span.paper, {"source": span.paper, "stages": {}}
+            )
+            if span.name == "paper":
+                entry["status"] = span.status
+                entry["duration_s"] = span.duration
+                if span.error:
+                    entry["error"] = span.error
+                entry.update(span.attributes)
+                continue
+            stage = entry["stages"].setdefault(
+                span.name, {"duration_s": 0.0, "cpu_s": 0.0}
+            )
+            stage["duration_s"] += span.duration
+            stage["cpu_s"] += span.cpu
+
+        by_stage: Dict[str, List[Span]] = {}
+        for span in spans:
+            by_stage.setdefault(span.name, []).append(span)
+
+        stages = {}
+        for name in sorted(by_stage, key=_stage_order):
+            durations = [span.duration for span in by_stage[name]]
+            stages[name] = {
+                "count": len(durations),
+                "total_s": sum(durations),
+                "mean_s": sum(durations) / len(durations),
+                "p50_s": percentile(durations, 50),
+                "p95_s": percentile(durations, 95),
+                "max_s": max(durations),
+                "cpu_s": sum(span.cpu for span in by_stage[name]),
+            }
+
+        finished_at = time.time()
+        return {
+            "started_at": _isoformat(self.started_at),
+            "finished_at": _isoformat(finished_at),
+            "wall_s": finished_at - self.started_at,
+            "peak_rss_mb": peak_rss_mb(),
+            "papers": list(papers.values()),
+            "stages": stages,
+        }
+
+    def write_report(self, path: Path, extra: Optional[Dict] = None) -> Dict:
+        """Write :meth:`report` (plus ``extra`` sections) as JSON."""
+        report = self.report()
+        if extra:
+            report.update(extra)
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        return report
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = round(pct / 100 * (len(ordered) - 1))
+    return ordered[min(len(ordered) - 1, int(index))]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """The process's peak resident set size so far, in MB.
+
+    This is a high-water mark shared by all threads, so per paper it says
+    how high memory had risen by the time the paper finished, and the
+    growth how much that paper raised it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def load_hook(spec: str) -> Callable[[Span], None]:
+    """Import a hook given as ``"package.module:function"``."""
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(f"Trace hook must look like 'module:function': {spec}")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _stage_order(name: str):
+    return (STAGES.index(name) if name in STAGES else len(STAGES), name)
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat(timespec="seconds")
@@ -0,0 +1,158 @@
+"""Token usage, throughput and cost accounting."""
+
+import threading
+from typing import Any, Dict, Optional
+
+
+# Approximate list prices in USD per million tokens:
+# (input, cached input, output). Override or extend with the
+# ``model_pricing`` config key, e.g. {"my-model": [1.0, 0.25, 4.0]}.
+MODEL_PRICING = {
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4-turbo": (10.00, 10.00, 30.00),
+    "gpt-4": (30.00, 30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+    "claude-3-haiku": (0.25, 0.03, 1.25),
+    "claude-3-5-haiku": (0.80, 0.08, 4.00),
+    "claude-3-sonnet": (3.00, 0.30, 15.00),
+    "claude-3-5-sonnet": (3.00, 0.30, 15.00),
+    "claude-3-7-sonnet": (3.00, 0.30, 15.00),
+    "claude-3-opus": (15.00, 1.50, 75.00),
+}
+
+
+def lookup_pricing(model: str, overrides: Optional[Dict] = None):
+    """Return (input, cached, output) prices for ``model``, or None.
+
+    Exact names win; otherwise the longest known prefix matches, so dated
+    snapshots such as ``gpt-4.1-mini-2025-04-14`` resolve to their family.
+    """
+    table = dict(MODEL_PRICING)
+    table.update({k: tuple(v) for k, v in (overrides or {}).items()})
+
+    if model in table:
+        return table[model]
+    matches = [name for name in table if model.startswith(name)]
+    if not matches:
+        return None
+    return table[max(matches, key=len)]
+
+
+def estimate_cost(
+    model: str, usage: Dict, overrides: Optional[Dict] = None
+) -> Optional[float]:
+    """Estimate the USD cost of one request, or None for unknown models."""
+    pricing = lookup_pricing(model, overrides)
+    if pricing is None:
+        return None
+
+    input_price, cached_price, output_price = pricing
+    cached = usage.get("cached_tokens", 0)
+    uncached = max(0, usage.get("input_tokens", 0) - cached)
+    return (
+        uncached * input_price
+        + cached * cached_price
+        + usage.get("output_tokens", 0) * output_price
+    ) / 1_000_000
+
+
+def openai_usage(response: Any) -> Dict[str, int]:
+    """Normalize the ``usage`` block of an OpenAI chat completion."""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "input_tokens": _as_int(getattr(usage, "prompt_tokens", 0)),
+        "output_tokens": _as_int(getattr(usage, "completion_tokens", 0)),
+        "cached_tokens": _as_int(getattr(details, "cached_tokens", 0)),
+    }
+
+
+def anthropic_usage(response: Any) -> Dict[str, int]:
+    """Normalize the ``usage`` block of an Anthropic message.
+
+    Anthropic reports cache reads and writes separately from
+    ``input_tokens``; they are folded in so ``input_tokens`` is always the
+    full prompt size, as with OpenAI.
+    """
+    usage = getattr(response, "usage", None)
+    cache_read = _as_int(getattr(usage, "cache_read_input_tokens", 0))
+    cache_write = _as_int(getattr(usage, "cache_creation_input_tokens", 0))
+    return {
+        "input_tokens": _as_int(getattr(usage, "input_tokens", 0))
+        + cache_read
+        + cache_write,
+        "output_tokens": _as_int(getattr(usage, "output_tokens", 0)),
+        "cached_tokens": cache_read,
+    }
+
+
+def _as_int(value: Any) -> int:
+    return value if isinstance(value, int) else 0
+
+
+class UsageTracker:
+    """Aggregate per-request usage records over a run."""
+
+    FIELDS = ["input_tokens", "output_tokens", "cached_tokens"]
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.records = []
+
+    def record(self, paper: str, usage: Optional[Dict]) -> None:
+        if usage:
+            with self._lock:
+                self.records.append(dict(usage, paper=paper))
+
+    def summary(self) -> Dict:
+        """Totals per model and for the whole run."""
+        with self._lock:
+            records = list(self.records)
+
+        models: Dict[str, Dict] = {}
+        for record in records:
+            key = f"{record.get('provider', '')}:{record.get('model', '')}"
+            totals = models.setdefault(key, self._empty())
+            self._add(totals, record)
+
+        overall = self._empty()
+        for record in records:
+            self._add(overall, record)
+        papers = len({record["paper"] for record in records})
+        overall["papers"] = papers
+        overall["cost_per_paper_usd"] = (
+            overall["cost_usd"] / papers if papers else 0.0
+        )
+
+        for totals in list(models.values()) + [overall]:
+            latency = totals["latency_s"]
+            totals["output_tokens_per_s"] = (
+                totals["output_tokens"] / latency if latency else 0.0
+            )
+
+        return {"models": models, "total": overall}
+
+    def _empty(self) -> Dict:
+        totals = {field: 0 for field in self.FIELDS}
+        totals.update(
+            {"requests": 0, "latency_s": 0.0, "cost_usd": 0.0, "unpriced": 0}
+        )
+        return totals
+
+    def _add(self, totals: Dict, record: Dict) -> None:
+        totals["requests"] += 1
+        for field in self.FIELDS:
+            totals[field] += record.get(field, 0)
+        totals["latency_s"] += record.get("latency_s", 0.0)
+        if record.get("cost_usd") is None:
+            totals["unpriced"] += 1
+        else:
+            totals["cost_usd"] += record["cost_usd"]
@@ -0,0 +1,267 @@
+"""Watch a directory and hand over papers as they arrive."""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    FileSystemEventHandler = object
+    Observer = None
+
+
+# (size, modification time in ns) identifying one version of a file
+Signature = Tuple[int, int]
+
+
+class _WakeHandler(FileSystemEventHandler):
+    """Note the changed paths below the watched directory and wake it."""
+
+    def __init__(self, watcher: "DirectoryWatcher"):
+        self.watcher = watcher
+
+    def on_any_event(self, event) -> None:
+        if event.is_directory:
+            # A directory moved in or out: only a rescan shows its papers
+            paths = None
+        else:
+            paths = [event.src_path, getattr(event, "dest_path", "")]
+        self.watcher.notify(paths)
+
+
+class DirectoryWatcher:
+    """Report new or modified papers once they have finished being written.
+
+    ``find_papers`` lists the candidate files (usually a directory walk
+    with the configured include/exclude patterns). A file is ready when
+    its size and modification time have not changed for ``debounce_s``,
+    so half-copied downloads are left alone until complete. A reported
+    file is remembered once it is passed to :meth:`commit` after being
+    processed, in ``state_file`` across restarts; a file passed to
+    :meth:`fail`, or never committed, is reported again (failed files
+    after ``retry_s``).
+
+    With watchdog installed, filesystem notifications (inotify, FSEvents,
+    ...) wake the watcher as soon as something changes and only the
+    notified files, checked with ``accepts``, are looked at; the whole
+    directory is still rescanned every ``poll_interval_s`` in case a
+    notification was missed. Without watchdog, or with ``notifications``
+    off, the directory is rescanned every ``poll_interval_s``.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        find_papers: Callable[[], Iterable[Path]],
+        debounce_s: float = 2.0,
+        poll_interval_s: float = 5.0,
+        state_file: Optional[Path] = None,
+        notifications: bool = True,
+        accepts: Optional[Callable[[Path], bool]] = None,
+        retry_s: float = 60.0,
+    ):
+        self.directory = Path(directory)
+        self.find_papers = find_papers
+        self.debounce_s = debounce_s
+        self.poll_interval_s = poll_interval_s
+        self.state_file = Path(state_file) if state_file else None
+        self.notifications = notifications and WATCHDOG_AVAILABLE
+        self.accepts = accepts
+        self.retry_s = retry_s
+        self._seen: Dict[str, Signature] = {}
+        self._pending: Dict[str, Tuple[Signature, float]] = {}
+        # Reported and not yet committed or failed
+        self._reported: Dict[str, Signature] = {}
+        self._retry_at: Dict[str, float] = {}
+        self._changed: Optional[Set[str]] = None
+        self._scanned_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._observer = None
+
+        if self.state_file is not None and self.state_file.exists():
+            with open(self.state_file, encoding="utf-8") as f:
+                self._seen = {
+                    path: tuple(sig) for path, sig in json.load(f).items()
+                }
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict,
+        directory: Path,
+        find_papers: Callable[[], Iterable[Path]],
+        state_file: Optional[Path] = None,
+        accepts: Optional[Callable[[Path], bool]] = None,
+    ) -> "DirectoryWatcher":
+        return cls(
+            directory,
+            find_papers,
+            debounce_s=float(config.get("watch_debounce_s", 2.0)),
+            poll_interval_s=float(config.get("watch_poll_interval_s", 5.0)),
+            state_file=state_file,
+            notifications=config.get("watch_notifications", True),
+            accepts=accepts,
+            retry_s=float(config.get("watch_retry_s", 60.0)),
+        )
+
+    def poll(self, now: Optional[float] = None) -> List[Path]:
+        """Scan once and return the papers that became ready."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        rescan = (
+            changed is None
+            or self.accepts is None
+            or self._scanned_at is None
+            or now - self._scanned_at >= self.poll_interval_s
+        )
+        if rescan:
+            candidates: Iterable = self.find_papers()
+            self._scanned_at = now
+        else:
+            # Only what was notified, plus files still settling
+            candidates = [
+                path for path in changed if self.accepts(Path(path))
+            ]
+            candidates.extend(self._pending)
+            candidates.extend(self._retry_at)
+
+        ready = []
+        present = set()
+        for path in dict.fromkeys(str(p) for p in candidates):
+            key = path
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            present.add(key)
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if (
+                not stat.st_size
+                or self._seen.get(key) == signature
+                or key in self._reported
+                or self._retry_at.get(key, now) > now
+            ):
+                self._pending.pop(key, None)
+                continue
+
+            pending = self._pending.get(key)
+            if pending is None or pending[0] != signature:
+                self._pending[key] = (signature, now)
+            elif now - pending[1] >= self.debounce_s:
+                del self._pending[key]
+                self._retry_at.pop(key, None)
+                self._reported[key] = signature
+                ready.append(Path(path))
+
+        for key in list(self._pending):
+            if key not in present:
+                del self._pending[key]
+        for key in list(self._retry_at):
+            if key not in present:
+                del self._retry_at[key]
+        return ready
+
+    def commit(self, paths: Iterable[Path]) -> None:
+        """Remember reported papers as processed, so they are not redone."""
+        for path in paths:
+            signature = self._reported.pop(str(path), None)
+            if signature is not None:
+                self._seen[str(path)] = signature
+        self._save_state()
+
+    def fail(
+        self, paths: Iterable[Path], now: Optional[float] = None
+    ) -> None:
+        """Report papers that could not be processed again after a while."""
+        now = time.monotonic() if now is None else now
+        for path in paths:
+            if self._reported.pop(str(path), None) is not None:
+                self._retry_at[str(path)] = now + self.retry_s
+
+    def notify(self, paths: Optional[Iterable[str]] = None) -> None:
+        """Note changed files (None: anything may have changed) and wake."""
+        with self._lock:
+            if paths is None or self._changed is None:
+                self._changed = None
+            else:
+                self._changed.update(path for path in paths if path)
+        self._wake.set()
+
+    def wait(self) -> None:
+        """Sleep until the next scan is due or a notification arrives."""
+        timeout = self.poll_interval_s
+        if self._pending:
+            timeout = min(timeout, self.debounce_s)
+        if self._wake.wait(timeout):
+            # Let a burst of events settle before rescanning
+            time.sleep(min(0.2, self.debounce_s))
+            self._wake.clear()
+
+    def run(
+        self,
+        handle: Callable[[List[Path]], Iterable[Path]],
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        """Pass ready papers to ``handle`` until ``stop`` is set.
+
+        ``handle`` returns the papers it failed to process; the others
+        are committed.
+        """
+        stop = stop or threading.Event()
+        self.start()
+        try:
+            while not stop.is_set():
+                ready = self.poll()
+                if ready:
+                    try:
+                        failed = {str(path) for path in handle(ready)}
+                    except BaseException:
+                        self.fail(ready)
+                        raise
+                    self.fail(p for p in ready if str(p) in failed)
+                    self.commit(p for p in ready if str(p) not in failed)
+                if not stop.is_set():
+                    self.wait()
+        finally:
+            self.stop()
+
+    def start(self) -> None:
+        """Start filesystem notifications, falling back to polling."""
+        if not self.notifications or self._observer is not None:
+            return
+        try:
+            observer = Observer()
+            observer.schedule(
+                _WakeHandler(self), str(self.directory), recursive=True
+            )
+            observer.start()
+        except OSError as e:
+            print(f"Filesystem notifications unavailable ({e}); polling")
+            self.notifications = False
+            return
+        self._observer = observer
+
+    def stop(self) -> None:
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def _save_state(self) -> None:
+        if self.state_file is None:
+            return
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_name(f".{self.state_file.name}.tmp")
+        tmp.write_text(json.dumps(self._seen), encoding="utf-8")
+        os.replace(tmp, self.state_file)